@@ -1,3 +1,26 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.test import SimpleTestCase, override_settings
+
+from utils import health
+
+
+def failing_probe():
+    raise ConnectionError('could not connect to server "db.internal:5432"')
+
+
+@override_settings(HEALTH_REQUIRED=['failing'], HEALTH_TIMEOUT=1)
+class HealthReadyTests(SimpleTestCase):
+    """Ответ проверки готовности не раскрывает текст ошибок."""
+
+    def test_error_text_is_logged_not_returned(self):
+        probes = {'failing': (failing_probe,), 'passing': (lambda: None,)}
+        with mock.patch.object(health, 'get_probes', return_value=probes), \
+                self.assertLogs(health.logger, 'WARNING') as logs:
+            result = health.HealthCheck().check()
+        self.assertEqual(result['status'], 'fail')
+        failing = result['probes']['failing']
+        self.assertEqual(set(failing), {'ok', 'latency_ms'})
+        self.assertFalse(failing['ok'])
+        self.assertTrue(result['probes']['passing']['ok'])
+        self.assertIn('db.internal', logs.output[0])
@@ -1,3 +1,30 @@
-from django.shortcuts import render
+import os
 
-# Create your views here.
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
+from django.views.decorators.cache import never_cache
+
+from utils.db.pool import get_stats
+from utils.health import health_check
+
+
+@staff_member_required
+def db_pool_stats(request):
+    """Статистика пулов соединений с БД процесса, обработавшего запрос."""
+    return JsonResponse({'pid': os.getpid(), 'pools': get_stats()})
+
+
+@never_cache
+def health_live(request):
+    """Процесс жив и обрабатывает запросы."""
+    return JsonResponse({'status': 'ok'})
+
+
+@never_cache
+def health_ready(request):
+    """Готовность сервиса: доступность БД и планировщика."""
+    result, cached = health_check.get()
+    return JsonResponse(
+        {**result, 'cached': cached},
+        status=200 if result['status'] == 'ok' else 503,
+    )
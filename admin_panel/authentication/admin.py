@@ -13,6 +13,7 @@ class AuthModelAdmin(UseDbAdminMixin):
     """Определяем БД для работы."""
 
     using = 'auth_db'
+    estimated_count = True
 
 
 @admin.register(UsersHistory,)
@@ -23,6 +24,7 @@ class UsersHistoryAdmin(AuthModelAdmin):
     search_fields = 'user', 'source'
     raw_id_fields = 'user',
     list_select_related = True
+    keyset_ordering = '-login_time'
 
 
 @admin.register(Role,)
@@ -1,5 +1,9 @@
 from enum import Enum
 
+from django.conf import settings
+
+from utils.replicas import get_read_alias
+
 
 class DefaultDb(Enum):
     auth = 'auth'
@@ -17,6 +21,23 @@ class DataBase(Enum):
     user_profile = 'profile_db'
 
 
+# Read-only replica aliases.
+REPLICA_ALIASES = {
+    replica
+    for replicas in settings.DATABASE_REPLICAS.values()
+    for replica in replicas
+}
+# Database alias of each app label.
+APP_DATABASES = {
+    **{app.value: DataBase.default.value for app in DefaultDb},
+    **{
+        database.name: database.value
+        for database in DataBase
+        if database is not DataBase.default
+    },
+}
+
+
 class CustomRouter:
     """A router to control all database operations on models in the auth
     and contenttypes applications."""
@@ -26,44 +47,18 @@ class CustomRouter:
     def db_for_read(self, model, **hints):
         """
         Attempts to read auth and contenttypes models go to auth_db.
+        Reads from a store with replicas go to one of its replicas.
         """
-        match model._meta.app_label:
-            case (DefaultDb.auth.value |
-                  DefaultDb.contenttypes.value |
-                  DefaultDb.sessions.value |
-                  DefaultDb.administrator.value |
-                  DefaultDb.admin.value):
-                return DataBase.default.value
-            case DataBase.authentication.name:
-                return DataBase.authentication.value
-            case DataBase.movie.name:
-                return DataBase.movie.value
-            case DataBase.notification.name:
-                return DataBase.notification.value
-            case DataBase.user_profile.name:
-                return DataBase.user_profile.value
-        return None
+        alias = APP_DATABASES.get(model._meta.app_label)
+        if alias is None:
+            return None
+        return get_read_alias(alias)
 
     def db_for_write(self, model, **hints):
         """
         Attempts to write auth and contenttypes models go to auth_db.
         """
-        match model._meta.app_label:
-            case (DefaultDb.auth.value |
-                  DefaultDb.contenttypes.value |
-                  DefaultDb.sessions.value |
-                  DefaultDb.administrator.value |
-                  DefaultDb.admin.value):
-                return DataBase.default.value
-            case DataBase.authentication.name:
-                return DataBase.authentication.value
-            case DataBase.movie.name:
-                return DataBase.movie.value
-            case DataBase.notification.name:
-                return DataBase.notification.value
-            case DataBase.user_profile.name:
-                return DataBase.user_profile.value
-        return None
+        return APP_DATABASES.get(model._meta.app_label)
 
     def allow_relation(self, obj1, obj2, **hints):
         """
@@ -81,21 +76,8 @@ class CustomRouter:
     def allow_migrate(self, db, app_label, model_name=None, **hints):
         """
         Make sure the auth and contenttypes apps only appear in the
-        'auth_db' database.
+        'auth_db' database. Replicas are never migrated.
         """
-        match app_label:
-            case (DefaultDb.auth.value |
-                  DefaultDb.contenttypes.value |
-                  DefaultDb.sessions.value |
-                  DefaultDb.administrator.value |
-                  DefaultDb.admin.value):
-                return DataBase.default.value
-            case DataBase.authentication.name:
-                return DataBase.authentication.value
-            case DataBase.movie.name:
-                return DataBase.movie.value
-            case DataBase.notification.name:
-                return DataBase.notification.value
-            case DataBase.user_profile.name:
-                return DataBase.user_profile.value
-        return None
+        if db in REPLICA_ALIASES:
+            return False
+        return APP_DATABASES.get(app_label)
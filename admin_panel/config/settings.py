@@ -22,6 +22,84 @@ with env.prefixed('NOTIFICATION_'):
     NOTIFICATION_DB_PASSWORD = env.str('DB_PASSWORD')
     NOTIFICATION_DB_HOST = env.str('DB_HOST', '127.0.0.1')
     NOTIFICATION_DB_PORT = env.str('DB_PORT', '5432')
+    NOTIFICATION_DB_REPLICAS = env.list('DB_REPLICAS', [])
+
+with env.prefixed('SCHEDULE_'):
+    # Горизонт (в часах) и предельное количество срабатываний расписания,
+    # которые хранятся в таблице срабатываний.
+    SCHEDULE_OCCURRENCE_HORIZON = env.int('OCCURRENCE_HORIZON', 168)
+    SCHEDULE_OCCURRENCE_LIMIT = env.int('OCCURRENCE_LIMIT', 10000)
+
+with env.prefixed('MAIL_'):
+    # Секции таблицы сообщений создаются помесячно.
+    MAIL_PARTITIONS_AHEAD = env.int('PARTITIONS_AHEAD', 3)
+    MAIL_RETENTION_MONTHS = env.int('RETENTION_MONTHS', 12)
+
+with env.prefixed('EVENT_INTAKE_'):
+    # Приём событий сторонних сервисов.
+    EVENT_INTAKE_TOKEN = env.str('TOKEN', '')
+    EVENT_INTAKE_MAX_BATCH = env.int('MAX_BATCH', 5000)
+    EVENT_INTAKE_TIMEOUT_MS = env.int('TIMEOUT_MS', 500)
+
+with env.prefixed('ADMIN_'):
+    # Количество объектов в списках админки.
+    ADMIN_ESTIMATED_COUNT_THRESHOLD = env.int(
+        'ESTIMATED_COUNT_THRESHOLD', 100000,
+    )
+    ADMIN_FULL_COUNT_TTL = env.int('FULL_COUNT_TTL', 30)
+    # Предохранитель БД: после скольких ошибок подряд страницы моделей
+    # БД сразу сообщают о её недоступности и через сколько секунд
+    # проверять, не стала ли БД снова доступна.
+    ADMIN_DB_FAILURE_THRESHOLD = env.int('DB_FAILURE_THRESHOLD', 3)
+    ADMIN_DB_RESET_TIMEOUT = env.float('DB_RESET_TIMEOUT', 15)
+
+# Форма фильма с сотнями строк персон отправляет тысячи полей.
+DATA_UPLOAD_MAX_NUMBER_FIELDS = env.int('DATA_UPLOAD_MAX_NUMBER_FIELDS', 10000)
+
+with env.prefixed('DB_POOL_'):
+    # Пулы соединений с БД, отдельно для каждого процесса и псевдонима.
+    DB_POOL = {
+        'MIN_SIZE': env.int('MIN_SIZE', 0),
+        'MAX_SIZE': env.int('MAX_SIZE', 10),
+        'MAX_IDLE': env.float('MAX_IDLE', 300),
+        'TIMEOUT': env.float('TIMEOUT', 10),
+        'PING_INTERVAL': env.float('PING_INTERVAL', 5),
+    }
+
+with env.prefixed('HEALTH_'):
+    # Проверка готовности: таймаут каждой проверки и время хранения
+    # результата, секунд; проверки, без которых сервис не готов.
+    HEALTH_TIMEOUT = env.float('TIMEOUT', 1)
+    HEALTH_CACHE_TTL = env.float('CACHE_TTL', 1.5)
+    HEALTH_REQUIRED = env.list('REQUIRED', [
+        'default', 'auth_db', 'movie_db', 'notification_db', 'profile_db',
+    ])
+
+with env.prefixed('REPLICA_'):
+    # Чтение с реплик: допустимое отставание реплики и интервал его
+    # проверки, секунд; сколько секунд после записи читать с основной БД.
+    REPLICA_MAX_LAG = env.float('MAX_LAG', 5)
+    REPLICA_CHECK_INTERVAL = env.float('CHECK_INTERVAL', 2)
+    REPLICA_PIN_SECONDS = env.int('PIN_SECONDS', 5)
+
+with env.prefixed('AUTOCOMPLETE_'):
+    # Автодополнение персон и жанров: количество вариантов, размер кэша
+    # частых запросов и сколько секунд хранить результат.
+    AUTOCOMPLETE_LIMIT = env.int('LIMIT', 20)
+    AUTOCOMPLETE_CACHE_SIZE = env.int('CACHE_SIZE', 1024)
+    AUTOCOMPLETE_CACHE_TTL = env.float('CACHE_TTL', 60)
+
+with env.prefixed('FILM_EXPORT_'):
+    # Выгрузка документов фильмов для поискового индекса: токен сервиса
+    # и сколько документов читать из курсора БД за раз.
+    FILM_EXPORT_TOKEN = env.str('TOKEN', '')
+    FILM_EXPORT_CHUNK_SIZE = env.int('CHUNK_SIZE', 1000)
+    # Лента изменений фильмов: количество изменений в странице, сколько
+    # секунд ждать фиксации транзакций с изменениями и сколько дней
+    # хранить записи об удалениях.
+    FILM_EXPORT_CHANGES_LIMIT = env.int('CHANGES_LIMIT', 1000)
+    FILM_EXPORT_CHANGES_LAG = env.float('CHANGES_LAG', 5)
+    FILM_EXPORT_TOMBSTONE_DAYS = env.int('TOMBSTONE_DAYS', 30)
 
 with env.prefixed('AUTH_'):
     AUTH_DB_NAME = env.str('DB_NAME')
@@ -29,6 +107,7 @@ with env.prefixed('AUTH_'):
     AUTH_DB_PASSWORD = env.str('DB_PASSWORD')
     AUTH_DB_HOST = env.str('DB_HOST', '127.0.0.1')
     AUTH_DB_PORT = env.str('DB_PORT', '5433')
+    AUTH_DB_REPLICAS = env.list('DB_REPLICAS', [])
 
 with env.prefixed('MOVIE_'):
     MOVIE_DB_NAME = env.str('DB_NAME')
@@ -36,6 +115,7 @@ with env.prefixed('MOVIE_'):
     MOVIE_DB_PASSWORD = env.str('DB_PASSWORD')
     MOVIE_DB_HOST = env.str('DB_HOST', '127.0.0.1')
     MOVIE_DB_PORT = env.str('DB_PORT', '5434')
+    MOVIE_DB_REPLICAS = env.list('DB_REPLICAS', [])
 
 with env.prefixed('MONGO_'):
     MONGO_HOST = env.str('HOST')
@@ -54,6 +134,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     # install apps
     'django_summernote',
     'debug_toolbar',
@@ -68,6 +149,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'utils.replicas.ReplicaPinMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -105,7 +187,8 @@ DATABASES = {
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
     },
     'auth_db': {
-        'ENGINE': 'django.db.backends.postgresql',
+        'ENGINE': 'utils.db.postgresql',
+        'POOL': DB_POOL,
         'NAME': AUTH_DB_NAME,
         'USER': AUTH_DB_USER,
         'PASSWORD': AUTH_DB_PASSWORD,
@@ -116,7 +199,8 @@ DATABASES = {
         },
     },
     'notification_db': {
-        'ENGINE': 'django.db.backends.postgresql',
+        'ENGINE': 'utils.db.postgresql',
+        'POOL': DB_POOL,
         'NAME': NOTIFICATION_DB_NAME,
         'USER': NOTIFICATION_DB_USER,
         'PASSWORD': NOTIFICATION_DB_PASSWORD,
@@ -127,7 +211,8 @@ DATABASES = {
         },
     },
     'movie_db': {
-        'ENGINE': 'django.db.backends.postgresql',
+        'ENGINE': 'utils.db.postgresql',
+        'POOL': DB_POOL,
         'NAME': MOVIE_DB_NAME,
         'USER': MOVIE_DB_USER,
         'PASSWORD': MOVIE_DB_PASSWORD,
@@ -138,7 +223,8 @@ DATABASES = {
         },
     },
     'profile_db': {
-        'ENGINE': 'djongo',
+        'ENGINE': 'utils.db.mongo',
+        'POOL': DB_POOL,
         'NAME': MONGO_DATABASE,
         'CLIENT': {
             'host': f'mongodb://{MONGO_HOST}:{MONGO_PORT}',
@@ -146,6 +232,26 @@ DATABASES = {
     },
 }
 
+# Реплики для чтения: псевдоним БД -> псевдонимы её реплик. Реплики
+# задаются списком `host[:port]` с теми же именем БД и учётной записью.
+DATABASE_REPLICAS = {}
+for alias, replicas in (
+        ('auth_db', AUTH_DB_REPLICAS),
+        ('movie_db', MOVIE_DB_REPLICAS),
+        ('notification_db', NOTIFICATION_DB_REPLICAS),
+):
+    for number, address in enumerate(replicas, 1):
+        host, _, port = address.partition(':')
+        replica = f'{alias}_replica_{number}'
+        DATABASES[replica] = {
+            **DATABASES[alias],
+            'HOST': host,
+            'PORT': port or DATABASES[alias]['PORT'],
+            'OPTIONS': {**DATABASES[alias]['OPTIONS'], 'connect_timeout': 2},
+            'TEST': {'MIRROR': alias},
+        }
+        DATABASE_REPLICAS.setdefault(alias, []).append(replica)
+
 DATABASE_ROUTERS = ['config.routers.CustomRouter']
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -3,9 +3,22 @@ from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import include, path
 
+from administrator.views import db_pool_stats, health_live, health_ready
+from movie.autocomplete import AutocompleteView
+
 urlpatterns = [
+    path('health/live', health_live, name='health_live'),
+    path('health/ready', health_ready, name='health_ready'),
+    path('admin/db-pools/', db_pool_stats, name='db_pool_stats'),
+    path(
+        'admin/movie/autocomplete/',
+        admin.site.admin_view(AutocompleteView.as_view(admin_site=admin.site)),
+        name='movie_autocomplete',
+    ),
     path('admin/', admin.site.urls),
     path('summernote/', include('django_summernote.urls')),
+    path('api/v1/', include('notification.urls')),
+    path('api/v1/', include('movie.urls')),
 ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
 
 if settings.DEBUG:
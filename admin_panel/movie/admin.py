@@ -1,57 +1,134 @@
 from django.contrib import admin
+from django.contrib.postgres.aggregates import ArrayAgg
+from django.db.models import Count, OuterRef, Q, Subquery
+from django.db.models.functions import JSONObject
 from django.utils.translation import gettext_lazy as _
 
+from utils.bulk_inlines import BulkInlineMixin
+from utils.paginated_inlines import PaginatedInlineMixin, PaginatedInlinesMixin
 from utils.use_db_admin_mixin import UseDbAdminMixin
-from .models import FilmWork, Genre, GenreFilmWork, Person, PersonFilmWork
+from .autocomplete import AutocompleteMixin
+from .models import (
+    FilmWork,
+    Genre,
+    GenreFilmWork,
+    Person,
+    PersonFilmWork,
+    RoleType,
+)
+from .search import SearchMixin
 
 
 class MovieModelAdmin(UseDbAdminMixin):
     """Определяем БД для работы."""
 
     using = 'movie_db'
+    estimated_count = True
 
 
 @admin.register(Genre)
-class GenreAdmin(MovieModelAdmin):
+class GenreAdmin(SearchMixin, MovieModelAdmin):
     list_display = 'name', 'description',
     search_fields = 'name',
+    search_trigram_fields = 'name',
+    autocomplete_label = 'name'
     empty_value_display = _('-empty-')
     ordering = 'name',
 
 
-class GenreInline(admin.TabularInline):
+class GenreInline(BulkInlineMixin, PaginatedInlineMixin, AutocompleteMixin,
+                  admin.TabularInline):
     model = GenreFilmWork
     extra = 0
     verbose_name = _('Genre')
     autocomplete_fields = 'genre',
+    # Порядок индекса genre_film_work_idx.
+    ordering = 'genre_id',
 
     def get_queryset(self, request):
         return super().get_queryset(request).select_related('genre', 'film_work')
 
 
-class PersonFilmWorkInline(admin.TabularInline):
+class PersonFilmWorkInline(BulkInlineMixin, PaginatedInlineMixin,
+                           AutocompleteMixin, admin.TabularInline):
     model = PersonFilmWork
     extra = 0
     verbose_name = _('PersonFilmWork')
     autocomplete_fields = 'person',
+    # Порядок индекса film_work_person_idx.
+    ordering = 'person_id', 'role'
 
     def get_queryset(self, request):
         return super().get_queryset(request).select_related('person', 'film_work')
 
 
 @admin.register(FilmWork)
-class FilmworkAdmin(MovieModelAdmin):
-    list_display = 'title', 'type', 'creation_date', 'rating'
+class FilmworkAdmin(PaginatedInlinesMixin, SearchMixin, MovieModelAdmin):
+    list_display = (
+        'title', 'type', 'creation_date', 'rating', 'genre_names',
+        'actors', 'directors', 'writers',
+    )
     list_filter = 'type',
     search_fields = 'title', 'description', 'id'
+    search_vector_column = 'search_vector'
+    search_trigram_fields = 'title',
     empty_value_display = _('-empty-')
     inlines = [GenreInline, PersonFilmWorkInline]
-    ordering = 'title',
+    # Порядок индекса film_work_creation_date_idx.
+    ordering = '-creation_date', '-rating'
+
+    def get_queryset(self, request):
+        """Фильмы с жанрами и количеством персон по ролям.
+
+        Подзапросы коррелированные, поэтому выполняются только для
+        строк страницы списка, а не для всей таблицы.
+        """
+        genres = (
+            GenreFilmWork.objects
+            .filter(film_work=OuterRef('pk'))
+            .values('film_work')
+            .annotate(names=ArrayAgg('genre__name', ordering='genre__name'))
+            .values('names')
+        )
+        roles = (
+            PersonFilmWork.objects
+            .filter(film_work=OuterRef('pk'))
+            .values('film_work')
+            .annotate(counts=JSONObject(**{
+                role: Count('pk', filter=Q(role=role))
+                for role in RoleType.values
+            }))
+            .values('counts')
+        )
+        return super().get_queryset(request).annotate(
+            genre_names=Subquery(genres), role_counts=Subquery(roles),
+        )
+
+    @admin.display(description=_('Genres'))
+    def genre_names(self, obj):
+        return ', '.join(obj.genre_names or ()) or None
+
+    def get_role_count(self, obj, role: str) -> int:
+        return (obj.role_counts or {}).get(role, 0)
+
+    @admin.display(description=_('Actors'))
+    def actors(self, obj):
+        return self.get_role_count(obj, RoleType.ACTOR)
+
+    @admin.display(description=_('Directors'))
+    def directors(self, obj):
+        return self.get_role_count(obj, RoleType.DIRECTOR)
+
+    @admin.display(description=_('Writers'))
+    def writers(self, obj):
+        return self.get_role_count(obj, RoleType.WRITER)
 
 
 @admin.register(Person)
-class PersonAdmin(MovieModelAdmin):
+class PersonAdmin(SearchMixin, MovieModelAdmin):
     list_display = 'full_name',
     search_fields = 'full_name', 'id'
+    search_trigram_fields = 'full_name',
+    autocomplete_label = 'full_name'
     empty_value_display = _('-empty-')
     ordering = 'full_name',
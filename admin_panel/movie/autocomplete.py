@@ -0,0 +1,173 @@
+"""Автодополнение персон и жанров в формах фильмов.
+
+Стандартное автодополнение админки ищет через `get_search_results`
+админки модели и считает количество найденных объектов. Здесь объекты
+ищутся по началу названия (индекс по `lower(...) COLLATE "C"`), а если
+таких мало - по похожести слов названия (триграммный индекс).
+Возвращаются только идентификатор и название, результаты частых
+запросов хранятся в LRU-кэше процесса, который сбрасывается при
+изменении объектов модели.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.admin import widgets
+from django.contrib.admin.views.autocomplete import AutocompleteJsonView
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.core.exceptions import PermissionDenied
+from django.db.models.functions import Collate, Lower
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.http import JsonResponse
+from django.urls import reverse
+
+from .models import Genre, Person
+
+LABEL = 'autocomplete_label'
+SIMILARITY = 'autocomplete_similarity'
+# Короче трёх символов у строки нет триграмм без пробелов.
+TRIGRAM_MIN_LENGTH = 3
+
+
+class PrefixCache:
+    """LRU-кэш результатов автодополнения.
+
+    Args:
+        size: максимальное количество запросов;
+        ttl: сколько секунд хранить результат. Изменения, сделанные
+            в других процессах или в обход админки, кэш не сбрасывают.
+    """
+
+    def __init__(self, size: int, ttl: float):
+        self.size = size
+        self.ttl = ttl
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple):
+        """Результат запроса, None - его нет в кэше."""
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            if time.monotonic() - item[0] > self.ttl:
+                del self._items[key]
+                return None
+            self._items.move_to_end(key)
+            return item[1]
+
+    def set(self, key: tuple, value):
+        with self._lock:
+            self._items[key] = time.monotonic(), value
+            self._items.move_to_end(key)
+            while len(self._items) > self.size:
+                self._items.popitem(last=False)
+
+    def invalidate(self, label: str):
+        """Сброс результатов запросов к модели."""
+        with self._lock:
+            for key in [key for key in self._items if key[0] == label]:
+                del self._items[key]
+
+
+prefix_cache = PrefixCache(
+    settings.AUTOCOMPLETE_CACHE_SIZE, settings.AUTOCOMPLETE_CACHE_TTL,
+)
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_save, sender=Person)
+@receiver(post_delete, sender=Genre)
+@receiver(post_delete, sender=Person)
+def invalidate_cache(sender, **kwargs):
+    prefix_cache.invalidate(sender._meta.label)
+
+
+def search(queryset, field: str, to_field: str, term: str, limit: int) -> list:
+    """Пары (значение `to_field`, значение `field`) найденных объектов.
+
+    Сначала по алфавиту идут объекты, название которых начинается с
+    `term`, затем - остальные объекты с похожими словами в названии.
+    """
+    rows = list(
+        queryset
+        .alias(**{LABEL: Collate(Lower(field), 'C')})
+        .filter(**{f'{LABEL}__startswith': term.lower()})
+        .order_by(LABEL)
+        .values_list(to_field, field)[:limit]
+    )
+    if len(rows) < limit and len(term) >= TRIGRAM_MIN_LENGTH:
+        rows += (
+            queryset
+            .filter(**{f'{field}__trigram_word_similar': term})
+            .exclude(**{f'{to_field}__in': [key for key, _ in rows]})
+            .annotate(**{SIMILARITY: TrigramWordSimilarity(term, field)})
+            .order_by(f'-{SIMILARITY}', field)
+            .values_list(to_field, field)[:limit - len(rows)]
+        )
+    return rows
+
+
+class AutocompleteView(AutocompleteJsonView):
+    """Автодополнение для моделей, админка которых задаёт
+    `autocomplete_label` - поле с названием объекта.
+
+    Для остальных моделей используется стандартный поиск админки.
+    """
+
+    def get(self, request, *args, **kwargs):
+        (
+            self.term, self.model_admin, self.source_field, to_field_name,
+        ) = self.process_request(request)
+        field = getattr(self.model_admin, 'autocomplete_label', None)
+        if field is None:
+            return super().get(request, *args, **kwargs)
+        if not self.has_perm(request):
+            raise PermissionDenied
+
+        term = self.term.strip()
+        key = (
+            self.model_admin.model._meta.label,
+            str(self.source_field),
+            to_field_name,
+            term.lower(),
+        )
+        results = prefix_cache.get(key)
+        if results is None:
+            queryset = self.model_admin.get_queryset(request).complex_filter(
+                self.source_field.get_limit_choices_to(),
+            )
+            results = [
+                {'id': str(pk), 'text': label}
+                for pk, label in search(
+                    queryset, field, to_field_name, term,
+                    settings.AUTOCOMPLETE_LIMIT,
+                )
+            ]
+            prefix_cache.set(key, results)
+        return JsonResponse({'results': results, 'pagination': {'more': False}})
+
+
+class AutocompleteSelect(widgets.AutocompleteSelect):
+    """Виджет выбора объекта с автодополнением через `AutocompleteView`."""
+
+    def get_url(self):
+        return reverse('movie_autocomplete')
+
+
+class AutocompleteMixin:
+    """Миксин админки: поля из `autocomplete_fields` используют
+    `AutocompleteView`.
+    """
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if (
+                'widget' not in kwargs
+                and db_field.name in self.get_autocomplete_fields(request)
+        ):
+            kwargs['widget'] = AutocompleteSelect(
+                db_field, self.admin_site, using=kwargs.get('using'),
+            )
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
@@ -0,0 +1,138 @@
+"""Лента изменений фильмов для поискового индекса и кэшей.
+
+Фильм считается изменённым, когда меняется сам фильм, его связь с
+жанром или персоной (`created_at` связи обновляется при сохранении), а
+также жанр или персона фильма. Удаления фильмов и связей фиксирует
+триггер в `content.film_work_tombstone`.
+
+Каждый источник читается диапазоном индекса по (время, id фильма) после
+отметки клиента. Страница - первые `limit` изменений всех источников в
+этом порядке, фильм в странице указывается один раз, с последним
+изменением. Отметка следующей страницы - последнее изменение страницы,
+поэтому изменение не теряется, но фильм может попасть в несколько
+страниц.
+"""
+import datetime
+import uuid
+from typing import NamedTuple
+
+from django.db import connections
+
+from .models import FilmWork, Genre, GenreFilmWork, Person, PersonFilmWork
+
+TOMBSTONE_TABLE = 'content"."film_work_tombstone'
+# Отметка до первого изменения.
+MIN_ID = uuid.UUID(int=0)
+
+
+class Change(NamedTuple):
+    """Изменение фильма."""
+
+    id: uuid.UUID
+    updated_at: datetime.datetime
+    deleted: bool
+
+
+def get_changes_query(connection) -> str:
+    """Запрос страницы изменений фильмов после отметки."""
+    quote = connection.ops.quote_name
+    after = (
+        '({time}, {film}) > (%(updated_at)s, %(id)s)'
+        ' AND {time} >= %(updated_at)s'
+        ' AND {time} < now() - make_interval(secs => %(lag)s)'
+    )
+    sources = [
+        ('fw.updated_at', 'fw.id', f'{quote(FilmWork._meta.db_table)} fw'),
+        (
+            'gfw.created_at', 'gfw.film_work_id',
+            f'{quote(GenreFilmWork._meta.db_table)} gfw',
+        ),
+        (
+            'pfw.created_at', 'pfw.film_work_id',
+            f'{quote(PersonFilmWork._meta.db_table)} pfw',
+        ),
+        (
+            'g.updated_at', 'gfw.film_work_id',
+            f'{quote(Genre._meta.db_table)} g'
+            f' JOIN {quote(GenreFilmWork._meta.db_table)} gfw'
+            f' ON gfw.genre_id = g.id',
+        ),
+        (
+            'p.updated_at', 'pfw.film_work_id',
+            f'{quote(Person._meta.db_table)} p'
+            f' JOIN {quote(PersonFilmWork._meta.db_table)} pfw'
+            f' ON pfw.person_id = p.id',
+        ),
+        ('t.deleted_at', 't.film_work_id', f'{quote(TOMBSTONE_TABLE)} t'),
+    ]
+    changes = '\n    UNION ALL\n'.join(
+        f'    (SELECT {time} AS updated_at, {film} AS film_work_id'
+        f' FROM {tables}'
+        f' WHERE {after.format(time=time, film=film)}'
+        f' ORDER BY 1, 2 LIMIT %(limit)s)'
+        for time, film, tables in sources
+    )
+    return f"""
+WITH changes AS (
+{changes}
+), page AS (
+    SELECT * FROM changes ORDER BY updated_at, film_work_id LIMIT %(limit)s
+)
+SELECT page.film_work_id, max(page.updated_at), fw.id IS NULL, count(*)
+FROM page
+LEFT JOIN {quote(FilmWork._meta.db_table)} fw ON fw.id = page.film_work_id
+GROUP BY page.film_work_id, fw.id
+ORDER BY 2, 1
+"""
+
+
+def get_changes(
+        using: str,
+        updated_at: datetime.datetime | None,
+        film_id: uuid.UUID | None,
+        limit: int,
+        lag: float,
+) -> tuple[list[Change], bool]:
+    """Изменения фильмов после отметки (`updated_at`, `film_id`).
+
+    Args:
+        using: БД фильмов;
+        updated_at, film_id: отметка, None - с первого изменения;
+        limit: количество изменений в странице;
+        lag: изменения последних `lag` секунд не возвращаются: время
+            изменения проставляется до фиксации транзакции, и
+            изменение, зафиксированное позже отметки, иначе потерялось бы.
+
+    Returns:
+        изменения по возрастанию отметки и есть ли изменения после них.
+    """
+    params = {
+        'updated_at': updated_at or '-infinity',
+        'id': film_id or MIN_ID,
+        'limit': limit,
+        'lag': lag,
+    }
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        cursor.execute(get_changes_query(connection), params)
+        rows = cursor.fetchall()
+    changes = [Change(*row[:3]) for row in rows]
+    return changes, sum(row[3] for row in rows) == limit
+
+
+def purge_tombstones(using: str, days: int) -> int:
+    """Удаление записей об удалениях старше `days` дней.
+
+    Клиент, отметка которого старше, должен заново выгрузить фильмы.
+
+    Returns:
+        количество удалённых записей.
+    """
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {connection.ops.quote_name(TOMBSTONE_TABLE)}'
+            f' WHERE deleted_at < now() - make_interval(days => %s)',
+            [days],
+        )
+        return cursor.rowcount
@@ -0,0 +1,90 @@
+"""Выгрузка документов фильмов для поискового индекса.
+
+Документ фильма содержит поля фильма, жанры, актёров, сценаристов и
+режиссёров с идентификаторами и именами. Документы собирает сама БД
+(`json_build_object` и `json_agg`) одним запросом, а читаются они через
+серверный курсор пачками, поэтому память процесса не зависит от
+размера каталога.
+"""
+from typing import Iterator
+
+from django.db import connections, transaction
+
+from .models import FilmWork, Genre, GenreFilmWork, Person, PersonFilmWork, RoleType
+
+# Роль персоны и ключ списка персон с этой ролью в документе.
+ROLE_KEYS = {
+    RoleType.ACTOR: 'actors',
+    RoleType.WRITER: 'writers',
+    RoleType.DIRECTOR: 'directors',
+}
+
+
+def get_documents_query(connection) -> tuple[str, list]:
+    """Запрос документов всех фильмов, по документу JSON в строке."""
+    quote = connection.ops.quote_name
+    roles = ',\n'.join(
+        f"""            json_agg(
+                json_build_object('id', p.id, 'name', p.full_name)
+                ORDER BY p.full_name
+            ) FILTER (WHERE pfw.role = %s) AS {key}"""
+        for key in ROLE_KEYS.values()
+    )
+    fields = ''.join(
+        f", '{key}', coalesce(p.{key}, '[]')" for key in ROLE_KEYS.values()
+    )
+    sql = f"""
+SELECT json_build_object(
+    'id', fw.id,
+    'title', fw.title,
+    'description', fw.description,
+    'creation_date', fw.creation_date,
+    'rating', fw.rating,
+    'type', fw.type,
+    'created_at', fw.created_at,
+    'updated_at', fw.updated_at,
+    'genres', coalesce(g.genres, '[]'){fields}
+)::text
+FROM {quote(FilmWork._meta.db_table)} fw
+CROSS JOIN LATERAL (
+    SELECT json_agg(
+        json_build_object('id', g.id, 'name', g.name) ORDER BY g.name
+    ) AS genres
+    FROM {quote(GenreFilmWork._meta.db_table)} gfw
+    JOIN {quote(Genre._meta.db_table)} g ON g.id = gfw.genre_id
+    WHERE gfw.film_work_id = fw.id
+) g
+CROSS JOIN LATERAL (
+    SELECT
+{roles}
+    FROM {quote(PersonFilmWork._meta.db_table)} pfw
+    JOIN {quote(Person._meta.db_table)} p ON p.id = pfw.person_id
+    WHERE pfw.film_work_id = fw.id
+) p
+ORDER BY fw.id
+"""
+    return sql, list(ROLE_KEYS)
+
+
+def iter_documents(
+        using: str = 'movie_db',
+        chunk_size: int = 1000,
+) -> Iterator[str]:
+    """Документы фильмов в формате NDJSON.
+
+    Серверный курсор открыт в транзакции, чтобы PostgreSQL не
+    материализовал весь результат, как для курсора `WITH HOLD`.
+
+    Args:
+        using: БД фильмов;
+        chunk_size: сколько документов читать из курсора за раз.
+
+    Yields:
+        пачка документов, по документу в строке.
+    """
+    connection = connections[using]
+    sql, params = get_documents_query(connection)
+    with transaction.atomic(using=using), connection.chunked_cursor() as cursor:
+        cursor.execute(sql, params)
+        while rows := cursor.fetchmany(chunk_size):
+            yield ''.join(f'{document}\n' for document, in rows)
@@ -0,0 +1,52 @@
+"""Выгрузка документов фильмов в NDJSON с замером скорости."""
+import resource
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import router
+
+from movie.export import iter_documents
+from movie.models import FilmWork
+
+
+class Command(BaseCommand):
+    help = 'Выгрузка документов фильмов для поискового индекса в NDJSON.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output', default='-', help='Файл, "-" - стандартный вывод.',
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=settings.FILM_EXPORT_CHUNK_SIZE,
+        )
+        parser.add_argument('--database')
+
+    def handle(self, *args, **options):
+        using = options['database'] or router.db_for_read(FilmWork)
+        output = options['output']
+        stream = (
+            sys.stdout if output == '-'
+            else open(output, 'w', encoding='utf-8')
+        )
+        documents = 0
+        size = 0
+        started = time.perf_counter()
+        try:
+            for chunk in iter_documents(using, options['chunk_size']):
+                stream.write(chunk)
+                documents += chunk.count('\n')
+                size += len(chunk)
+        finally:
+            if stream is not sys.stdout:
+                stream.close()
+        elapsed = time.perf_counter() - started
+        peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // 1024
+
+        # Статистика пишется в stderr, чтобы не смешиваться с документами.
+        self.stderr.write(
+            f'{documents} documents, {size / 2 ** 20:.1f} MiB '
+            f'in {elapsed:.2f} s, {documents / elapsed:.0f} documents/s, '
+            f'peak RSS {peak_rss} MiB'
+        )
@@ -0,0 +1,21 @@
+"""Очистка записей об удалениях фильмов для ленты изменений."""
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from movie.changes import purge_tombstones
+
+
+class Command(BaseCommand):
+    help = 'Удаление устаревших записей content.film_work_tombstone.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='movie_db')
+        parser.add_argument(
+            '--days', type=int,
+            default=settings.FILM_EXPORT_TOMBSTONE_DAYS,
+            help='Сколько дней хранить записи об удалениях.',
+        )
+
+    def handle(self, *args, **options):
+        deleted = purge_tombstones(options['database'], options['days'])
+        self.stdout.write(f'Deleted {deleted} tombstones')
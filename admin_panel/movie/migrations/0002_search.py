@@ -0,0 +1,37 @@
+from django.db import migrations
+
+CREATE_SEARCH = """
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+ALTER TABLE content.film_work ADD COLUMN search_vector tsvector
+GENERATED ALWAYS AS (
+    setweight(to_tsvector('russian'::regconfig, coalesce(title, '')), 'A')
+    || setweight(to_tsvector('english'::regconfig, coalesce(title, '')), 'A')
+    || setweight(to_tsvector('russian'::regconfig, coalesce(description, '')), 'B')
+    || setweight(to_tsvector('english'::regconfig, coalesce(description, '')), 'B')
+) STORED;
+CREATE INDEX film_work_search ON content.film_work USING gin (search_vector);
+
+CREATE INDEX film_work_title_trgm ON content.film_work USING gin (title gin_trgm_ops);
+CREATE INDEX person_full_name_trgm ON content.person USING gin (full_name gin_trgm_ops);
+CREATE INDEX genre_name_trgm ON content.genre USING gin (name gin_trgm_ops);
+"""
+
+DROP_SEARCH = """
+DROP INDEX content.genre_name_trgm;
+DROP INDEX content.person_full_name_trgm;
+DROP INDEX content.film_work_title_trgm;
+DROP INDEX content.film_work_search;
+ALTER TABLE content.film_work DROP COLUMN search_vector;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movie', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_SEARCH, DROP_SEARCH),
+    ]
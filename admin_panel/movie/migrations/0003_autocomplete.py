@@ -0,0 +1,22 @@
+from django.db import migrations
+
+CREATE_INDEXES = """
+CREATE INDEX person_full_name_prefix ON content.person (lower(full_name) COLLATE "C");
+CREATE INDEX genre_name_prefix ON content.genre (lower(name) COLLATE "C");
+"""
+
+DROP_INDEXES = """
+DROP INDEX content.genre_name_prefix;
+DROP INDEX content.person_full_name_prefix;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movie', '0002_search'),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_INDEXES, DROP_INDEXES),
+    ]
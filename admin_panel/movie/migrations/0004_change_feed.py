@@ -0,0 +1,86 @@
+from django.db import migrations
+
+CREATE_CHANGE_FEED = """
+CREATE INDEX film_work_updated_at ON content.film_work (updated_at, id);
+CREATE INDEX genre_updated_at ON content.genre (updated_at, id);
+CREATE INDEX person_updated_at ON content.person (updated_at, id);
+CREATE INDEX genre_film_work_created_at ON content.genre_film_work (created_at, film_work_id);
+CREATE INDEX person_film_work_created_at ON content.person_film_work (created_at, film_work_id);
+CREATE INDEX genre_film_work_genre ON content.genre_film_work (genre_id, film_work_id);
+
+CREATE TABLE content.film_work_tombstone (
+    film_work_id uuid NOT NULL,
+    deleted_at timestamp with time zone NOT NULL DEFAULT clock_timestamp()
+);
+CREATE INDEX film_work_tombstone_deleted_at ON content.film_work_tombstone (deleted_at, film_work_id);
+
+CREATE FUNCTION content.film_work_deleted() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO content.film_work_tombstone (film_work_id)
+    SELECT id FROM old_rows;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE FUNCTION content.film_work_link_removed() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        INSERT INTO content.film_work_tombstone (film_work_id)
+        SELECT DISTINCT film_work_id FROM old_rows;
+    ELSE
+        INSERT INTO content.film_work_tombstone (film_work_id)
+        SELECT DISTINCT old_rows.film_work_id
+        FROM old_rows JOIN new_rows ON new_rows.id = old_rows.id
+        WHERE new_rows.film_work_id <> old_rows.film_work_id;
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER film_work_deleted AFTER DELETE ON content.film_work
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION content.film_work_deleted();
+
+CREATE TRIGGER genre_film_work_deleted AFTER DELETE ON content.genre_film_work
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION content.film_work_link_removed();
+CREATE TRIGGER genre_film_work_updated AFTER UPDATE ON content.genre_film_work
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION content.film_work_link_removed();
+
+CREATE TRIGGER person_film_work_deleted AFTER DELETE ON content.person_film_work
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION content.film_work_link_removed();
+CREATE TRIGGER person_film_work_updated AFTER UPDATE ON content.person_film_work
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION content.film_work_link_removed();
+"""
+
+DROP_CHANGE_FEED = """
+DROP TRIGGER person_film_work_updated ON content.person_film_work;
+DROP TRIGGER person_film_work_deleted ON content.person_film_work;
+DROP TRIGGER genre_film_work_updated ON content.genre_film_work;
+DROP TRIGGER genre_film_work_deleted ON content.genre_film_work;
+DROP TRIGGER film_work_deleted ON content.film_work;
+DROP FUNCTION content.film_work_link_removed();
+DROP FUNCTION content.film_work_deleted();
+DROP TABLE content.film_work_tombstone;
+
+DROP INDEX content.genre_film_work_genre;
+DROP INDEX content.person_film_work_created_at;
+DROP INDEX content.genre_film_work_created_at;
+DROP INDEX content.person_updated_at;
+DROP INDEX content.genre_updated_at;
+DROP INDEX content.film_work_updated_at;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movie', '0003_autocomplete'),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_CHANGE_FEED, DROP_CHANGE_FEED),
+    ]
@@ -0,0 +1,144 @@
+"""Поиск в админке фильмов, персон и жанров.
+
+Вместо `ILIKE '%...%'` по всем полям из `search_fields` используются
+индексы: полнотекстовый по столбцу `tsvector` (русская и английская
+конфигурации) и триграммный по названию. Результаты упорядочиваются по
+релевантности, запрос, совпадающий с UUID, ищет объект по первичному
+ключу.
+"""
+import uuid
+from functools import lru_cache
+
+from django.contrib.admin.views.main import ORDER_VAR
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVectorField,
+    TrigramSimilarity,
+)
+from django.db.models import CharField, Expression, FloatField, Q, Value
+from django.db.models.functions import Greatest
+from django.db.models.lookups import IContains, Lookup
+
+SEARCH_CONFIGS = 'russian', 'english'
+RANK = 'search_rank'
+
+
+class TableColumn(Expression):
+    """Столбец таблицы модели, не описанный полем модели.
+
+    Используется для столбцов, которые вычисляет сама БД и в которые
+    Django не должен писать.
+    """
+
+    def __init__(self, column: str, output_field):
+        super().__init__(output_field=output_field)
+        self.column = column
+
+    def as_sql(self, compiler, connection):
+        alias = compiler.query.get_initial_alias()
+        return (
+            f'{compiler.quote_name_unless_alias(alias)}.'
+            f'{connection.ops.quote_name(self.column)}'
+        ), []
+
+
+@CharField.register_lookup
+class ILikeContains(IContains):
+    """Вхождение строки без учёта регистра через `ILIKE` по самому столбцу.
+
+    `icontains` сравнивает `UPPER(столбец::text)`, такое выражение
+    триграммный индекс по столбцу не обслуживает.
+    """
+
+    lookup_name = 'ilike_contains'
+
+    def as_postgresql(self, compiler, connection):
+        # Без приведения и UPPER из BuiltinLookup.process_lhs.
+        lhs, lhs_params = Lookup.process_lhs(self, compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} ILIKE {rhs}', (*lhs_params, *rhs_params)
+
+
+def get_search_query(term: str) -> SearchQuery:
+    """Полнотекстовый запрос сразу в русской и английской конфигурациях."""
+    query = None
+    for config in SEARCH_CONFIGS:
+        part = SearchQuery(term, config=config, search_type='websearch')
+        query = part if query is None else query | part
+    return query
+
+
+class RankedChangeListMixin:
+    """Результаты поиска в списке идут по убыванию релевантности.
+
+    Выбранная пользователем сортировка по столбцу имеет приоритет.
+    """
+
+    def get_ordering(self, request, queryset):
+        ordering = super().get_ordering(request, queryset)
+        if RANK in queryset.query.annotations and ORDER_VAR not in self.params:
+            return [f'-{RANK}', *ordering]
+        return ordering
+
+
+@lru_cache
+def ranked(changelist):
+    """Класс списка с упорядочиванием результатов поиска по релевантности."""
+    return type(
+        f'Ranked{changelist.__name__}',
+        (RankedChangeListMixin, changelist),
+        {},
+    )
+
+
+class SearchMixin:
+    """Миксин админки с поиском по индексам PostgreSQL.
+
+    Поле поиска показывается, если задан `search_fields`, но сам поиск
+    ведётся только по `search_vector_column` и `search_trigram_fields`.
+    """
+
+    # Столбец `tsvector` таблицы, None - без полнотекстового поиска.
+    search_vector_column = None
+    # Поля для поиска по вхождению и похожести строки.
+    search_trigram_fields = ()
+
+    def get_changelist(self, request, **kwargs):
+        return ranked(super().get_changelist(request, **kwargs))
+
+    def get_search_results(self, request, queryset, search_term):
+        term = search_term.strip()
+        if not term:
+            return queryset, False
+        try:
+            pk = uuid.UUID(term)
+        except ValueError:
+            pass
+        else:
+            return (
+                queryset.filter(pk=pk).annotate(
+                    **{RANK: Value(1.0, output_field=FloatField())},
+                ),
+                False,
+            )
+
+        condition = Q()
+        ranks = []
+        if self.search_vector_column:
+            query = get_search_query(term)
+            vector = TableColumn(
+                self.search_vector_column, SearchVectorField(),
+            )
+            queryset = queryset.alias(search_vector=vector)
+            condition |= Q(search_vector=query)
+            ranks.append(SearchRank(vector, query))
+        for field in self.search_trigram_fields:
+            condition |= Q(**{f'{field}__ilike_contains': term})
+            condition |= Q(**{f'{field}__trigram_similar': term})
+            ranks.append(TrigramSimilarity(field, term))
+        if not ranks:
+            return super().get_search_results(request, queryset, search_term)
+
+        rank = ranks[0] if len(ranks) == 1 else Greatest(*ranks)
+        return queryset.filter(condition).annotate(**{RANK: rank}), False
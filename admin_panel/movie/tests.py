@@ -1,3 +1,215 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.contrib import admin
+from django.db import connections
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from movie.models import FilmWork, Person, PersonFilmWork, RoleType
+from utils import replicas
+from utils.db import breakers
+from utils.testing import DatabaseTestCase
+
+REPLICA = 'movie_db_replica_1'
+
+
+@override_settings(DATABASE_REPLICAS={'movie_db': [REPLICA]})
+class ReplicaAdminTests(SimpleTestCase):
+    """Админка читает с реплики только на страницах без изменений."""
+
+    def setUp(self):
+        self.model_admin = admin.site._registry[FilmWork]
+        self.factory = RequestFactory()
+        replicas.start(())
+        patcher = mock.patch.object(
+            replicas.monitor, 'is_available', return_value=True,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(replicas.start, ())
+
+    def get_databases(self, request) -> dict:
+        """БД запросов админки фильма при обработке запроса."""
+        databases = {}
+
+        def view(request):
+            inlines = self.model_admin.get_inline_instances(request)
+            genre, person = inlines
+            databases['film_work'] = self.model_admin.get_queryset(request).db
+            databases['genres'] = genre.get_queryset(request).db
+            databases['persons'] = person.get_queryset(request).db
+            databases['person_choices'] = person.formfield_for_foreignkey(
+                PersonFilmWork._meta.get_field('person'), request,
+            ).queryset.db
+            return HttpResponse()
+
+        request.user = mock.Mock(is_superuser=True)
+        replicas.ReplicaPinMiddleware(view)(request)
+        return databases
+
+    def test_get_reads_from_replica(self):
+        databases = self.get_databases(self.factory.get('/'))
+        self.assertEqual(set(databases.values()), {REPLICA})
+
+    def test_post_reads_from_primary(self):
+        databases = self.get_databases(self.factory.post('/'))
+        self.assertEqual(set(databases.values()), {'movie_db'})
+
+    def test_pinned_get_reads_from_primary(self):
+        request = self.factory.get('/')
+        request.COOKIES[replicas.PIN_COOKIE] = 'movie_db'
+        databases = self.get_databases(request)
+        self.assertEqual(set(databases.values()), {'movie_db'})
+
+    def test_post_does_not_set_pin_cookie(self):
+        response = replicas.ReplicaPinMiddleware(
+            lambda request: HttpResponse(),
+        )(self.factory.post('/'))
+        self.assertNotIn(replicas.PIN_COOKIE, response.cookies)
+
+    def test_delete_queryset_uses_primary(self):
+        queryset = mock.Mock()
+        self.model_admin.delete_queryset(self.factory.post('/'), queryset)
+        queryset.using.assert_called_once_with('movie_db')
+        queryset.using.return_value.delete.assert_called_once_with()
+
+
+class BrokenConnectionTests(SimpleTestCase):
+    """Предохранитель учитывает только ошибки соединения своей БД."""
+
+    def setUp(self):
+        self.connection = connections['movie_db']
+        for name in ('connection', 'errors_occurred'):
+            patcher = mock.patch.object(self.connection, name)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_unopened_connection_without_errors(self):
+        self.connection.connection = None
+        self.connection.errors_occurred = False
+        self.assertFalse(breakers.is_broken('movie_db'))
+
+    def test_failed_connect(self):
+        self.connection.connection = None
+        self.connection.errors_occurred = True
+        self.assertTrue(breakers.is_broken('movie_db'))
+
+    def test_usable_connection_after_error(self):
+        self.connection.errors_occurred = True
+        with mock.patch.object(
+                self.connection, 'is_usable', return_value=True,
+        ):
+            self.assertFalse(breakers.is_broken('movie_db'))
+
+    def test_clear_errors_of_unopened_connection(self):
+        self.connection.connection = None
+        self.connection.errors_occurred = True
+        breakers.clear_errors('movie_db')
+        self.assertFalse(self.connection.errors_occurred)
+
+
+class BulkInlineTests(DatabaseTestCase):
+    """Строки персон фильма сохраняются набором запросов."""
+
+    using = 'movie_db'
+
+    def setUp(self):
+        super().setUp()
+        self.film = FilmWork.objects.using(self.using).create(
+            title='Film', type='movie',
+        )
+        self.persons = Person.objects.using(self.using).bulk_create(
+            Person(full_name=f'Person {number}') for number in range(3)
+        )
+        self.credits = PersonFilmWork.objects.using(self.using).bulk_create(
+            PersonFilmWork(
+                film_work=self.film, person=person, role=RoleType.ACTOR,
+            )
+            for person in self.persons[:2]
+        )
+        request = RequestFactory().post('/')
+        request.user = mock.Mock(is_superuser=True)
+        model_admin = admin.site._registry[FilmWork]
+        _, inline = model_admin.get_inline_instances(request, self.film)
+        self.formset_class = inline.get_formset(request, self.film)
+
+    def get_formset(self, *rows, changes=()):
+        """Набор форм со строками фильма и новыми строками `rows`.
+
+        `changes` - пары (номер строки фильма, изменённые значения).
+        """
+        prefix = self.formset_class.get_default_prefix()
+        data = {
+            f'{prefix}-TOTAL_FORMS': len(self.credits) + len(rows),
+            f'{prefix}-INITIAL_FORMS': len(self.credits),
+        }
+        initial = [
+            {'id': credit.id, 'person': credit.person_id, 'role': credit.role}
+            for credit in self.credits
+        ]
+        for index, values in changes:
+            initial[index] = initial[index] | values
+        for index, row in enumerate(initial + list(rows)):
+            data.update({
+                f'{prefix}-{index}-{name}': value
+                for name, value in row.items()
+            })
+            data[f'{prefix}-{index}-film_work'] = self.film.id
+        return self.formset_class(data, instance=self.film, prefix=prefix)
+
+    def get_credits(self) -> set:
+        return set(
+            PersonFilmWork.objects.using(self.using)
+            .filter(film_work=self.film)
+            .values_list('person_id', 'role')
+        )
+
+    def test_save_in_one_statement_per_change_kind(self):
+        _, second, third = self.persons
+        formset = self.get_formset(
+            {'person': third.id, 'role': RoleType.WRITER},
+            changes=[(0, {'DELETE': 'on'}), (1, {'role': RoleType.DIRECTOR})],
+        )
+        self.assertTrue(formset.is_valid(), formset.errors)
+        with CaptureQueriesContext(self.connection) as queries:
+            formset.save()
+        self.assertEqual(
+            [query['sql'].split()[0] for query in queries],
+            ['DELETE', 'UPDATE', 'INSERT'],
+        )
+        self.assertEqual(self.get_credits(), {
+            (second.id, RoleType.DIRECTOR), (third.id, RoleType.WRITER),
+        })
+
+    def test_duplicate_of_existing_row_is_invalid(self):
+        formset = self.get_formset(
+            {'person': self.persons[0].id, 'role': RoleType.ACTOR},
+        )
+        self.assertFalse(formset.is_valid())
+        self.assertTrue(formset.non_form_errors())
+
+    def test_duplicate_new_rows_are_invalid(self):
+        row = {'person': self.persons[2].id, 'role': RoleType.WRITER}
+        formset = self.get_formset(row, row)
+        self.assertFalse(formset.is_valid())
+        self.assertTrue(formset.non_form_errors())
+
+    def test_row_may_take_values_of_deleted_row(self):
+        formset = self.get_formset(
+            {'person': self.persons[0].id, 'role': RoleType.ACTOR},
+            changes=[(0, {'DELETE': 'on'})],
+        )
+        self.assertTrue(formset.is_valid(), formset.errors)
+        formset.save()
+        self.assertEqual(self.get_credits(), {
+            (self.persons[0].id, RoleType.ACTOR),
+            (self.persons[1].id, RoleType.ACTOR),
+        })
+
+    def test_unknown_person_is_invalid(self):
+        formset = self.get_formset(
+            {'person': self.film.id, 'role': RoleType.WRITER},
+        )
+        self.assertFalse(formset.is_valid())
+        self.assertIn('person', formset.errors[-1])
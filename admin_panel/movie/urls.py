@@ -0,0 +1,8 @@
+from django.urls import path
+
+from movie import views
+
+urlpatterns = [
+    path('films/export/', views.export_films, name='export_films'),
+    path('films/changes/', views.film_changes, name='film_changes'),
+]
@@ -1,3 +1,113 @@
-from django.shortcuts import render
+"""Выгрузка фильмов для сторонних сервисов."""
+import http
+import secrets
+import uuid
 
-# Create your views here.
+from django.conf import settings
+from django.db import DatabaseError, connections, router
+from django.http import HttpRequest, JsonResponse, StreamingHttpResponse
+from django.utils.dateparse import parse_datetime
+from django.views.decorators.http import require_GET
+
+from movie.changes import get_changes
+from movie.export import iter_documents
+from movie.models import FilmWork
+
+
+def is_authorized(request: HttpRequest) -> bool:
+    """Проверка токена сервиса.
+
+    Пока токен не задан в настройках, запросы не принимаются.
+    """
+    token = settings.FILM_EXPORT_TOKEN
+    return bool(token) and secrets.compare_digest(
+        request.headers.get('X-Api-Key', ''), token,
+    )
+
+
+@require_GET
+def export_films(request: HttpRequest):
+    """Документы всех фильмов в формате NDJSON.
+
+    Ответ передаётся по мере чтения документов из серверного курсора,
+    соединение с БД занято до конца ответа.
+    """
+    if not is_authorized(request):
+        return JsonResponse(
+            {'detail': 'Invalid API key'}, status=http.HTTPStatus.FORBIDDEN,
+        )
+    using = router.db_for_read(FilmWork)
+    try:
+        connections[using].ensure_connection()
+    except DatabaseError:
+        return JsonResponse(
+            {'detail': 'Database is unavailable'},
+            status=http.HTTPStatus.SERVICE_UNAVAILABLE,
+        )
+    return StreamingHttpResponse(
+        iter_documents(using, settings.FILM_EXPORT_CHUNK_SIZE),
+        content_type='application/x-ndjson',
+    )
+
+
+@require_GET
+def film_changes(request: HttpRequest) -> JsonResponse:
+    """Страница ленты изменений фильмов после отметки.
+
+    Отметка - `updated_at` и `id` из `next` предыдущей страницы, без
+    отметки лента начинается с первого изменения. Фильм может попасть в
+    несколько страниц, удалённый фильм отмечен `deleted`.
+    """
+    if not is_authorized(request):
+        return JsonResponse(
+            {'detail': 'Invalid API key'}, status=http.HTTPStatus.FORBIDDEN,
+        )
+    updated_at = film_id = None
+    try:
+        if request.GET.get('updated_at'):
+            updated_at = parse_datetime(request.GET['updated_at'])
+            if updated_at is None or updated_at.tzinfo is None:
+                raise ValueError
+        if request.GET.get('id'):
+            film_id = uuid.UUID(request.GET['id'])
+        limit = int(
+            request.GET.get('limit', settings.FILM_EXPORT_CHANGES_LIMIT),
+        )
+    except ValueError:
+        return JsonResponse(
+            {'detail': 'Invalid updated_at, id or limit'},
+            status=http.HTTPStatus.BAD_REQUEST,
+        )
+    limit = max(1, min(limit, settings.FILM_EXPORT_CHANGES_LIMIT))
+
+    # Реплика может отставать больше, чем на FILM_EXPORT_CHANGES_LAG, и
+    # пропустить изменение, поэтому лента читается с основной БД.
+    try:
+        changes, more = get_changes(
+            router.db_for_write(FilmWork), updated_at, film_id, limit,
+            settings.FILM_EXPORT_CHANGES_LAG,
+        )
+    except DatabaseError:
+        return JsonResponse(
+            {'detail': 'Database is unavailable'},
+            status=http.HTTPStatus.SERVICE_UNAVAILABLE,
+        )
+    if changes:
+        updated_at, film_id = changes[-1].updated_at, changes[-1].id
+    return JsonResponse({
+        # Время с микросекундами: JsonResponse округлил бы его до
+        # миллисекунд.
+        'results': [
+            {
+                'id': change.id,
+                'updated_at': change.updated_at.isoformat(),
+                'deleted': change.deleted,
+            }
+            for change in changes
+        ],
+        'next': {
+            'updated_at': updated_at and updated_at.isoformat(),
+            'id': film_id,
+        },
+        'more': more,
+    })
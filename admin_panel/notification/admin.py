@@ -1,20 +1,34 @@
+import csv
+from datetime import timedelta
+
 from django.contrib import admin, messages
 from django.contrib.admin.options import csrf_protect_m
 from django.db import OperationalError
+from django.http import HttpResponse
 from django.shortcuts import redirect
+from django.template.response import TemplateResponse
+from django.urls import path
+from django.utils import timezone
 from django.utils.connection import ConnectionDoesNotExist
+from django.utils.translation import gettext_lazy as _
 from django_summernote.admin import SummernoteModelAdmin
 
-from notification.exceptions import SendingToSchedulerExceptions
 from notification.models import (
+    EventDelivery,
     EventNotification,
     Mail,
     NewFilm,
     Notification,
     Schedule,
+    ScheduleOccurrence,
+    ScheduleOutbox,
     Subscribe,
     NotificationTemplate,
+    NotificationType,
 )
+from notification.planner import plan_capacity
+from notification.web_services.scheduler import push_schedules
+from notification.web_services.serialization import serialize_queryset
 from utils.use_db_admin_mixin import UseDbAdminMixin
 
 
@@ -22,6 +36,7 @@ class NotificationModelAdmin(UseDbAdminMixin):
     """Определяем БД для работы."""
 
     using = 'notification_db'
+    estimated_count = True
 
 
 @admin.register(Notification,)
@@ -37,12 +52,149 @@ class ScheduleAdmin(NotificationModelAdmin):
 
     list_display = 'notification',
     list_select_related = True
-
-    def save_model(self, request, obj, form, change):
+    actions = 'push_to_scheduler',
+
+    @admin.action(description=_('Push selected schedules to scheduler'))
+    def push_to_scheduler(self, request, queryset):
+        """Повторная отправка выбранных расписаний планировщику."""
+        failed = []
+        chunks = push_schedules(serialize_queryset(queryset.order_by()))
+        for number, (size, chunk_failed) in enumerate(chunks, start=1):
+            failed.extend(chunk_failed)
+            self.message_user(
+                request,
+                _('Chunk %(number)s: sent %(sent)s of %(size)s') % {
+                    'number': number,
+                    'sent': size - len(chunk_failed),
+                    'size': size,
+                },
+                level=messages.WARNING if chunk_failed else messages.INFO,
+            )
+        if failed:
+            self.message_user(
+                request,
+                _('Not sent: %s') % ', '.join(failed),
+                level=messages.ERROR,
+            )
+
+    def get_urls(self):
+        urls = [
+            path(
+                'capacity/',
+                self.admin_site.admin_view(self.capacity_view),
+                name='notification_schedule_capacity',
+            ),
+        ]
+        return urls + super().get_urls()
+
+    def capacity_view(self, request):
+        """Прогноз количества сообщений в час по каналам."""
+        try:
+            days = max(1, min(int(request.GET.get('days', 30)), 90))
+        except ValueError:
+            days = 30
         try:
-            super().save_model(request, obj, form, change)
-        except SendingToSchedulerExceptions as exc:
-            self.message_user(request, exc.args[0], level=messages.ERROR)
+            start, plan = plan_capacity(days=days, using=self.using)
+        except (ConnectionDoesNotExist, OperationalError):
+            self.message_user(
+                request,
+                message=f'The database "{self.using}" is now unavailable! '
+                        f'Try later!',
+                level=messages.ERROR,
+            )
+            return redirect('/admin')
+
+        channels = sorted(plan)
+        labels = dict(NotificationType.choices)
+        hours = [
+            (
+                start + timedelta(hours=hour),
+                [int(plan[channel][hour]) for channel in channels],
+            )
+            for hour in range(days * 24)
+        ]
+        if request.GET.get('format') == 'csv':
+            response = HttpResponse(content_type='text/csv')
+            response['Content-Disposition'] = (
+                f'attachment; filename="capacity_{start:%Y%m%d%H}.csv"'
+            )
+            writer = csv.writer(response)
+            writer.writerow(['hour', *channels])
+            for hour, volumes in hours:
+                writer.writerow([hour.isoformat(), *volumes])
+            return response
+
+        context = {
+            **self.admin_site.each_context(request),
+            'title': _('Send volume forecast'),
+            'opts': self.model._meta,
+            'days': days,
+            'channels': [labels.get(channel, channel) for channel in channels],
+            'totals': [int(plan[channel].sum()) for channel in channels],
+            'peaks': [int(plan[channel].max()) for channel in channels],
+            'hours': hours,
+        }
+        return TemplateResponse(
+            request, 'admin/notification/schedule/capacity.html', context,
+        )
+
+
+class DueSoonFilter(admin.SimpleListFilter):
+    """Фильтр срабатываний по ближайшему интервалу времени."""
+
+    title = _('Due in')
+    parameter_name = 'due_in'
+
+    def lookups(self, request, model_admin):
+        return (
+            ('1', _('1 hour')),
+            ('24', _('24 hours')),
+            ('168', _('7 days')),
+        )
+
+    def queryset(self, request, queryset):
+        if self.value() in {'1', '24', '168'}:
+            start = timezone.now()
+            return queryset.due(
+                start, start + timedelta(hours=int(self.value())),
+            )
+        return queryset
+
+
+class ViewOnlyAdminMixin:
+    """Записи создаёт и изменяет сервис, в админке их можно только
+    просматривать и удалять."""
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(ScheduleOccurrence)
+class ScheduleOccurrenceAdmin(ViewOnlyAdminMixin, NotificationModelAdmin):
+    """Админка для ближайших срабатываний расписаний."""
+
+    list_display = 'schedule', 'fire_at'
+    list_filter = DueSoonFilter,
+    date_hierarchy = 'fire_at'
+    ordering = 'fire_at',
+    list_select_related = 'schedule__notification',
+    readonly_fields = 'schedule', 'fire_at'
+
+
+@admin.register(ScheduleOutbox)
+class ScheduleOutboxAdmin(ViewOnlyAdminMixin, NotificationModelAdmin):
+    """Админка для недоставленных планировщику расписаний."""
+
+    list_display = (
+        'schedule_id', 'created', 'attempts', 'available_at', 'dead_at',
+    )
+    readonly_fields = (
+        'schedule_id', 'payload', 'attempts', 'available_at', 'last_error',
+        'claimed_until', 'dead_at',
+    )
 
 
 @admin.register(NotificationTemplate)
@@ -66,8 +218,13 @@ class SubscribeAdmin(NotificationModelAdmin):
 class MailAdmin(NotificationModelAdmin):
     """Админка для сообщений для пользователя."""
 
-    list_display = 'email',
+    list_display = 'email', 'created'
     readonly_fields = 'context', 'email', 'created'
+    # Фильтр по дате ограничивает запрос нужными секциями таблицы и, в
+    # отличие от date_hierarchy, не ищет даты по всей таблице.
+    list_filter = ('created', admin.DateFieldListFilter),
+    ordering = '-created',
+    keyset_ordering = '-created'
 
 
 @admin.register(EventNotification)
@@ -78,6 +235,19 @@ class EventNotificationAdmin(NotificationModelAdmin):
     list_select_related = True
 
 
+@admin.register(EventDelivery)
+class EventDeliveryAdmin(NotificationModelAdmin):
+    """Админка для рассылок, запущенных событиями."""
+
+    list_display = 'event', 'destination', 'created'
+    list_filter = 'destination', ('created', admin.DateFieldListFilter)
+    ordering = '-created',
+    keyset_ordering = '-created'
+    readonly_fields = (
+        'event', 'notification_id', 'destination', 'template_id', 'payload',
+    )
+
+
 @admin.register(NewFilm)
 class NewFilmAdmin(NotificationModelAdmin):
     """Админка для новинок фильмов."""
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class NotificationAdminConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'notification'
+
+    def ready(self):
+        from notification import signals  # noqa: F401
@@ -0,0 +1,64 @@
+"""Получатели рассылок."""
+from typing import Iterable, Iterator
+from uuid import UUID
+
+from authentication.models.users import User
+from notification.models import Subscribe
+from utils.iterators import chunked
+
+
+def iter_users(
+        using: str = 'auth_db',
+        chunk_size: int = 5000,
+) -> Iterator[tuple[UUID, str]]:
+    """Все активные пользователи.
+
+    Пользователи читаются серверным курсором пачками по `chunk_size`
+    строк, поэтому расход памяти не зависит от их количества.
+    """
+    return (
+        User.objects.using(using)
+        .filter(disabled=False)
+        .order_by()
+        .values_list('id', 'email')
+        .iterator(chunk_size=chunk_size)
+    )
+
+
+def iter_subscribers(
+        user_ids: Iterable[UUID],
+        using: str = 'auth_db',
+        chunk_size: int = 5000,
+) -> Iterator[tuple[UUID, str]]:
+    """Активные пользователи из списка подписчиков."""
+    for chunk in chunked(user_ids, chunk_size):
+        yield from (
+            User.objects.using(using)
+            .filter(id__in=chunk, disabled=False)
+            .values_list('id', 'email')
+        )
+
+
+def iter_audience(
+        notification_id: UUID,
+        notification_db: str = 'notification_db',
+        auth_db: str = 'auth_db',
+        chunk_size: int = 5000,
+) -> Iterator[tuple[UUID, str]]:
+    """Получатели рассылки: пары (id пользователя, email).
+
+    Если среди подписок есть подписка без пользователя, рассылка идёт
+    всем зарегистрированным пользователям, иначе - только подписчикам.
+    Заблокированные пользователи пропускаются.
+    """
+    subscribes = Subscribe.objects.using(notification_db).filter(
+        notification_id=notification_id,
+    )
+    if subscribes.filter(user_id__isnull=True).exists():
+        yield from iter_users(auth_db, chunk_size)
+        return
+    user_ids = (
+        subscribes.order_by().values_list('user_id', flat=True).distinct()
+        .iterator(chunk_size=chunk_size)
+    )
+    yield from iter_subscribers(user_ids, auth_db, chunk_size)
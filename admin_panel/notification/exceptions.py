@@ -3,3 +3,7 @@
 
 class SendingToSchedulerExceptions(Exception):
     """Ошибка отправки планировщику."""
+
+
+class SchedulerRejectedError(SendingToSchedulerExceptions):
+    """Планировщик отклонил запрос, повтор не поможет."""
@@ -0,0 +1,95 @@
+"""Массовая загрузка сообщений в `notifications.mail` через COPY."""
+import csv
+import io
+import json
+import uuid
+from itertools import islice
+from typing import IO, Iterable, Iterator
+
+from django.db import connections, transaction
+from django.utils import timezone
+
+from notification.models import Mail
+
+COPY_COLUMNS = 'id', 'created', 'context', 'email'
+COPY_ESCAPES = str.maketrans({
+    '\\': '\\\\',
+    '\t': '\\t',
+    '\n': '\\n',
+    '\r': '\\r',
+})
+
+
+def escape(value) -> str:
+    """Значение в текстовом формате COPY."""
+    return str(value).translate(COPY_ESCAPES)
+
+
+def read_ndjson(stream: IO) -> Iterator[dict]:
+    """Сообщения из потока NDJSON, по одному объекту в строке."""
+    for line in stream:
+        if line.strip():
+            yield json.loads(line)
+
+
+def read_csv(stream: IO) -> Iterator[dict]:
+    """Сообщения из потока CSV с заголовком."""
+    yield from csv.DictReader(stream)
+
+
+def build_chunk(records: Iterable[dict]) -> tuple[io.StringIO, int]:
+    """Буфер COPY для пачки сообщений.
+
+    Идентификатор и время создания генерируются на клиенте, если не
+    переданы в записи. Все значения экранируются одинаково, поэтому
+    переданные в записи значения не могут сдвинуть столбцы или строки.
+    """
+    buffer = io.StringIO()
+    now = timezone.now().isoformat()
+    rows = 0
+    for record in records:
+        values = (
+            record.get('id') or uuid.uuid4(),
+            record.get('created') or now,
+            record['context'],
+            record['email'],
+        )
+        buffer.write('\t'.join(map(escape, values)) + '\n')
+        rows += 1
+    buffer.seek(0)
+    return buffer, rows
+
+
+def copy_mails(
+        records: Iterable[dict],
+        using: str = 'notification_db',
+        chunk_size: int = 10000,
+) -> Iterator[int]:
+    """Загрузка сообщений пачками через `COPY ... FROM STDIN`.
+
+    В памяти одновременно находится не больше одной пачки, каждая пачка
+    загружается в отдельной транзакции.
+
+    Args:
+        records: сообщения с ключами `email`, `context` и, необязательно,
+            `id` и `created`;
+        using: БД рассылок;
+        chunk_size: размер пачки.
+
+    Yields:
+        количество загруженных строк каждой пачки.
+    """
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    statement = (
+        f'COPY {quote(Mail._meta.db_table)} '
+        f'({", ".join(COPY_COLUMNS)}) FROM STDIN'
+    )
+    records = iter(records)
+    while True:
+        buffer, rows = build_chunk(islice(records, chunk_size))
+        if not rows:
+            return
+        with transaction.atomic(using=using), connection.cursor() as cursor:
+            cursor.copy_expert(statement, buffer)
+        yield rows
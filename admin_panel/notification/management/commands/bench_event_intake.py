@@ -0,0 +1,57 @@
+"""Нагрузочный тест приёма событий."""
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Отправка пачек событий на endpoint приёма с замером скорости.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--url', default='http://127.0.0.1:8000/api/v1/events/',
+        )
+        parser.add_argument('--event', default='film.released')
+        parser.add_argument('--events', type=int, default=100_000)
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--concurrency', type=int, default=8)
+
+    def handle(self, *args, **options):
+        local = threading.local()
+        line = json.dumps({'event': options['event'], 'payload': {'n': 1}})
+        body = '\n'.join([line] * options['batch_size']).encode()
+        headers = {
+            'Content-Type': 'application/x-ndjson',
+            'X-Api-Key': settings.EVENT_INTAKE_TOKEN,
+        }
+        latencies = []
+
+        def send(_):
+            if not hasattr(local, 'session'):
+                local.session = requests.Session()
+            started = time.perf_counter()
+            response = local.session.post(
+                options['url'], data=body, headers=headers,
+            )
+            latencies.append(time.perf_counter() - started)
+            return response.status_code
+
+        batches = options['events'] // options['batch_size']
+        started = time.perf_counter()
+        with ThreadPoolExecutor(options['concurrency']) as pool:
+            statuses = list(pool.map(send, range(batches)))
+        elapsed = time.perf_counter() - started
+
+        latencies.sort()
+        accepted = statuses.count(202)
+        self.stdout.write(
+            f'{accepted}/{batches} batches accepted, '
+            f'{accepted * options["batch_size"] / elapsed:.0f} events/s, '
+            f'p50 {latencies[len(latencies) // 2] * 1000:.0f} ms, '
+            f'p99 {latencies[int(len(latencies) * 0.99)] * 1000:.0f} ms'
+        )
@@ -0,0 +1,55 @@
+"""Замер скорости массовой загрузки сообщений."""
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from notification.ingestion import copy_mails
+from notification.models import Mail
+
+
+class Command(BaseCommand):
+    help = (
+        'Загрузка синтетических сообщений через COPY с замером скорости. '
+        'Каждая пачка фиксируется отдельно, как при загрузке, по умолчанию '
+        'загруженные строки затем удаляются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1_000_000)
+        parser.add_argument('--chunk-size', type=int, default=10000)
+        parser.add_argument('--database', default='notification_db')
+        parser.add_argument(
+            '--keep', action='store_true',
+            help='Не удалять загруженные строки.',
+        )
+
+    def handle(self, *args, **options):
+        using = options['database']
+        # Домен адресов отличает строки замера от остальных сообщений.
+        domain = f'bench-{uuid.uuid4().hex[:12]}.example.com'
+        records = (
+            {
+                'email': f'user{number}@{domain}',
+                'context': f'Digest #{number}\n<p>Hello!</p>',
+            }
+            for number in range(options['rows'])
+        )
+        created = timezone.now()
+        total = 0
+        started = time.perf_counter()
+        try:
+            for rows in copy_mails(
+                    records, using=using, chunk_size=options['chunk_size'],
+            ):
+                total += rows
+            elapsed = time.perf_counter() - started
+        finally:
+            if not options['keep']:
+                Mail.objects.using(using).filter(
+                    created__gte=created, email__endswith=f'@{domain}',
+                ).delete()
+        self.stdout.write(
+            f'{total} rows in {elapsed:.2f}s: {total / elapsed:.0f} rows/s'
+        )
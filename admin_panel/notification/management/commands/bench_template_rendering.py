@@ -0,0 +1,58 @@
+"""Замер скорости подготовки сообщений по шаблону."""
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+
+from notification.models import NotificationTemplate
+
+TEMPLATE = """
+<h1>{{ first_name|default:"Зритель" }}, новинки недели</h1>
+<p>Мы подобрали для вас {{ films|length }} фильмов:</p>
+<ul>{% for film in films %}<li>{{ film }}</li>{% endfor %}</ul>
+<p><a href="https://example.com/unsubscribe/{{ user_id }}">Отписаться</a></p>
+"""
+
+
+class Command(BaseCommand):
+    help = 'Подготовка сообщений для синтетических получателей.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--recipients', type=int, default=100_000)
+        parser.add_argument('--processes', type=int, default=0)
+        parser.add_argument('--chunk-size', type=int, default=1000)
+        parser.add_argument(
+            '--template-id',
+            help='Шаблон из БД вместо синтетического.',
+        )
+        parser.add_argument('--database', default='notification_db')
+
+    def handle(self, *args, **options):
+        if options['template_id']:
+            template = NotificationTemplate.objects.using(
+                options['database'],
+            ).get(pk=options['template_id'])
+        else:
+            template = NotificationTemplate(
+                subject='{{ first_name }}, новинки недели',
+                template=TEMPLATE,
+            )
+        contexts = (
+            {
+                'user_id': uuid.uuid4(),
+                'first_name': f'<User {number}>',
+                'films': [f'Film {number % 7}', f'Film {number % 11}'],
+            }
+            for number in range(options['recipients'])
+        )
+        started = time.perf_counter()
+        rendered = sum(1 for _ in template.render_batch(
+            contexts,
+            processes=options['processes'],
+            chunk_size=options['chunk_size'],
+        ))
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f'{rendered} messages in {elapsed:.2f}s: '
+            f'{rendered / elapsed:.0f} renders/s'
+        )
@@ -0,0 +1,59 @@
+"""Диспетчер исходящих сообщений планировщику."""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from notification.outbox import dispatch_batch
+from notification.web_services.scheduler import get_client
+
+
+class Command(BaseCommand):
+    help = 'Доставка изменений расписаний планировщику.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='notification_db')
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument(
+            '--interval', type=float, default=1.0,
+            help='Пауза между опросами пустой очереди, в секундах.',
+        )
+        parser.add_argument(
+            '--max-delay', type=float, default=300,
+            help='Максимальная задержка повторной доставки, в секундах.',
+        )
+        parser.add_argument(
+            '--max-attempts', type=int, default=10,
+            help='После скольких неудачных попыток не доставлять запись.',
+        )
+        parser.add_argument(
+            '--lease', type=float, default=300,
+            help='На сколько секунд захватывается пачка, в секундах.',
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Разобрать очередь и завершиться.',
+        )
+
+    def handle(self, *args, **options):
+        request_time = get_client().max_request_time
+        if options['lease'] <= request_time:
+            raise CommandError(
+                f'--lease must be longer than a scheduler request with '
+                f'retries ({request_time:.1f}s)'
+            )
+        while True:
+            sent, failed = dispatch_batch(
+                using=options['database'],
+                batch_size=options['batch_size'],
+                max_delay=options['max_delay'],
+                max_attempts=options['max_attempts'],
+                lease=options['lease'],
+            )
+            if sent or failed:
+                self.stdout.write(f'Sent: {sent}, postponed: {failed}')
+            # Пачка меньше размера и тогда, когда часть записей вытеснена
+            # более новыми, поэтому пауза - только после пустой пачки.
+            if not sent + failed:
+                if options['once']:
+                    return
+                time.sleep(options['interval'])
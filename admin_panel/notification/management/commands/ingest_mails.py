@@ -0,0 +1,43 @@
+"""Массовая загрузка сообщений из файла."""
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+
+from notification.ingestion import copy_mails, read_csv, read_ndjson
+
+READERS = {'ndjson': read_ndjson, 'csv': read_csv}
+
+
+class Command(BaseCommand):
+    help = 'Загрузка сообщений из NDJSON или CSV в notifications.mail.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Путь к файлу, "-" - stdin.')
+        parser.add_argument('--format', choices=READERS, default='ndjson')
+        parser.add_argument('--database', default='notification_db')
+        parser.add_argument('--chunk-size', type=int, default=10000)
+
+    def handle(self, *args, **options):
+        if options['path'] == '-':
+            self.ingest(sys.stdin, options)
+        else:
+            with open(options['path'], encoding='utf-8', newline='') as stream:
+                self.ingest(stream, options)
+
+    def ingest(self, stream, options):
+        records = READERS[options['format']](stream)
+        started = time.perf_counter()
+        total = 0
+        for rows in copy_mails(
+                records,
+                using=options['database'],
+                chunk_size=options['chunk_size'],
+        ):
+            total += rows
+            self.stdout.write(f'Loaded: {total}')
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f'Done: {total} rows in {elapsed:.1f}s '
+            f'({total / elapsed if elapsed else 0:.0f} rows/s)'
+        )
@@ -0,0 +1,39 @@
+"""Обслуживание секций таблицы сообщений."""
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from notification.partitions import maintain_partitions
+
+
+class Command(BaseCommand):
+    help = 'Создание будущих и отключение устаревших секций таблицы mail.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='notification_db')
+        parser.add_argument(
+            '--months-ahead', type=int,
+            default=settings.MAIL_PARTITIONS_AHEAD,
+            help='На сколько месяцев вперёд создавать секции.',
+        )
+        parser.add_argument(
+            '--retention', type=int,
+            default=settings.MAIL_RETENTION_MONTHS,
+            help='Сколько месяцев хранить сообщения, 0 - хранить всё.',
+        )
+        parser.add_argument(
+            '--drop', action='store_true',
+            help='Удалять устаревшие секции, а не только отключать.',
+        )
+
+    def handle(self, *args, **options):
+        created, expired = maintain_partitions(
+            using=options['database'],
+            months_ahead=options['months_ahead'],
+            retention=options['retention'],
+            drop=options['drop'],
+        )
+        action = 'dropped' if options['drop'] else 'detached'
+        self.stdout.write(
+            f'Created: {", ".join(created) or "-"}; '
+            f'{action}: {", ".join(expired) or "-"}'
+        )
@@ -0,0 +1,58 @@
+"""Пересчёт срабатываний расписаний на скользящем горизонте."""
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from notification.models import Schedule, ScheduleOccurrence
+from notification.web_services.serialization import get_plan
+from utils.iterators import chunked
+
+
+class Command(BaseCommand):
+    help = 'Дополнение таблицы срабатываний расписаний до горизонта.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='notification_db')
+        parser.add_argument(
+            '--horizon', type=int,
+            default=settings.SCHEDULE_OCCURRENCE_HORIZON,
+            help='Горизонт расчёта срабатываний, в часах.',
+        )
+        parser.add_argument('--chunk-size', type=int, default=1000)
+        parser.add_argument(
+            '--interval', type=float, default=0,
+            help='Повторять пересчёт с указанной паузой, в секундах.',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            self.refresh(
+                options['database'], options['horizon'], options['chunk_size'],
+            )
+            if not options['interval']:
+                return
+            time.sleep(options['interval'])
+
+    def refresh(self, using: str, horizon: int, chunk_size: int):
+        start = timezone.now()
+        end = start + timedelta(hours=horizon)
+        occurrences = ScheduleOccurrence.objects.using(using)
+        deleted, _ = occurrences.filter(fire_at__lt=start).delete()
+
+        rows = (
+            Schedule.objects.using(using)
+            .values(*get_plan(Schedule).columns)
+            .iterator(chunk_size=chunk_size)
+        )
+        total = 0
+        for chunk in chunked(rows, chunk_size):
+            total += occurrences.bulk_fill(
+                [(row['id'], row) for row in chunk], start, end,
+            )
+        self.stdout.write(
+            f'Occurrences till {end:%Y-%m-%d %H:%M}: {total}, '
+            f'expired: {deleted}'
+        )
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-18 12:29
+
+from django.db import migrations, models
+import django.utils.timezone
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notification', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScheduleOutbox',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('schedule_id', models.UUIDField(verbose_name='Schedule')),
+                ('payload', models.JSONField(verbose_name='Payload')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Attempts')),
+                ('available_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Available at')),
+                ('last_error', models.TextField(blank=True, verbose_name='Last error')),
+            ],
+            options={
+                'verbose_name': 'Schedule outbox',
+                'verbose_name_plural': 'Schedule outbox',
+                'db_table': 'notifications"."schedule_outbox',
+                'indexes': [models.Index(fields=['available_at', 'created'], name='schedule_outbox_available')],
+            },
+        ),
+    ]
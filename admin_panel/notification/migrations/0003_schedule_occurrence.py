@@ -0,0 +1,32 @@
+# Generated by Django 4.2.7 on 2026-10-18 12:31
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notification', '0002_schedule_outbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScheduleOccurrence',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('fire_at', models.DateTimeField(verbose_name='Fire at')),
+                ('schedule', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='occurrences', to='notification.schedule', verbose_name='Schedule')),
+            ],
+            options={
+                'verbose_name': 'Schedule occurrence',
+                'verbose_name_plural': 'Schedule occurrences',
+                'db_table': 'notifications"."schedule_occurrence',
+                'indexes': [models.Index(fields=['fire_at'], name='schedule_occurrence_fire')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='scheduleoccurrence',
+            constraint=models.UniqueConstraint(fields=('schedule', 'fire_at'), name='schedule_occurrence_unique'),
+        ),
+    ]
@@ -0,0 +1,77 @@
+from django.db import migrations, models
+
+PARTITION_MAIL = """
+ALTER TABLE notifications.mail RENAME TO mail_legacy;
+ALTER TABLE notifications.mail_legacy RENAME CONSTRAINT mail_pkey TO mail_legacy_pkey;
+
+CREATE TABLE notifications.mail (
+    id uuid NOT NULL,
+    created timestamp with time zone NOT NULL,
+    context text NOT NULL,
+    email varchar(254) NOT NULL,
+    PRIMARY KEY (id, created)
+) PARTITION BY RANGE (created);
+CREATE INDEX mail_created ON notifications.mail (created);
+CREATE TABLE notifications.mail_default PARTITION OF notifications.mail DEFAULT;
+
+DO $$
+DECLARE
+    month date;
+BEGIN
+    FOR month IN
+        SELECT generate_series(
+            date_trunc('month', coalesce(legacy.first, now())),
+            date_trunc('month', now()) + interval '3 months',
+            interval '1 month'
+        )::date
+        FROM (SELECT min(created) AS first FROM notifications.mail_legacy) AS legacy
+    LOOP
+        EXECUTE format(
+            'CREATE TABLE notifications.%I PARTITION OF notifications.mail '
+            'FOR VALUES FROM (%L) TO (%L)',
+            'mail_p' || to_char(month, 'YYYY_MM'),
+            month,
+            month + interval '1 month'
+        );
+    END LOOP;
+END $$;
+
+INSERT INTO notifications.mail (id, created, context, email)
+SELECT id, created, context, email FROM notifications.mail_legacy;
+DROP TABLE notifications.mail_legacy;
+"""
+
+UNPARTITION_MAIL = """
+CREATE TABLE notifications.mail_plain (
+    id uuid NOT NULL PRIMARY KEY,
+    created timestamp with time zone NOT NULL,
+    context text NOT NULL,
+    email varchar(254) NOT NULL
+);
+INSERT INTO notifications.mail_plain (id, created, context, email)
+SELECT id, created, context, email FROM notifications.mail;
+DROP TABLE notifications.mail;
+ALTER TABLE notifications.mail_plain RENAME TO mail;
+ALTER TABLE notifications.mail RENAME CONSTRAINT mail_plain_pkey TO mail_pkey;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notification', '0003_schedule_occurrence'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(PARTITION_MAIL, UNPARTITION_MAIL),
+            ],
+            state_operations=[
+                migrations.AddIndex(
+                    model_name='mail',
+                    index=models.Index(fields=['created'], name='mail_created'),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.7 on 2026-10-18 12:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notification', '0004_mail_partitioning'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventRoutingVersion',
+            fields=[
+                ('id', models.PositiveSmallIntegerField(default=1, primary_key=True, serialize=False)),
+                ('version', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'notifications"."event_routing_version',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='eventnotification',
+            index=models.Index(fields=['event'], name='event_notification_event'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.7 on 2026-10-18 12:39
+
+from django.db import migrations, models
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notification', '0005_event_routing'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventDelivery',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('event', models.CharField(max_length=255, verbose_name='Event')),
+                ('notification_id', models.UUIDField(verbose_name='Notification')),
+                ('destination', models.CharField(max_length=64, verbose_name='Destination')),
+                ('template_id', models.UUIDField(blank=True, null=True, verbose_name='Template')),
+                ('payload', models.JSONField(blank=True, default=dict, verbose_name='Payload')),
+            ],
+            options={
+                'verbose_name': 'Event delivery',
+                'verbose_name_plural': 'Event deliveries',
+                'db_table': 'notifications"."event_delivery',
+                'indexes': [models.Index(fields=['created'], name='event_delivery_created')],
+            },
+        ),
+    ]
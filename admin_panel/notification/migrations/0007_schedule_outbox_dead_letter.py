@@ -0,0 +1,35 @@
+# Generated by Django 4.2.7 on 2026-10-18 13:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notification', '0006_event_delivery'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='scheduleoutbox',
+            name='schedule_outbox_available',
+        ),
+        migrations.AddField(
+            model_name='scheduleoutbox',
+            name='claimed_until',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Claimed until'),
+        ),
+        migrations.AddField(
+            model_name='scheduleoutbox',
+            name='dead_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Dead at'),
+        ),
+        migrations.AddIndex(
+            model_name='scheduleoutbox',
+            index=models.Index(condition=models.Q(('dead_at__isnull', True)), fields=['available_at', 'created'], name='schedule_outbox_available'),
+        ),
+        migrations.AddIndex(
+            model_name='scheduleoutbox',
+            index=models.Index(fields=['schedule_id', 'created'], name='schedule_outbox_schedule'),
+        ),
+    ]
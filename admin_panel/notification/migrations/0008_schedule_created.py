@@ -0,0 +1,37 @@
+# Generated by Django 4.2.7 on 2026-10-18 13:30
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+def delete_unanchored_occurrences(apps, schema_editor):
+    """Срабатывания правил без dtstart были отсчитаны от момента расчёта,
+    их заново рассчитает refresh_schedule_occurrences."""
+    ScheduleOccurrence = apps.get_model('notification', 'ScheduleOccurrence')
+    ScheduleOccurrence.objects.using(schema_editor.connection.alias).filter(
+        schedule__dtstart__isnull=True, schedule__freq__isnull=False,
+    ).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notification', '0007_schedule_outbox_dead_letter'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='schedule',
+            name='created',
+            field=models.DateTimeField(auto_now_add=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AlterField(
+            model_name='schedule',
+            name='dtstart',
+            field=models.DateTimeField(blank=True, help_text='The recurrence start. Besides being the base for the recurrence, missing parameters in the final recurrence instances will also be extracted from this date. If not given, the schedule creation time will be used instead', null=True),
+        ),
+        migrations.RunPython(
+            delete_unanchored_occurrences, migrations.RunPython.noop,
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-18 16:10
+
+from django.db import migrations, models
+from django.db.models.functions import Trunc
+
+
+def fill_dtstart(apps, schema_editor):
+    """Начало повторения правил без dtstart - время создания расписания,
+    от которого уже рассчитаны их срабатывания."""
+    Schedule = apps.get_model('notification', 'Schedule')
+    Schedule.objects.using(schema_editor.connection.alias).filter(
+        dtstart__isnull=True, freq__isnull=False,
+    ).update(dtstart=Trunc('created', 'second'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notification', '0008_schedule_created'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_dtstart, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='schedule',
+            name='created',
+        ),
+        migrations.AlterField(
+            model_name='schedule',
+            name='dtstart',
+            field=models.DateTimeField(blank=True, help_text='The recurrence start. Besides being the base for the recurrence, missing parameters in the final recurrence instances will also be extracted from this date. If not given, datetime.now() will be used instead', null=True),
+        ),
+    ]
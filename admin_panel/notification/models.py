@@ -1,10 +1,21 @@
+import logging
 import uuid
+from datetime import timedelta
 
+from django.conf import settings
 from django.contrib.postgres.fields import ArrayField
-from django.db import models
+from django.core.exceptions import ValidationError
+from django.db import models, router, transaction
+from django.db.models import Count, Max
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
-from notification.web_services.scheduler import send_notification
+from notification import rendering
+from notification.recurrence import build_rule, iter_occurrences
+from notification.web_services.serialization import get_field_values, get_plan
+from utils.iterators import chunked
+
+logger = logging.getLogger(__name__)
 
 
 class UUIDMixin(models.Model):
@@ -223,13 +234,201 @@ class Schedule(UUIDMixin):
     def __str__(self):
         return self.notification.name
 
+    def clean(self):
+        super().clean()
+        try:
+            build_rule(get_plan(Schedule).raw(self))
+        except ValueError as exc:
+            raise ValidationError(_('Invalid recurrence rule: %s') % exc)
+
     def save(
             self, force_insert=False, force_update=False,
             using=None, update_fields=None,
     ):
-        super().save(force_insert, force_update, using, update_fields)
-        # Отправляем данные планировщику
-        send_notification(self)
+        using = using or router.db_for_write(self.__class__, instance=self)
+        if self.freq and self.dtstart is None:
+            # Начало повторения фиксируется при сохранении, чтобы
+            # планировщик и срабатывания в админке отсчитывали правило от
+            # одного момента.
+            self.dtstart = timezone.now().replace(microsecond=0)
+            if update_fields is not None:
+                update_fields = {*update_fields, 'dtstart'}
+        with transaction.atomic(using=using):
+            super().save(force_insert, force_update, using, update_fields)
+            # Данные планировщику отправит диспетчер исходящих сообщений
+            ScheduleOutbox.objects.using(using).create(
+                schedule_id=self.id,
+                payload=get_field_values(self),
+            )
+            ScheduleOccurrence.objects.using(using).refresh(self)
+
+
+class ScheduleOutbox(UUIDMixin, TimeStampedMixin):
+    """Исходящие сообщения для планировщика.
+
+    Запись создаётся в одной транзакции с расписанием и удаляется
+    диспетчером после доставки или после доставки более новой записи
+    того же расписания. Идентификатор записи передаётся планировщику
+    как ключ идемпотентности. Отклонённая планировщиком запись и запись,
+    попытки доставки которой исчерпаны, остаются с `dead_at`.
+    """
+
+    schedule_id = models.UUIDField(_('Schedule'))
+    payload = models.JSONField(_('Payload'))
+    attempts = models.PositiveIntegerField(_('Attempts'), default=0)
+    available_at = models.DateTimeField(
+        _('Available at'),
+        default=timezone.now,
+    )
+    last_error = models.TextField(_('Last error'), blank=True)
+    # До какого времени запись отправляет диспетчер.
+    claimed_until = models.DateTimeField(
+        _('Claimed until'), null=True, blank=True,
+    )
+    dead_at = models.DateTimeField(_('Dead at'), null=True, blank=True)
+
+    class Meta:
+        db_table = 'notifications"."schedule_outbox'
+        verbose_name = _('Schedule outbox')
+        verbose_name_plural = _('Schedule outbox')
+        indexes = [
+            models.Index(
+                fields=['available_at', 'created'],
+                name='schedule_outbox_available',
+                condition=models.Q(dead_at__isnull=True),
+            ),
+            models.Index(
+                fields=['schedule_id', 'created'],
+                name='schedule_outbox_schedule',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.schedule_id} - {self.created}'
+
+
+class ScheduleOccurrenceQuerySet(models.QuerySet):
+    """Запросы к срабатываниям расписаний."""
+
+    def due(self, start=None, end=None):
+        """Срабатывания в интервале [start, end)."""
+        queryset = self.filter(fire_at__gte=start or timezone.now())
+        if end is not None:
+            queryset = queryset.filter(fire_at__lt=end)
+        return queryset.order_by('fire_at')
+
+    def refresh(self, schedule: 'Schedule', start=None, end=None):
+        """Пересчёт будущих срабатываний расписания.
+
+        Args:
+            schedule: расписание;
+            start: начало интервала, по умолчанию текущий момент;
+            end: конец интервала, по умолчанию начало плюс горизонт.
+        """
+        start = start or timezone.now()
+        end = end or start + timedelta(
+            hours=settings.SCHEDULE_OCCURRENCE_HORIZON,
+        )
+        self.filter(schedule=schedule, fire_at__gte=start).delete()
+        self.bulk_fill(
+            [(schedule.id, get_plan(Schedule).raw(schedule))],
+            start,
+            end,
+        )
+
+    def bulk_fill(self, schedules, start, end, batch_size: int = 5000):
+        """Добавление срабатываний расписаний в интервале [start, end].
+
+        Срабатывания расписания, у которого в интервале уже есть
+        сохранённые срабатывания, рассчитываются после последнего из них,
+        всего в интервале - не больше `SCHEDULE_OCCURRENCE_LIMIT`.
+        Срабатывания вставляются пачками по мере расчёта. Расписания с
+        некорректным правилом повторения пропускаются.
+
+        Args:
+            schedules: пары (id расписания, значения полей расписания);
+            start: начало интервала;
+            end: конец интервала;
+            batch_size: размер пачки вставки.
+
+        Returns:
+            количество рассчитанных срабатываний.
+        """
+        schedules = list(schedules)
+        materialized = {
+            row['schedule_id']: (row['last'], row['total'])
+            for row in self.filter(
+                schedule_id__in=[schedule_id for schedule_id, _ in schedules],
+                fire_at__gte=start,
+            )
+            .order_by()
+            .values('schedule_id')
+            .annotate(last=Max('fire_at'), total=Count('id'))
+        }
+        total = 0
+        for batch in chunked(
+                self._iter_new(schedules, materialized, start, end),
+                batch_size,
+        ):
+            self.bulk_create(batch, ignore_conflicts=True)
+            total += len(batch)
+        return total
+
+    @staticmethod
+    def _iter_new(schedules, materialized, start, end):
+        """Ещё не сохранённые срабатывания расписаний."""
+        for schedule_id, values in schedules:
+            last, count = materialized.get(schedule_id, (None, 0))
+            limit = settings.SCHEDULE_OCCURRENCE_LIMIT - count
+            if limit <= 0:
+                continue
+            try:
+                fire_times = iter_occurrences(
+                    values, last or start, end, limit, inc=last is None,
+                )
+                for fire_at in fire_times:
+                    yield ScheduleOccurrence(
+                        schedule_id=schedule_id, fire_at=fire_at,
+                    )
+            except ValueError as exc:
+                logger.warning('Schedule %s skipped: %s', schedule_id, exc)
+
+
+class ScheduleOccurrence(models.Model):
+    """Срабатывание расписания рассылки.
+
+    Таблица хранит срабатывания расписаний на скользящем горизонте, чтобы
+    вопросы вида "что будет отправлено в ближайшие N часов" решались
+    поиском по индексу, а не разворачиванием всех правил повторения.
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    schedule = models.ForeignKey(
+        Schedule,
+        on_delete=models.CASCADE,
+        related_name='occurrences',
+        verbose_name=_('Schedule'),
+    )
+    fire_at = models.DateTimeField(_('Fire at'))
+
+    objects = ScheduleOccurrenceQuerySet.as_manager()
+
+    class Meta:
+        db_table = 'notifications"."schedule_occurrence'
+        verbose_name = _('Schedule occurrence')
+        verbose_name_plural = _('Schedule occurrences')
+        indexes = [
+            models.Index(fields=['fire_at'], name='schedule_occurrence_fire'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['schedule', 'fire_at'],
+                name='schedule_occurrence_unique',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.schedule_id} - {self.fire_at}'
 
 
 class Subscribe(UUIDMixin):
@@ -267,9 +466,26 @@ class NotificationTemplate(UUIDMixin):
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # Сбрасываем скомпилированные версии шаблона
+        rendering.cache.invalidate(self.id)
+
+    def delete(self, *args, **kwargs):
+        rendering.cache.invalidate(self.id)
+        return super().delete(*args, **kwargs)
+
+    def render_batch(self, contexts, **kwargs):
+        """Тема и текст сообщения для каждого получателя."""
+        return rendering.render_batch(self, contexts, **kwargs)
+
 
 class Mail(UUIDMixin, TimeStampedMixin):
-    """Сообщение для пользователя."""
+    """Сообщение для пользователя.
+
+    Таблица секционирована по месяцам по полю `created`, первичный ключ в
+    БД - (id, created). Секциями управляет команда `manage_mail_partitions`.
+    """
 
     context = models.TextField(blank=False, null=False)
     email = models.EmailField(_('Email'))
@@ -278,6 +494,9 @@ class Mail(UUIDMixin, TimeStampedMixin):
         db_table = 'notifications"."mail'
         verbose_name = _('Mail')
         verbose_name_plural = _('Mails')
+        indexes = [
+            models.Index(fields=['created'], name='mail_created'),
+        ]
 
     def __str__(self):
         return f'{self.email} - {self.created}'
@@ -293,6 +512,66 @@ class EventNotification(UUIDMixin):
         db_table = 'notifications"."event_notification'
         verbose_name = _('Event Notification')
         verbose_name_plural = _('Events Notifications')
+        indexes = [
+            models.Index(fields=['event'], name='event_notification_event'),
+        ]
+
+
+class EventDelivery(UUIDMixin, TimeStampedMixin):
+    """Рассылка, запущенная событием стороннего сервиса."""
+
+    event = models.CharField(_('Event'), max_length=255)
+    notification_id = models.UUIDField(_('Notification'))
+    destination = models.CharField(_('Destination'), max_length=64)
+    template_id = models.UUIDField(_('Template'), null=True, blank=True)
+    payload = models.JSONField(_('Payload'), default=dict, blank=True)
+
+    class Meta:
+        db_table = 'notifications"."event_delivery'
+        verbose_name = _('Event delivery')
+        verbose_name_plural = _('Event deliveries')
+        indexes = [
+            models.Index(fields=['created'], name='event_delivery_created'),
+        ]
+
+    def __str__(self):
+        return f'{self.event} - {self.created}'
+
+
+class EventRoutingVersion(models.Model):
+    """Версия таблицы маршрутизации событий.
+
+    Увеличивается при каждом изменении связок событий, рассылок и
+    шаблонов, по ней процессы узнают, что их индекс маршрутизации устарел.
+    """
+
+    id = models.PositiveSmallIntegerField(primary_key=True, default=1)
+    version = models.BigIntegerField(default=0)
+
+    class Meta:
+        db_table = 'notifications"."event_routing_version'
+
+    @classmethod
+    def get(cls, using: str) -> int:
+        """Текущая версия."""
+        version = (
+            cls.objects.using(using)
+            .filter(pk=1)
+            .values_list('version', flat=True)
+            .first()
+        )
+        return version or 0
+
+    @classmethod
+    def bump(cls, using: str):
+        """Увеличение версии."""
+        updated = cls.objects.using(using).filter(pk=1).update(
+            version=models.F('version') + 1,
+        )
+        if not updated:
+            cls.objects.using(using).get_or_create(
+                pk=1, defaults={'version': 1},
+            )
 
 
 class NewFilm(UUIDMixin, TimeStampedMixin):
@@ -0,0 +1,163 @@
+"""Доставка исходящих сообщений планировщику."""
+import logging
+from datetime import timedelta
+
+from django.db import connections, transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from notification.exceptions import (
+    SchedulerRejectedError,
+    SendingToSchedulerExceptions,
+)
+from notification.models import ScheduleOutbox
+from notification.web_services.scheduler import get_client, push_schedule
+
+logger = logging.getLogger(__name__)
+
+# Ключ блокировки, под которой диспетчеры по очереди захватывают записи.
+CLAIM_LOCK = 0x6f7574626f78
+
+
+def retry_delay(attempts: int, max_delay: float) -> timedelta:
+    """Задержка перед следующей попыткой доставки."""
+    return timedelta(seconds=min(2 ** attempts, max_delay))
+
+
+def claim_batch(using: str, batch_size: int, lease: float) -> list:
+    """Захват пачки записей для доставки.
+
+    Записи расписания, более новая запись которого уже есть, удаляются:
+    планировщику отправляется только последнее состояние расписания.
+    Расписания, запись которых доставляет другой диспетчер, пропускаются,
+    пока не истечёт его захват, поэтому записи одного расписания не
+    доставляются одновременно и не в порядке создания.
+    """
+    with transaction.atomic(using=using):
+        # Захваты выполняются по очереди: пока транзакция захвата не
+        # зафиксирована, другой диспетчер не видит её claimed_until и мог
+        # бы захватить другую запись того же расписания. Транзакция
+        # короткая, а skip_locked пропускает записи, которые в это время
+        # удаляют или откладывают завершающие доставку диспетчеры.
+        with connections[using].cursor() as cursor:
+            cursor.execute('SELECT pg_advisory_xact_lock(%s)', [CLAIM_LOCK])
+        now = timezone.now()
+        outbox = ScheduleOutbox.objects.using(using)
+        batch = list(
+            outbox.select_for_update(skip_locked=True)
+            .filter(dead_at__isnull=True, available_at__lte=now)
+            .exclude(
+                schedule_id__in=outbox.filter(
+                    claimed_until__gt=now,
+                ).values('schedule_id'),
+            )
+            .order_by('created')[:batch_size]
+        )
+        if not batch:
+            return []
+
+        superseded = set(
+            outbox.filter(
+                schedule_id__in={message.schedule_id for message in batch},
+            )
+            .filter(Exists(outbox.filter(
+                schedule_id=OuterRef('schedule_id'),
+                created__gt=OuterRef('created'),
+            )))
+            .values_list('id', flat=True)
+        )
+        if superseded:
+            outbox.filter(id__in=superseded).delete()
+        claimed = [
+            message for message in batch if message.id not in superseded
+        ]
+        claimed_until = now + timedelta(seconds=lease)
+        outbox.filter(id__in=[message.id for message in claimed]).update(
+            claimed_until=claimed_until, available_at=claimed_until,
+        )
+    for message in claimed:
+        message.claimed_until = message.available_at = claimed_until
+    return claimed
+
+
+def dispatch_batch(
+        using: str = 'notification_db',
+        batch_size: int = 100,
+        max_delay: float = 300,
+        max_attempts: int = 10,
+        lease: float = 300,
+) -> tuple[int, int]:
+    """Доставка очередной пачки исходящих сообщений.
+
+    Записи захватываются на `lease` секунд в отдельной транзакции, а
+    отправляются после её фиксации, без блокировок строк. Если диспетчер
+    не завершит доставку, записи снова станут доступны после захвата.
+    Запись отправляется, только если запрос к планировщику со всеми
+    повторами успеет завершиться до окончания захвата, иначе она и
+    остальные записи пачки сразу возвращаются в очередь: после захвата
+    их может отправить другой диспетчер, и более старая запись
+    расписания не должна прийти планировщику позже более новой.
+
+    Args:
+        using: БД с таблицей исходящих сообщений;
+        batch_size: размер пачки;
+        max_delay: максимальная задержка повторной доставки, в секундах;
+        max_attempts: после скольких неудачных попыток запись больше не
+            доставляется;
+        lease: на сколько секунд захватываются записи пачки.
+
+    Returns:
+        количество доставленных и недоставленных сообщений.
+    """
+    batch = claim_batch(using, batch_size, lease)
+    request_time = timedelta(seconds=get_client().max_request_time)
+    sent, failed, released = [], [], []
+    for message in batch:
+        if timezone.now() + request_time >= message.claimed_until:
+            released.append(message.id)
+            continue
+        try:
+            push_schedule(message.payload, idempotency_key=message.id)
+        except SendingToSchedulerExceptions as exc:
+            now = timezone.now()
+            message.attempts += 1
+            message.available_at = now + retry_delay(
+                message.attempts, max_delay,
+            )
+            message.last_error = str(exc.args[0])
+            message.claimed_until = None
+            if (
+                    isinstance(exc, SchedulerRejectedError)
+                    or message.attempts >= max_attempts
+            ):
+                message.dead_at = now
+            failed.append(message)
+        else:
+            sent.append(message.id)
+
+    outbox = ScheduleOutbox.objects.using(using)
+    if released:
+        outbox.filter(
+            id__in=released, claimed_until=batch[0].claimed_until,
+        ).update(claimed_until=None, available_at=timezone.now())
+        logger.warning(
+            'Outbox: lease is running out, %s messages released'
+            % len(released)
+        )
+    if sent:
+        outbox.filter(id__in=sent).delete()
+    if failed:
+        outbox.bulk_update(
+            failed,
+            [
+                'attempts', 'available_at', 'last_error', 'claimed_until',
+                'dead_at',
+            ],
+        )
+    dead = sum(message.dead_at is not None for message in failed)
+    if failed:
+        logger.warning(
+            'Outbox: %s messages postponed, %s dead'
+            % (len(failed) - dead, dead)
+        )
+    return len(sent), len(failed)
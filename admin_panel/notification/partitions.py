@@ -0,0 +1,191 @@
+"""Обслуживание секций таблицы сообщений `notifications.mail`.
+
+Таблица секционирована по месяцам по полю `created`. Секции называются
+`mail_pYYYY_MM`, строки вне существующих секций попадают в секцию по
+умолчанию `mail_default`. При обслуживании строки секции по умолчанию
+переносятся в секции своих месяцев, а устаревшие строки - в отключённые
+таблицы своих месяцев (или удаляются).
+"""
+import re
+from datetime import date, datetime, timezone
+
+from django.db import connections, transaction
+
+SCHEMA = 'notifications'
+TABLE = 'mail'
+DEFAULT_PARTITION = 'mail_default'
+PARTITION_NAME = re.compile(r'^mail_p(\d{4})_(\d{2})$')
+
+
+def add_months(month: date, months: int) -> date:
+    """Первое число месяца, отстоящего от `month` на `months` месяцев."""
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def get_bounds(month: date) -> tuple[datetime, datetime]:
+    """Границы секции месяца."""
+    lower = datetime(month.year, month.month, 1, tzinfo=timezone.utc)
+    upper = add_months(month, 1)
+    return lower, datetime(upper.year, upper.month, 1, tzinfo=timezone.utc)
+
+
+def get_partition_name(month: date) -> str:
+    """Имя секции месяца."""
+    return f'{TABLE}_p{month:%Y_%m}'
+
+
+def qualified(name: str, connection) -> str:
+    """Имя таблицы вместе со схемой."""
+    quote = connection.ops.quote_name
+    return f'{quote(SCHEMA)}.{quote(name)}'
+
+
+def get_partitions(cursor) -> dict[date, str]:
+    """Месячные секции, подключённые к таблице."""
+    cursor.execute(
+        """
+        SELECT child.relname
+        FROM pg_inherits
+        JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        JOIN pg_namespace ON pg_namespace.oid = parent.relnamespace
+        WHERE pg_namespace.nspname = %s AND parent.relname = %s
+        """,
+        [SCHEMA, TABLE],
+    )
+    partitions = {}
+    for name, in cursor.fetchall():
+        match = PARTITION_NAME.match(name)
+        if match:
+            partitions[date(int(match[1]), int(match[2]), 1)] = name
+    return partitions
+
+
+def get_default_months(cursor, connection) -> set[date]:
+    """Месяцы строк, попавших в секцию по умолчанию."""
+    cursor.execute(
+        f"SELECT DISTINCT date_trunc('month', created AT TIME ZONE 'UTC') "
+        f"FROM {qualified(DEFAULT_PARTITION, connection)}"
+    )
+    return {month.date() for month, in cursor.fetchall()}
+
+
+def move_default_rows(cursor, connection, month: date):
+    """Перенос строк месяца из секции по умолчанию в таблицу месяца.
+
+    Таблица создаётся, если её ещё нет. Отключённая ранее таблица месяца
+    дополняется строками.
+    """
+    table = qualified(TABLE, connection)
+    partition = qualified(get_partition_name(month), connection)
+    cursor.execute(
+        f'CREATE TABLE IF NOT EXISTS {partition} '
+        f'(LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)'
+    )
+    cursor.execute(
+        f'WITH moved AS ('
+        f'DELETE FROM {qualified(DEFAULT_PARTITION, connection)} '
+        f'WHERE created >= %s AND created < %s '
+        f'RETURNING id, created, context, email) '
+        f'INSERT INTO {partition} (id, created, context, email) '
+        f'SELECT id, created, context, email FROM moved',
+        list(get_bounds(month)),
+    )
+
+
+def create_partition(connection, month: date) -> str:
+    """Создание секции месяца.
+
+    Строки этого месяца, успевшие попасть в секцию по умолчанию,
+    переносятся в новую секцию перед её подключением. Отключённая ранее
+    таблица месяца подключается снова.
+    """
+    name = get_partition_name(month)
+    table = qualified(TABLE, connection)
+    partition = qualified(name, connection)
+    lower, upper = get_bounds(month)
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        move_default_rows(cursor, connection, month)
+        cursor.execute(
+            f'ALTER TABLE {table} ATTACH PARTITION {partition} '
+            f'FOR VALUES FROM (%s) TO (%s)',
+            [lower, upper],
+        )
+    return name
+
+
+def expire_default_rows(connection, month: date, drop: bool = False) -> str:
+    """Устаревшие строки месяца из секции по умолчанию.
+
+    Строки переносятся в отключённую таблицу месяца или удаляются.
+    """
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        if drop:
+            cursor.execute(
+                f'DELETE FROM {qualified(DEFAULT_PARTITION, connection)} '
+                f'WHERE created >= %s AND created < %s',
+                list(get_bounds(month)),
+            )
+        else:
+            move_default_rows(cursor, connection, month)
+    return get_partition_name(month)
+
+
+def expire_partition(connection, name: str, drop: bool = False):
+    """Отключение секции от таблицы и, при необходимости, её удаление."""
+    partition = qualified(name, connection)
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        cursor.execute(
+            f'ALTER TABLE {qualified(TABLE, connection)} '
+            f'DETACH PARTITION {partition}'
+        )
+        if drop:
+            cursor.execute(f'DROP TABLE {partition}')
+
+
+def maintain_partitions(
+        using: str = 'notification_db',
+        months_ahead: int = 3,
+        retention: int = 0,
+        drop: bool = False,
+        today: date = None,
+) -> tuple[list[str], list[str]]:
+    """Создание будущих секций и отключение устаревших.
+
+    Для строк секции по умолчанию создаются секции их месяцев, а строки
+    месяцев старше `retention` переносятся в отключённые таблицы этих
+    месяцев (или удаляются).
+
+    Args:
+        using: БД рассылок;
+        months_ahead: на сколько месяцев вперёд создавать секции;
+        retention: сколько месяцев хранить, 0 - хранить всё;
+        drop: удалять устаревшие секции, а не только отключать;
+        today: текущая дата.
+
+    Returns:
+        имена созданных и устаревших секций.
+    """
+    connection = connections[using]
+    current = (today or date.today()).replace(day=1)
+    with connection.cursor() as cursor:
+        partitions = get_partitions(cursor)
+        months = get_default_months(cursor, connection)
+    months.update(
+        add_months(current, offset) for offset in range(months_ahead + 1)
+    )
+    oldest = add_months(current, -retention + 1) if retention else date.min
+
+    created, expired = [], []
+    for month in sorted(months - partitions.keys()):
+        if month < oldest:
+            expired.append(expire_default_rows(connection, month, drop))
+        else:
+            created.append(create_partition(connection, month))
+
+    for month, name in sorted(partitions.items()):
+        if month < oldest:
+            expire_partition(connection, name, drop)
+            expired.append(name)
+    return created, expired
@@ -0,0 +1,196 @@
+"""Прогноз объёма рассылок по каналам."""
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+import numpy as np
+from django.utils import timezone
+
+from authentication.models.users import User
+from notification.models import Schedule, Subscribe
+from notification.recurrence import build_rule, get_dtstart
+from notification.web_services.serialization import get_plan
+
+logger = logging.getLogger(__name__)
+
+HOUR = 3600
+
+# Правила без by* параметров с фиксированным шагом считаются аналитически.
+FIXED_STEPS = {
+    'SECONDLY': 1,
+    'MINUTELY': 60,
+    'HOURLY': HOUR,
+    'DAILY': 24 * HOUR,
+    'WEEKLY': 7 * 24 * HOUR,
+}
+BY_FIELDS = (
+    'bysetpos', 'bymonth', 'bymonthday', 'byyearday', 'byeaster',
+    'byweekno', 'byhour', 'byminute', 'bysecond',
+)
+
+
+def get_audiences(
+        notification_ids,
+        notification_db: str = 'notification_db',
+        auth_db: str = 'auth_db',
+) -> dict:
+    """Количество получателей каждой рассылки.
+
+    Подписка без пользователя означает рассылку на всех активных
+    зарегистрированных пользователей.
+    """
+    audiences = defaultdict(int)
+    everyone = None
+    subscribes = (
+        Subscribe.objects.using(notification_db)
+        .filter(notification_id__in=notification_ids)
+        .values_list('notification_id', 'user_id')
+    )
+    for notification_id, user_id in subscribes:
+        if user_id is None:
+            if everyone is None:
+                everyone = (
+                    User.objects.using(auth_db).filter(disabled=False).count()
+                )
+            audiences[notification_id] += everyone
+        else:
+            audiences[notification_id] += 1
+    return audiences
+
+
+def is_valid(values: dict) -> bool:
+    """Задают ли поля расписания правило повторения."""
+    try:
+        build_rule(values)
+    except ValueError as exc:
+        logger.warning('Schedule %s skipped: %s', values['id'], exc)
+        return False
+    return True
+
+
+def is_fixed_step(values: dict) -> bool:
+    """Срабатывания правила идут с постоянным шагом."""
+    return (
+        (values['freq'] or '').upper() in FIXED_STEPS
+        and not any(values[name] for name in BY_FIELDS)
+    )
+
+
+def fixed_step_histogram(
+        rows: list[dict],
+        start: datetime,
+        hours: int,
+) -> np.ndarray:
+    """Почасовое количество срабатываний правил с постоянным шагом.
+
+    Срабатывания правила - это `dtstart + k * step`, поэтому количество
+    срабатываний до момента `x` равно `ceil((x - dtstart) / step)` с
+    учётом ограничений `count` и `until`. Почасовые значения получаются
+    разностью этой функции на границах часов сразу для всех правил.
+
+    Returns:
+        матрица размером (количество правил, hours).
+    """
+    origin = start.timestamp()
+    dtstart = np.array(
+        [get_dtstart(row).timestamp() - origin for row in rows],
+    )
+    step = np.array(
+        [
+            FIXED_STEPS[row['freq'].upper()] * (row['interval'] or 1)
+            for row in rows
+        ],
+        dtype=float,
+    )
+    count = np.array(
+        [row['count'] if row['count'] else np.inf for row in rows],
+    )
+    until = np.array(
+        [
+            row['until'].timestamp() - origin if row['until'] else np.inf
+            for row in rows
+        ],
+    )
+    # Количество срабатываний не позже until.
+    limit = np.minimum(count, np.floor((until - dtstart) / step) + 1)
+    limit = np.maximum(limit, 0)
+
+    edges = np.arange(hours + 1, dtype=float) * HOUR
+    fired = np.ceil((edges[np.newaxis, :] - dtstart[:, np.newaxis])
+                    / step[:, np.newaxis])
+    fired = np.clip(fired, 0, limit[:, np.newaxis])
+    return np.diff(fired, axis=1)
+
+
+def rule_histogram(values: dict, start: datetime, hours: int) -> np.ndarray:
+    """Почасовое количество срабатываний произвольного правила."""
+    end = start + timedelta(hours=hours)
+    histogram = np.zeros(hours)
+    rule = build_rule(values)
+    if rule is None:
+        fire_times = [values['dtstart']] if values['dtstart'] else []
+    else:
+        fire_times = rule.between(start, end, inc=True)
+    offsets = np.array(
+        [(fire_at - start).total_seconds() for fire_at in fire_times],
+    )
+    offsets = offsets[(offsets >= 0) & (offsets < hours * HOUR)]
+    np.add.at(histogram, (offsets // HOUR).astype(int), 1)
+    return histogram
+
+
+def plan_capacity(
+        start: datetime = None,
+        days: int = 30,
+        using: str = 'notification_db',
+        auth_db: str = 'auth_db',
+) -> tuple[datetime, dict]:
+    """Прогноз количества сообщений в час по каждому каналу.
+
+    Args:
+        start: начало прогноза, по умолчанию начало текущего часа;
+        days: длительность прогноза в днях;
+        using: БД рассылок;
+        auth_db: БД пользователей.
+
+    Returns:
+        начало прогноза и словарь {канал: массив сообщений по часам}.
+        Расписания с некорректным правилом повторения пропускаются.
+    """
+    start = start or timezone.now().replace(minute=0, second=0, microsecond=0)
+    hours = days * 24
+    rows = [
+        row
+        for row in Schedule.objects.using(using).values(
+            *get_plan(Schedule).columns, 'notification__destination',
+        )
+        if is_valid(row)
+    ]
+    audiences = get_audiences(
+        [row['notification_id'] for row in rows], using, auth_db,
+    )
+
+    fixed = [row for row in rows if is_fixed_step(row)]
+    other = [row for row in rows if not is_fixed_step(row)]
+    histograms = []
+    if fixed:
+        histograms.append((fixed, fixed_step_histogram(fixed, start, hours)))
+    if other:
+        histograms.append((
+            other,
+            np.array([rule_histogram(row, start, hours) for row in other]),
+        ))
+
+    plan = defaultdict(lambda: np.zeros(hours))
+    for group, matrix in histograms:
+        channels = np.array(
+            [row['notification__destination'] for row in group],
+        )
+        weights = np.array(
+            [audiences.get(row['notification_id'], 0) for row in group],
+            dtype=float,
+        )
+        weighted = matrix * weights[:, np.newaxis]
+        for channel in np.unique(channels):
+            plan[channel] += weighted[channels == channel].sum(axis=0)
+    return start, dict(plan)
@@ -0,0 +1,122 @@
+"""Разворачивание правил повторения расписаний рассылок."""
+from datetime import datetime
+from itertools import islice, takewhile
+from typing import Iterator
+
+from dateutil import rrule
+from django.utils import timezone
+
+RRULE_ARGS = (
+    'interval', 'count', 'until', 'bysetpos', 'bymonth', 'bymonthday',
+    'byyearday', 'byeaster', 'byweekno', 'byhour', 'byminute', 'bysecond',
+)
+WEEKDAYS = {
+    'MO': rrule.MO, 'TU': rrule.TU, 'WE': rrule.WE, 'TH': rrule.TH,
+    'FR': rrule.FR, 'SA': rrule.SA, 'SU': rrule.SU,
+}
+
+
+def get_wkst(value: str):
+    """Первый день недели из значения поля `wkst`.
+
+    Raises:
+        ValueError: значение не является днём недели.
+    """
+    value = (value or '').strip().upper()
+    if not value:
+        return None
+    if value.isdigit():
+        return int(value)
+    try:
+        return WEEKDAYS[value[:2]]
+    except KeyError:
+        raise ValueError(f'Invalid week start day: {value!r}')
+
+
+def get_dtstart(values: dict) -> datetime:
+    """Начало повторения.
+
+    `dtstart` сохранённого расписания с частотой заполняется при
+    сохранении, текущий момент используется только для ещё не
+    сохранённого расписания.
+    """
+    return values.get('dtstart') or timezone.now().replace(microsecond=0)
+
+
+def build_rule(values: dict) -> rrule.rrule | None:
+    """Правило повторения по значениям полей расписания.
+
+    Args:
+        values: значения полей расписания, например строка `.values()`.
+
+    Returns:
+        правило повторения или None, если частота не задана.
+
+    Raises:
+        ValueError: поля расписания не задают правило повторения.
+    """
+    if not values.get('freq'):
+        return None
+    kwargs = {
+        name: values[name]
+        for name in RRULE_ARGS
+        if values.get(name) not in (None, [])
+    }
+    wkst = get_wkst(values.get('wkst'))
+    if wkst is not None:
+        kwargs['wkst'] = wkst
+    return rrule.rrule(
+        getattr(rrule, values['freq'].upper()),
+        dtstart=get_dtstart(values),
+        cache=False,
+        **kwargs,
+    )
+
+
+def iter_occurrences(
+        values: dict,
+        start: datetime,
+        end: datetime,
+        limit: int = None,
+        inc: bool = True,
+) -> Iterator[datetime]:
+    """Срабатывания расписания в интервале [start, end] по одному.
+
+    Args:
+        values: значения полей расписания;
+        start: начало интервала;
+        end: конец интервала;
+        limit: максимальное количество срабатываний;
+        inc: входит ли в интервал само начало.
+
+    Raises:
+        ValueError: поля расписания не задают правило повторения.
+    """
+    rule = build_rule(values)
+    if rule is None:
+        dtstart = values.get('dtstart')
+        in_range = dtstart and (
+            start <= dtstart if inc else start < dtstart
+        ) and dtstart <= end
+        return iter([dtstart] if in_range and limit != 0 else [])
+    occurrences = takewhile(
+        lambda fire_at: fire_at <= end, rule.xafter(start, inc=inc),
+    )
+    return islice(occurrences, limit)
+
+
+def get_occurrences(
+        values: dict,
+        start: datetime,
+        end: datetime,
+        limit: int = None,
+) -> list[datetime]:
+    """Срабатывания расписания в интервале [start, end].
+
+    Args:
+        values: значения полей расписания;
+        start: начало интервала;
+        end: конец интервала;
+        limit: максимальное количество срабатываний.
+    """
+    return list(iter_occurrences(values, start, end, limit))
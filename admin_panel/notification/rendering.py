@@ -0,0 +1,143 @@
+"""Подготовка текстов сообщений по шаблонам рассылок.
+
+Шаблон (тема и HTML из Summernote) компилируется один раз и хранится в
+кэше по ключу (id шаблона, хэш содержимого). Изменение шаблона меняет
+хэш, поэтому устаревшая версия из кэша не используется даже в других
+процессах, а сохранение шаблона сразу удаляет её из кэша процесса.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Iterator
+from uuid import UUID
+
+from django.template import Context, Engine, Template
+
+from utils.iterators import chunked
+
+CACHE_SIZE = 256
+
+engine = Engine(autoescape=True)
+
+
+def get_content_hash(subject: str, body: str) -> str:
+    """Хэш содержимого шаблона."""
+    return hashlib.blake2b(
+        f'{subject}\0{body}'.encode(), digest_size=16,
+    ).hexdigest()
+
+
+class CompiledTemplate:
+    """Скомпилированные тема и текст сообщения.
+
+    Тема - обычный текст заголовка письма, поэтому в ней значения не
+    экранируются, в HTML-тексте - экранируются.
+    """
+
+    def __init__(self, subject: str, body: str):
+        self.subject = Template(subject, engine=engine)
+        self.body = Template(body, engine=engine)
+
+    def render(self, context: dict) -> tuple[str, str]:
+        """Тема и текст сообщения для одного получателя."""
+        return (
+            self.subject.render(Context(context, autoescape=False)),
+            self.body.render(Context(context, autoescape=True)),
+        )
+
+    def render_many(
+            self,
+            contexts: Iterable[dict],
+    ) -> Iterator[tuple[str, str]]:
+        """Тема и текст сообщения для каждого получателя.
+
+        Объекты `Context` темы и текста используются для всех
+        получателей, данные получателя добавляются в них отдельным слоем.
+        """
+        subject_context = Context(autoescape=False)
+        body_context = Context(autoescape=True)
+        for data in contexts:
+            with subject_context.push(data), body_context.push(data):
+                yield (
+                    self.subject.render(subject_context),
+                    self.body.render(body_context),
+                )
+
+
+class TemplateCache:
+    """LRU-кэш скомпилированных шаблонов."""
+
+    def __init__(self, size: int = CACHE_SIZE):
+        self.size = size
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, template_id, subject: str, body: str) -> CompiledTemplate:
+        """Скомпилированный шаблон, при отсутствии в кэше - компиляция."""
+        key = template_id, get_content_hash(subject, body)
+        with self._lock:
+            compiled = self._items.get(key)
+            if compiled is not None:
+                self._items.move_to_end(key)
+                return compiled
+        compiled = CompiledTemplate(subject, body)
+        with self._lock:
+            self._items[key] = compiled
+            while len(self._items) > self.size:
+                self._items.popitem(last=False)
+        return compiled
+
+    def invalidate(self, template_id):
+        """Удаление всех версий шаблона из кэша."""
+        with self._lock:
+            for key in [key for key in self._items if key[0] == template_id]:
+                del self._items[key]
+
+
+cache = TemplateCache()
+
+
+def _render_chunk(
+        template_id: UUID,
+        subject: str,
+        body: str,
+        contexts: list[dict],
+) -> list[tuple[str, str]]:
+    compiled = cache.get(template_id, subject, body)
+    return list(compiled.render_many(contexts))
+
+
+def render_batch(
+        template,
+        contexts: Iterable[dict],
+        processes: int = 0,
+        chunk_size: int = 1000,
+) -> Iterator[tuple[str, str]]:
+    """Тема и текст сообщения для каждого получателя.
+
+    Args:
+        template: шаблон рассылки `NotificationTemplate`;
+        contexts: данные получателей для подстановки в шаблон;
+        processes: количество процессов для рендеринга, 0 - в текущем
+            процессе;
+        chunk_size: размер пачки получателей для одного процесса.
+    """
+    args = template.id, template.subject, template.template
+    if not processes:
+        yield from cache.get(*args).render_many(contexts)
+        return
+
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        futures = (
+            pool.submit(_render_chunk, *args, chunk)
+            for chunk in chunked(contexts, chunk_size)
+        )
+        # Держим в работе не больше двух пачек на процесс.
+        pending = []
+        for future in futures:
+            pending.append(future)
+            if len(pending) >= processes * 2:
+                yield from pending.pop(0).result()
+        for future in pending:
+            yield from future.result()
@@ -0,0 +1,88 @@
+"""Маршрутизация событий сторонних сервисов в рассылки.
+
+Каждый процесс держит в памяти индекс "событие -> рассылки", собранный
+одним запросом из `EventNotification`, `Notification` и
+`NotificationTemplate`. Изменения этих таблиц увеличивают версию в
+`EventRoutingVersion`; процесс сверяет её не чаще раза в
+`check_interval` секунд и при расхождении пересобирает индекс.
+"""
+import threading
+import time
+from typing import NamedTuple
+from uuid import UUID
+
+from notification.models import EventNotification, EventRoutingVersion
+
+
+class Route(NamedTuple):
+    """Рассылка, запускаемая событием."""
+
+    notification_id: UUID
+    destination: str
+    template_id: UUID | None
+
+
+class RoutingIndex:
+    """Индекс маршрутизации событий."""
+
+    def __init__(self, using: str = 'notification_db', check_interval=1.0):
+        self.using = using
+        self.check_interval = check_interval
+        self.version = None
+        self._routes = {}
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def build(self) -> tuple[int, dict]:
+        """Сборка индекса из БД."""
+        version = EventRoutingVersion.get(self.using)
+        routes = {}
+        rows = (
+            EventNotification.objects.using(self.using)
+            .order_by('event', 'notification__name')
+            .values_list(
+                'event',
+                'notification_id',
+                'notification__destination',
+                'notification__notificationtemplate__id',
+            )
+        )
+        for event, *route in rows:
+            routes.setdefault(event, []).append(Route(*route))
+        return version, {
+            event: tuple(event_routes)
+            for event, event_routes in routes.items()
+        }
+
+    def refresh(self, force: bool = False):
+        """Пересборка индекса, если изменилась версия в БД."""
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.check_interval:
+            return
+        with self._lock:
+            if not force and now - self._checked_at < self.check_interval:
+                return
+            current = EventRoutingVersion.get(self.using)
+            if force or current != self.version:
+                # Новый индекс подменяется целиком, читатели видят либо
+                # старую, либо новую версию.
+                self.version, self._routes = self.build()
+            self._checked_at = time.monotonic()
+
+    def invalidate(self):
+        """Проверка версии при следующем обращении."""
+        self._checked_at = 0.0
+
+    def resolve(self, event: str) -> tuple[Route, ...]:
+        """Рассылки, запускаемые событием."""
+        self.refresh()
+        return self._routes.get(event, ())
+
+    def resolve_many(self, events) -> dict[str, tuple[Route, ...]]:
+        """Рассылки для каждого из событий."""
+        self.refresh()
+        routes = self._routes
+        return {event: routes.get(event, ()) for event in events}
+
+
+index = RoutingIndex()
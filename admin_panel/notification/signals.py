@@ -0,0 +1,24 @@
+"""Обработчики сигналов моделей рассылок."""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from notification import routing
+from notification.models import (
+    EventNotification,
+    EventRoutingVersion,
+    Notification,
+    NotificationTemplate,
+)
+
+
+@receiver(post_save, sender=EventNotification)
+@receiver(post_delete, sender=EventNotification)
+@receiver(post_save, sender=Notification)
+@receiver(post_delete, sender=Notification)
+@receiver(post_save, sender=NotificationTemplate)
+@receiver(post_delete, sender=NotificationTemplate)
+def bump_routing_version(sender, using, **kwargs):
+    """Изменение маршрутизации событий."""
+    EventRoutingVersion.bump(using)
+    transaction.on_commit(routing.index.invalidate, using=using)
@@ -0,0 +1,545 @@
+import json
+import threading
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+from django.contrib import admin
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.db import models
+from django.test import RequestFactory, SimpleTestCase
+from django.utils import timezone
+
+from notification import (
+    models as notification_models,
+    outbox,
+    partitions,
+    planner,
+    recurrence,
+    rendering,
+)
+from notification.models import (
+    Mail,
+    Schedule,
+    ScheduleOccurrence,
+    ScheduleOutbox,
+)
+from notification.planner import BY_FIELDS
+from notification.web_services import scheduler
+from utils.keyset_pagination import encode_cursor
+from utils.testing import DatabaseTestCase
+
+
+class StubScheduler(ThreadingHTTPServer):
+    """Планировщик, отвечающий на запросы по заданному сценарию.
+
+    Каждый элемент `responses` - код ответа или пара (задержка в
+    секундах, код ответа), последний повторяется для остальных запросов.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, responses):
+        super().__init__(('127.0.0.1', 0), StubHandler)
+        self.responses = list(responses)
+        self.requests = []
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address
+        return f'http://{host}:{port}'
+
+
+class StubHandler(BaseHTTPRequestHandler):
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        self.server.requests.append({
+            'path': self.path,
+            'key': self.headers.get('Idempotency-Key'),
+            'payload': json.loads(body),
+        })
+        responses = self.server.responses
+        response = responses.pop(0) if len(responses) > 1 else responses[0]
+        delay, status = response if isinstance(response, tuple) else (
+            0, response,
+        )
+        time.sleep(delay)
+        self.send_response(status)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class SchedulerClientTests(SimpleTestCase):
+    """Повторные POST запросы к планировщику передают тот же ключ."""
+
+    def start(self, *responses) -> StubScheduler:
+        server = StubScheduler(responses)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        client = scheduler.SchedulerClient(
+            base_url=server.url,
+            connect_timeout=1,
+            read_timeout=0.5,
+            retries=2,
+            backoff_factor=0,
+        )
+        self.addCleanup(client.close)
+        patcher = mock.patch.object(
+            scheduler, 'get_client', return_value=client,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return server
+
+    def assert_same_key(self, server: StubScheduler, count: int):
+        keys = [request['key'] for request in server.requests]
+        self.assertEqual(len(keys), count)
+        self.assertTrue(keys[0])
+        self.assertEqual(set(keys), {keys[0]})
+
+    def test_retry_after_bad_gateway_keeps_key(self):
+        server = self.start(502, 201)
+        scheduler.push_schedule({'id': 'a'}, idempotency_key='message-1')
+        self.assert_same_key(server, 2)
+        self.assertEqual(server.requests[0]['key'], 'message-1')
+
+    def test_retry_after_read_timeout_keeps_key(self):
+        server = self.start((1, 201), 201)
+        scheduler.push_schedule({'id': 'a'})
+        self.assert_same_key(server, 2)
+
+    def test_calls_without_key_get_distinct_keys(self):
+        server = self.start(201)
+        scheduler.push_schedule({'id': 'a'})
+        scheduler.push_schedule({'id': 'a'})
+        keys = [request['key'] for request in server.requests]
+        self.assertEqual(len(set(keys)), 2)
+
+    def test_bulk_retry_keeps_key(self):
+        server = self.start(503, 201)
+        failed = scheduler.push_schedule_batch([{'id': 'a'}, {'id': 'b'}])
+        self.assertEqual(failed, [])
+        self.assert_same_key(server, 2)
+        self.assertEqual(
+            server.requests[0]['path'], scheduler.SCHEDULE_BULK_PATH,
+        )
+
+    def test_fanout_sends_key_per_schedule(self):
+        server = self.start(404, 201)
+        failed = scheduler.push_schedule_batch([{'id': 'a'}, {'id': 'b'}])
+        self.assertEqual(failed, [])
+        single = [
+            request for request in server.requests
+            if request['path'] == scheduler.SCHEDULE_PATH
+        ]
+        self.assertEqual(len(single), 2)
+        self.assertTrue(all(request['key'] for request in single))
+
+    def test_rejected_is_not_retried(self):
+        server = self.start(400)
+        with self.assertRaises(scheduler.SchedulerRejectedError):
+            scheduler.push_schedule({'id': 'a'})
+        self.assertEqual(len(server.requests), 1)
+
+
+class ScheduleDtstartTests(SimpleTestCase):
+    """Начало повторения фиксируется при сохранении расписания."""
+
+    def save(self, schedule) -> dict:
+        """Сохранение без БД, возвращает данные для планировщика."""
+        with mock.patch.object(models.Model, 'save'), \
+                mock.patch.object(notification_models, 'transaction'), \
+                mock.patch.object(ScheduleOccurrence, 'objects'), \
+                mock.patch.object(ScheduleOutbox, 'objects') as outbox:
+            schedule.save(using='notification_db')
+        return outbox.using.return_value.create.call_args.kwargs['payload']
+
+    def test_rule_without_dtstart_is_anchored_on_save(self):
+        schedule = Schedule(freq='DAILY')
+        payload = self.save(schedule)
+        self.assertIsNotNone(schedule.dtstart)
+        self.assertEqual(schedule.dtstart.microsecond, 0)
+        self.assertEqual(payload['dtstart'], str(schedule.dtstart))
+        self.assertNotIn('created', payload)
+
+    def test_explicit_dtstart_is_kept(self):
+        dtstart = datetime(2026, 1, 1, 9, 30, tzinfo=dt_timezone.utc)
+        schedule = Schedule(freq='DAILY', dtstart=dtstart)
+        self.save(schedule)
+        self.assertEqual(schedule.dtstart, dtstart)
+
+    def test_one_off_schedule_stays_without_dtstart(self):
+        schedule = Schedule()
+        self.save(schedule)
+        self.assertIsNone(schedule.dtstart)
+
+
+def make_rule(**values) -> dict:
+    """Значения полей расписания, как их возвращает `.values()`."""
+    return {
+        name: None for name in (
+            'freq', 'dtstart', 'interval', 'count', 'until', *BY_FIELDS,
+        )
+    } | {'wkst': ''} | values
+
+
+class CapacityPlanTests(SimpleTestCase):
+    """Прогноз считает срабатывания так же, как правила повторения."""
+
+    start = datetime(2026, 10, 18, tzinfo=dt_timezone.utc)
+
+    def assert_same_histograms(self, row: dict):
+        fixed = planner.fixed_step_histogram([row], self.start, 48)[0]
+        rule = planner.rule_histogram(row, self.start, 48)
+        self.assertEqual(
+            fixed.nonzero()[0].tolist(), rule.nonzero()[0].tolist(),
+        )
+
+    def test_fixed_step_matches_rule(self):
+        self.assert_same_histograms(make_rule(
+            freq='DAILY', dtstart=self.start - timedelta(hours=5),
+        ))
+
+    def test_fixed_step_without_dtstart_matches_rule(self):
+        now = self.start + timedelta(hours=19, minutes=30)
+        with mock.patch.object(recurrence.timezone, 'now', return_value=now):
+            self.assert_same_histograms(make_rule(freq='DAILY'))
+
+    def test_invalid_rule_is_skipped(self):
+        rows = [
+            make_rule(
+                id=1, notification_id=1, notification__destination='email',
+                freq='DAILY', dtstart=self.start, byhour=[9],
+            ),
+            make_rule(
+                id=2, notification_id=2, notification__destination='email',
+                freq='DAILY', dtstart=self.start, byhour=[9], wkst='XX',
+            ),
+        ]
+        with mock.patch.object(planner.Schedule, 'objects') as objects, \
+                mock.patch.object(
+                    planner, 'get_audiences', return_value={1: 10, 2: 100},
+                ), \
+                self.assertLogs(planner.logger, 'WARNING'):
+            objects.using.return_value.values.return_value = rows
+            _, plan = planner.plan_capacity(self.start, days=2)
+        self.assertEqual(plan['email'].sum(), 20)
+
+
+class MailPartitionTests(DatabaseTestCase):
+    """Обслуживание секций таблицы сообщений."""
+
+    using = 'notification_db'
+    today = date(2026, 10, 18)
+    # Хранить 10 лет, чтобы не трогать секции текущих сообщений.
+    retention = 120
+
+    def insert_mail(self, created: datetime):
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {partitions.qualified("mail", self.connection)}'
+                f' (id, created, context, email) VALUES (%s, %s, %s, %s)',
+                [uuid.uuid4(), created, 'context', 'user@example.com'],
+            )
+
+    def count(self, name: str) -> int:
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT count(*) '
+                f'FROM {partitions.qualified(name, self.connection)}'
+            )
+            return cursor.fetchone()[0]
+
+    def get_partitions(self) -> dict:
+        with self.connection.cursor() as cursor:
+            return partitions.get_partitions(cursor)
+
+    def maintain(self, drop: bool = False):
+        return partitions.maintain_partitions(
+            self.using, months_ahead=0, retention=self.retention, drop=drop,
+            today=self.today,
+        )
+
+    def test_default_rows_get_partition_of_their_month(self):
+        month = date(2020, 5, 1)
+        self.insert_mail(datetime(2020, 5, 10, tzinfo=dt_timezone.utc))
+        created, _ = self.maintain()
+        self.assertIn('mail_p2020_05', created)
+        self.assertEqual(self.get_partitions()[month], 'mail_p2020_05')
+        self.assertEqual(self.count('mail_p2020_05'), 1)
+        self.assertEqual(self.count('mail_default'), 0)
+
+    def test_partition_takes_only_rows_of_its_month(self):
+        self.insert_mail(datetime(2020, 5, 31, 23, tzinfo=dt_timezone.utc))
+        self.insert_mail(datetime(2020, 6, 1, tzinfo=dt_timezone.utc))
+        name = partitions.create_partition(self.connection, date(2020, 5, 1))
+        self.assertEqual(name, 'mail_p2020_05')
+        self.assertEqual(self.count('mail_p2020_05'), 1)
+        self.assertEqual(self.count('mail_default'), 1)
+
+    def test_detached_partition_is_attached_again(self):
+        month = date(2020, 5, 1)
+        partitions.create_partition(self.connection, month)
+        self.insert_mail(datetime(2020, 5, 10, tzinfo=dt_timezone.utc))
+        partitions.expire_partition(self.connection, 'mail_p2020_05')
+        partitions.create_partition(self.connection, month)
+        self.assertEqual(self.get_partitions()[month], 'mail_p2020_05')
+        self.assertEqual(self.count('mail_p2020_05'), 1)
+
+    def test_expired_partition_is_dropped(self):
+        partitions.create_partition(self.connection, date(2001, 1, 1))
+        _, expired = self.maintain(drop=True)
+        self.assertIn('mail_p2001_01', expired)
+        with self.connection.cursor() as cursor:
+            cursor.execute("SELECT to_regclass('notifications.mail_p2001_01')")
+            self.assertIsNone(cursor.fetchone()[0])
+
+    def test_expired_partition_is_detached(self):
+        month = date(2001, 1, 1)
+        partitions.create_partition(self.connection, month)
+        _, expired = self.maintain()
+        self.assertIn('mail_p2001_01', expired)
+        self.assertNotIn(month, self.get_partitions())
+
+    def test_expired_default_rows_go_to_detached_table(self):
+        month = date(2001, 1, 1)
+        partitions.create_partition(self.connection, month)
+        partitions.expire_partition(self.connection, 'mail_p2001_01')
+        self.insert_mail(datetime(2001, 1, 15, tzinfo=dt_timezone.utc))
+
+        created, expired = self.maintain()
+        self.assertNotIn('mail_p2001_01', created)
+        self.assertIn('mail_p2001_01', expired)
+        self.assertNotIn(month, self.get_partitions())
+        self.assertEqual(self.count('mail_p2001_01'), 1)
+        self.assertEqual(self.count('mail_default'), 0)
+        # Следующий запуск не падает на уже существующей таблице.
+        self.maintain()
+
+    def test_expired_default_rows_are_dropped(self):
+        self.insert_mail(datetime(2001, 2, 15, tzinfo=dt_timezone.utc))
+        _, expired = self.maintain(drop=True)
+        self.assertIn('mail_p2001_02', expired)
+        self.assertEqual(self.count('mail_default'), 0)
+        with self.connection.cursor() as cursor:
+            cursor.execute("SELECT to_regclass('notifications.mail_p2001_02')")
+            self.assertIsNone(cursor.fetchone()[0])
+
+
+class RenderingTests(SimpleTestCase):
+    """Тема письма не экранируется, HTML-текст экранируется."""
+
+    template = rendering.CompiledTemplate(
+        '{{ title }} <новинка>', '<p>{{ title }}</p>',
+    )
+    context = {'title': 'Tom & Jerry <3'}
+
+    def test_render(self):
+        subject, body = self.template.render(self.context)
+        self.assertEqual(subject, 'Tom & Jerry <3 <новинка>')
+        self.assertEqual(body, '<p>Tom &amp; Jerry &lt;3</p>')
+
+    def test_render_many(self):
+        rendered = list(self.template.render_many([self.context] * 2))
+        self.assertEqual(rendered, [(
+            'Tom & Jerry <3 <новинка>', '<p>Tom &amp; Jerry &lt;3</p>',
+        )] * 2)
+
+
+class OutboxTests(DatabaseTestCase):
+    """Доставка исходящих сообщений планировщику."""
+
+    using = 'notification_db'
+
+    def setUp(self):
+        super().setUp()
+        self.messages = ScheduleOutbox.objects.using(self.using)
+        self.messages.all().delete()
+        self.push = self.patch(outbox, 'push_schedule')
+        self.client = self.patch(outbox, 'get_client').return_value
+        self.client.max_request_time = 1
+
+    def patch(self, target, name):
+        patcher = mock.patch.object(target, name)
+        self.addCleanup(patcher.stop)
+        return patcher.start()
+
+    def add(self, schedule_id, **kwargs) -> ScheduleOutbox:
+        return self.messages.create(
+            schedule_id=schedule_id, payload={'id': str(schedule_id)},
+            **kwargs,
+        )
+
+    def test_released_when_lease_runs_out(self):
+        self.client.max_request_time = 60
+        message = self.add(uuid.uuid4())
+        with self.assertLogs(outbox.logger, 'WARNING'):
+            sent = outbox.dispatch_batch(self.using, lease=30)
+        self.assertEqual(sent, (0, 0))
+        self.push.assert_not_called()
+        message.refresh_from_db(using=self.using)
+        self.assertIsNone(message.claimed_until)
+        self.assertLessEqual(message.available_at, timezone.now())
+
+    def test_only_newest_message_of_schedule_is_sent(self):
+        schedule_id = uuid.uuid4()
+        older = self.add(schedule_id)
+        newer = self.add(schedule_id)
+        self.messages.filter(id=older.id).update(
+            created=newer.created - timedelta(seconds=1),
+        )
+        sent = outbox.dispatch_batch(self.using)
+        self.assertEqual(sent, (1, 0))
+        self.push.assert_called_once_with(
+            newer.payload, idempotency_key=newer.id,
+        )
+        self.assertFalse(self.messages.exists())
+
+    def test_claimed_schedule_is_skipped(self):
+        schedule_id = uuid.uuid4()
+        self.add(
+            schedule_id,
+            claimed_until=timezone.now() + timedelta(minutes=5),
+            available_at=timezone.now() + timedelta(minutes=5),
+        )
+        self.add(schedule_id)
+        self.assertEqual(outbox.claim_batch(self.using, 10, lease=30), [])
+        self.assertEqual(outbox.dispatch_batch(self.using), (0, 0))
+        self.push.assert_not_called()
+
+    def test_failed_message_is_postponed(self):
+        message = self.add(uuid.uuid4())
+        self.push.side_effect = outbox.SendingToSchedulerExceptions('502')
+        with self.assertLogs(outbox.logger, 'WARNING'):
+            sent = outbox.dispatch_batch(self.using, max_delay=60)
+        self.assertEqual(sent, (0, 1))
+        message.refresh_from_db(using=self.using)
+        self.assertEqual(message.attempts, 1)
+        self.assertEqual(message.last_error, '502')
+        self.assertIsNone(message.claimed_until)
+        self.assertIsNone(message.dead_at)
+        self.assertGreater(message.available_at, timezone.now())
+
+    def test_rejected_message_is_dead(self):
+        message = self.add(uuid.uuid4())
+        self.push.side_effect = outbox.SchedulerRejectedError('400')
+        with self.assertLogs(outbox.logger, 'WARNING'):
+            outbox.dispatch_batch(self.using)
+        message.refresh_from_db(using=self.using)
+        self.assertEqual(message.attempts, 1)
+        self.assertIsNotNone(message.dead_at)
+        self.assertEqual(outbox.claim_batch(self.using, 10, lease=30), [])
+
+    def test_message_is_dead_after_last_attempt(self):
+        message = self.add(uuid.uuid4(), attempts=2)
+        self.push.side_effect = outbox.SendingToSchedulerExceptions('502')
+        with self.assertLogs(outbox.logger, 'WARNING'):
+            outbox.dispatch_batch(self.using, max_attempts=3)
+        message.refresh_from_db(using=self.using)
+        self.assertEqual(message.attempts, 3)
+        self.assertIsNotNone(message.dead_at)
+
+
+class ViewOnlyAdminTests(SimpleTestCase):
+    """Служебные записи расписаний в админке только просматриваются."""
+
+    def test_no_add_or_change(self):
+        request = RequestFactory().get('/')
+        request.user = mock.Mock(is_superuser=True, is_active=True)
+        for model in ScheduleOccurrence, ScheduleOutbox:
+            model_admin = admin.site._registry[model]
+            with self.subTest(model=model.__name__):
+                self.assertFalse(model_admin.has_add_permission(request))
+                self.assertFalse(model_admin.has_change_permission(request))
+                self.assertTrue(model_admin.has_view_permission(request))
+
+
+class MailChangeListTests(DatabaseTestCase):
+    """Список сообщений: вывод по ключу вместе с оценкой количества."""
+
+    using = 'notification_db'
+
+    def setUp(self):
+        super().setUp()
+        self.model_admin = admin.site._registry[Mail]
+        mails = Mail.objects.using(self.using)
+        mails.all().delete()
+        mails.bulk_create(
+            Mail(context='context', email=f'user{number}@example.com')
+            for number in range(5)
+        )
+        # Три сообщения с одинаковым временем создания.
+        now = timezone.now()
+        ids = list(mails.values_list('id', flat=True))
+        for seconds, mail_id in zip((0, 0, 0, 1, 2), ids):
+            mails.filter(id=mail_id).update(
+                created=now - timedelta(seconds=seconds),
+            )
+        self.ordered = list(
+            mails.order_by('-created', '-id').values_list('id', flat=True),
+        )
+
+    def get_changelist(self, url: str = '', per_page: int = 2):
+        request = RequestFactory().get('/' + url)
+        request.user = mock.Mock(is_superuser=True, is_active=True)
+        with mock.patch.object(self.model_admin, 'list_per_page', per_page):
+            return self.model_admin.get_changelist_instance(request)
+
+    def get_ids(self, changelist) -> list:
+        return [mail.id for mail in changelist.result_list]
+
+    def test_keyset_with_estimated_count(self):
+        self.assertTrue(self.model_admin.keyset_ordering)
+        self.assertTrue(self.model_admin.estimated_count)
+        changelist = self.get_changelist(per_page=100)
+        self.assertEqual(len(changelist.result_list), 5)
+        self.assertEqual(changelist.paginator.count, 5)
+        self.assertIsNone(changelist.next_url)
+        self.assertIsNone(changelist.previous_url)
+
+    def test_pages_forward_and_back(self):
+        pages = [self.get_changelist()]
+        self.assertIsNone(pages[0].previous_url)
+        while pages[-1].next_url:
+            pages.append(self.get_changelist(pages[-1].next_url))
+        self.assertEqual(
+            [self.get_ids(page) for page in pages],
+            [self.ordered[:2], self.ordered[2:4], self.ordered[4:]],
+        )
+
+        back = [pages[-1]]
+        while back[-1].previous_url:
+            back.append(self.get_changelist(back[-1].previous_url))
+        self.assertEqual(
+            [self.get_ids(page) for page in reversed(back)],
+            [self.get_ids(page) for page in pages],
+        )
+        self.assertIsNotNone(back[-1].next_url)
+
+    def test_ascending_order(self):
+        with mock.patch.object(self.model_admin, 'keyset_ordering', 'created'):
+            first = self.get_changelist(per_page=3)
+            second = self.get_changelist(first.next_url, per_page=3)
+        self.assertEqual(
+            self.get_ids(first) + self.get_ids(second),
+            self.ordered[::-1],
+        )
+        self.assertIsNone(second.next_url)
+
+    def test_bad_cursor(self):
+        cursors = (
+            'not-base64!', 'e30', encode_cursor(['2026-01-01']),
+            encode_cursor(['yesterday', 'some-id']),
+        )
+        for cursor in cursors:
+            with self.subTest(cursor=cursor), \
+                    self.assertRaises(IncorrectLookupParameters):
+                self.get_changelist(f'?after={cursor}')
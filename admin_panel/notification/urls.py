@@ -0,0 +1,7 @@
+from django.urls import path
+
+from notification import views
+
+urlpatterns = [
+    path('events/', views.intake_events, name='intake_events'),
+]
@@ -0,0 +1,116 @@
+"""Приём событий сторонних сервисов."""
+import http
+import json
+import secrets
+
+from django.conf import settings
+from django.db import DatabaseError, connections, transaction
+from django.http import HttpRequest, JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+
+from notification import routing
+from notification.models import EventDelivery
+
+
+class EventParseError(ValueError):
+    """Некорректное тело запроса с событиями."""
+
+
+def parse_events(request: HttpRequest) -> list[dict]:
+    """События из тела запроса: JSON-массив или NDJSON.
+
+    Raises:
+        EventParseError: тело запроса не удалось разобрать.
+    """
+    try:
+        if request.content_type == 'application/json':
+            events = json.loads(request.body)
+            if not isinstance(events, list):
+                events = [events]
+        else:
+            events = [
+                json.loads(line)
+                for line in request.body.splitlines()
+                if line.strip()
+            ]
+    except ValueError as exc:
+        raise EventParseError(f'Invalid JSON: {exc}')
+
+    for number, event in enumerate(events):
+        if not isinstance(event, dict) or not isinstance(
+                event.get('event'), str):
+            raise EventParseError(f'Event #{number}: "event" is required')
+    return events
+
+
+def is_authorized(request: HttpRequest) -> bool:
+    """Проверка токена сервиса.
+
+    Пока токен не задан в настройках, запросы не принимаются.
+    """
+    token = settings.EVENT_INTAKE_TOKEN
+    return bool(token) and secrets.compare_digest(
+        request.headers.get('X-Api-Key', ''), token,
+    )
+
+
+@csrf_exempt
+@require_POST
+def intake_events(request: HttpRequest) -> JsonResponse:
+    """Приём пачки событий.
+
+    События сопоставляются с рассылками по индексу маршрутизации, а
+    запущенные рассылки сохраняются одной массовой вставкой. Время
+    выполнения вставки ограничено `EVENT_INTAKE_TIMEOUT_MS`.
+    """
+    if not is_authorized(request):
+        return JsonResponse(
+            {'detail': 'Invalid API key'}, status=http.HTTPStatus.FORBIDDEN,
+        )
+    try:
+        events = parse_events(request)
+    except EventParseError as exc:
+        return JsonResponse(
+            {'detail': str(exc)}, status=http.HTTPStatus.BAD_REQUEST,
+        )
+    if len(events) > settings.EVENT_INTAKE_MAX_BATCH:
+        return JsonResponse(
+            {'detail': f'Batch is limited to '
+                       f'{settings.EVENT_INTAKE_MAX_BATCH} events'},
+            status=http.HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+        )
+
+    index = routing.index
+    try:
+        routes = index.resolve_many({event['event'] for event in events})
+        deliveries = [
+            EventDelivery(
+                event=event['event'],
+                notification_id=route.notification_id,
+                destination=route.destination,
+                template_id=route.template_id,
+                payload=event.get('payload') or {},
+            )
+            for event in events
+            for route in routes[event['event']]
+        ]
+        if deliveries:
+            with transaction.atomic(using=index.using):
+                with connections[index.using].cursor() as cursor:
+                    cursor.execute(
+                        'SET LOCAL statement_timeout = %s',
+                        [settings.EVENT_INTAKE_TIMEOUT_MS],
+                    )
+                EventDelivery.objects.using(index.using).bulk_create(
+                    deliveries, batch_size=1000,
+                )
+    except DatabaseError:
+        return JsonResponse(
+            {'detail': 'Service is temporarily unavailable'},
+            status=http.HTTPStatus.SERVICE_UNAVAILABLE,
+        )
+    return JsonResponse(
+        {'accepted': len(events), 'deliveries': len(deliveries)},
+        status=http.HTTPStatus.ACCEPTED,
+    )
@@ -1,31 +1,251 @@
 """Отправка данных с расписанием рассылки в "Планировщик"."""
 import json
 import logging
+import os
+import threading
+import time
 import uuid
-from datetime import date, datetime
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator
 
 import environs
 import requests
-from django.db import models
 from django.utils.translation import gettext_lazy as _
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-from notification.exceptions import SendingToSchedulerExceptions
+from notification.exceptions import (
+    SchedulerRejectedError,
+    SendingToSchedulerExceptions,
+)
+from utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+from utils.iterators import chunked
 
 env = environs.Env()
 env.read_env()
 logger = logging.getLogger(__name__)
 
+SCHEDULE_PATH = '/api/v1/schedule'
+SCHEDULE_BULK_PATH = '/api/v1/schedule/bulk'
 
-def send_notification(notification: models.Model):
-    """Отправка информации по модели."""
-    field_values = get_field_values(notification)
-    content = json.dumps(field_values)
-    headers = {'Content-Type': 'application/json; charset=utf-8'}
-    url = get_url()
 
+class CallStats:
+    """Счётчики обращений к планировщику."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.failures = 0
+        self.rejected = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+
+    def record(self, elapsed: float, failed: bool):
+        """Учёт выполненного обращения."""
+        with self._lock:
+            self.calls += 1
+            self.failures += failed
+            self.total_time += elapsed
+            self.max_time = max(self.max_time, elapsed)
+
+    def record_rejected(self):
+        """Учёт обращения, отклонённого предохранителем."""
+        with self._lock:
+            self.rejected += 1
+
+    def as_dict(self) -> dict:
+        """Снимок счётчиков."""
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'failures': self.failures,
+                'rejected': self.rejected,
+                'total_time': self.total_time,
+                'avg_time': self.total_time / self.calls if self.calls else 0,
+                'max_time': self.max_time,
+            }
+
+
+class SchedulerClient:
+    """HTTP-клиент планировщика.
+
+    Держит пул keep-alive соединений, ограничивает время ожидания
+    ответа, повторяет запрос при сетевых ошибках и ответах 502-504, а
+    при недоступности планировщика сразу отказывает в обращении.
+
+    POST запрос, ответ на который не получен, мог быть выполнен
+    планировщиком, поэтому каждый POST запрос отправляется с заголовком
+    `Idempotency-Key`: повторы запроса передают тот же ключ.
+    """
+
+    def __init__(
+            self,
+            base_url: str = None,
+            connect_timeout: float = None,
+            read_timeout: float = None,
+            retries: int = None,
+            backoff_factor: float = None,
+            pool_maxsize: int = None,
+            breaker: CircuitBreaker = None,
+    ):
+        self.base_url = (base_url or get_base_url()).rstrip('/')
+        self.timeout = (
+            connect_timeout or env.float('SCHEDULE_CONNECT_TIMEOUT', 1.0),
+            read_timeout or env.float('SCHEDULE_READ_TIMEOUT', 3.0),
+        )
+        self.retries = (
+            env.int('SCHEDULE_RETRIES', 2) if retries is None else retries
+        )
+        self.backoff_factor = (
+            env.float('SCHEDULE_BACKOFF_FACTOR', 0.3)
+            if backoff_factor is None else backoff_factor
+        )
+        self.pool_maxsize = pool_maxsize or env.int('SCHEDULE_POOL_SIZE', 10)
+        self.breaker = breaker or CircuitBreaker(
+            failure_threshold=env.int('SCHEDULE_FAILURE_THRESHOLD', 5),
+            reset_timeout=env.float('SCHEDULE_RESET_TIMEOUT', 30),
+        )
+        # None - ещё не известно, поддерживает ли планировщик пакетную
+        # загрузку расписаний.
+        self.bulk_supported = None
+        self.stats = CallStats()
+        self.session = self._make_session()
+
+    def _make_session(self) -> requests.Session:
+        retry = Retry(
+            total=self.retries,
+            backoff_factor=self.backoff_factor,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=None,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=self.pool_maxsize,
+            max_retries=retry,
+        )
+        session = requests.Session()
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        session.headers['Content-Type'] = 'application/json; charset=utf-8'
+        return session
+
+    def request(self, method: str, path: str, **kwargs) -> requests.Response:
+        """Запрос к планировщику.
+
+        Raises:
+            CircuitOpenError: планировщик признан недоступным;
+            requests.RequestException: ошибка соединения или таймаут.
+        """
+        try:
+            self.breaker.before_call()
+        except CircuitOpenError:
+            self.stats.record_rejected()
+            raise
+        kwargs.setdefault('timeout', self.timeout)
+        started = time.perf_counter()
+        failed = True
+        try:
+            response = self.session.request(
+                method, f'{self.base_url}{path}', **kwargs,
+            )
+            failed = response.status_code >= 500
+            return response
+        finally:
+            self.stats.record(time.perf_counter() - started, failed)
+            if failed:
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
+
+    def post(
+            self,
+            path: str,
+            payload,
+            idempotency_key: str = None,
+            **kwargs,
+    ) -> requests.Response:
+        """POST запрос к планировщику с телом в формате JSON.
+
+        Args:
+            idempotency_key: ключ, по которому планировщик отбрасывает
+                повторный запрос, по умолчанию - новый для каждого вызова.
+        """
+        headers = {
+            **kwargs.pop('headers', {}),
+            'Idempotency-Key': str(idempotency_key or uuid.uuid4()),
+        }
+        return self.request(
+            'POST', path, data=json.dumps(payload), headers=headers, **kwargs,
+        )
+
+    @property
+    def max_request_time(self) -> float:
+        """Наибольшая длительность запроса вместе с повторами, в секундах."""
+        attempts = self.retries + 1
+        # Пауза перед повтором - backoff_factor * 2 ** (n - 1), кроме первого.
+        backoff = sum(
+            min(
+                self.backoff_factor * 2 ** (retry - 1),
+                Retry.DEFAULT_BACKOFF_MAX,
+            )
+            for retry in range(2, attempts)
+        )
+        return sum(self.timeout) * attempts + backoff
+
+    def close(self):
+        """Закрытие соединений пула."""
+        self.session.close()
+
+
+_client = None
+_client_pid = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> SchedulerClient:
+    """Клиент планировщика текущего процесса.
+
+    Клиент создаётся заново после fork, чтобы воркеры gunicorn не
+    делили сокеты пула родительского процесса.
+    """
+    global _client, _client_pid
+    pid = os.getpid()
+    if _client is None or _client_pid != pid:
+        with _client_lock:
+            if _client is None or _client_pid != pid:
+                _client = SchedulerClient()
+                _client_pid = pid
+    return _client
+
+
+def is_rejected(status_code: int) -> bool:
+    """Ответ планировщика, после которого запрос не повторяется."""
+    return 400 <= status_code < 500 and status_code not in {
+        requests.status_codes.codes.request_timeout,
+        requests.status_codes.codes.too_many_requests,
+    }
+
+
+def push_schedule(payload: dict, idempotency_key: str = None):
+    """Отправка расписания планировщику.
+
+    Args:
+        payload: значения полей расписания;
+        idempotency_key: ключ, по которому планировщик отбрасывает
+            повторную доставку одного и того же сообщения.
+
+    Raises:
+        SchedulerRejectedError: планировщик отклонил запрос (ответ 4xx,
+            кроме 408 и 429);
+        SendingToSchedulerExceptions: планировщик недоступен или
+            ответил ошибкой.
+    """
     try:
-        response = requests.post(url, data=content, headers=headers)
-    except Exception as exc:
+        response = get_client().post(
+            SCHEDULE_PATH, payload, idempotency_key=idempotency_key,
+        )
+    except (CircuitOpenError, requests.RequestException) as exc:
         logger.warning(
             '%s! Service is not available' % exc.__class__.__name__
         )
@@ -33,10 +253,14 @@ def send_notification(notification: models.Model):
             _('Scheduler service is not available'),
         )
     if response.status_code != requests.status_codes.codes.created:
-        logger.warning(json.loads(response.content))
+        logger.warning(response.content)
         logger.warning(
             'Fail! Response status code %s' % response.status_code
         )
+        if is_rejected(response.status_code):
+            raise SchedulerRejectedError(
+                _('Scheduler service rejected the request'),
+            )
         raise SendingToSchedulerExceptions(
             _('Scheduler service connection error'),
         )
@@ -46,35 +270,75 @@ def send_notification(notification: models.Model):
         )
 
 
-def field_value_check(field, field_value, id_fields):
-    """Проверка значения полей"""
-    if field.name in id_fields:
-        field_value = field_value.id
-    if type(field_value) in {datetime, date, uuid.UUID}:
-        field_value = str(field_value)
-    if not field_value:
-        field_value = None
-    return field_value
+def _push_one(payload: dict) -> bool:
+    try:
+        push_schedule(payload)
+    except SendingToSchedulerExceptions:
+        return False
+    return True
+
+
+def push_schedule_batch(payloads: list[dict], workers: int = None) -> list:
+    """Отправка пачки расписаний планировщику.
 
+    Пачка отправляется одним запросом на пакетный endpoint. Если
+    планировщик его не поддерживает, расписания отправляются по одному
+    параллельно через пул соединений клиента.
 
-def get_field_values(model: models.Model):
-    """Получение значений полей модели."""
-    field_values = {}
-    id_fields = {'notification'}
-    for field in model._meta.get_fields():
+    Returns:
+        идентификаторы расписаний, которые не удалось отправить.
+    """
+    client = get_client()
+    if client.bulk_supported is not False:
         try:
-            field_value = getattr(model, field.name)
-            field_value = field_value_check(field, field_value, id_fields)
-        except AttributeError:
-            continue
-        field_name = (
-            f'{field.name}_id' if field.name in id_fields else field.name)
-        field_values[field_name] = field_value
-    return field_values
-
-
-def get_url():
-    """Получение url для запроса."""
+            response = client.post(SCHEDULE_BULK_PATH, payloads)
+        except (CircuitOpenError, requests.RequestException) as exc:
+            logger.warning(
+                '%s! Service is not available' % exc.__class__.__name__
+            )
+            return [payload['id'] for payload in payloads]
+        if response.status_code in {
+            requests.status_codes.codes.ok,
+            requests.status_codes.codes.created,
+        }:
+            client.bulk_supported = True
+            return []
+        if response.status_code not in {
+            requests.status_codes.codes.not_found,
+            requests.status_codes.codes.method_not_allowed,
+        }:
+            logger.warning(
+                'Fail! Response status code %s' % response.status_code
+            )
+            return [payload['id'] for payload in payloads]
+        client.bulk_supported = False
+
+    workers = workers or env.int('SCHEDULE_FANOUT_WORKERS', 8)
+    with ThreadPoolExecutor(max_workers=min(workers, len(payloads))) as pool:
+        results = pool.map(_push_one, payloads)
+        return [
+            payload['id']
+            for payload, success in zip(payloads, results)
+            if not success
+        ]
+
+
+def push_schedules(
+        payloads: Iterable[dict],
+        chunk_size: int = None,
+) -> Iterator[tuple[int, list]]:
+    """Отправка расписаний планировщику пачками.
+
+    Yields:
+        количество расписаний в пачке и идентификаторы неотправленных.
+    """
+    chunk_size = chunk_size or env.int('SCHEDULE_BULK_CHUNK_SIZE', 500)
+    for chunk in chunked(payloads, chunk_size):
+        yield len(chunk), push_schedule_batch(chunk)
+
+
+def get_base_url():
+    """Получение базового url планировщика."""
     schedule_host = env.str('SCHEDULE_HOST')
     schedule_port = env.int('SCHEDULE_PORT')
-    return f' http://{schedule_host}:{schedule_port}/api/v1/schedule'
+    return f'http://{schedule_host}:{schedule_port}'
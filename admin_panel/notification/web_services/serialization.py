@@ -0,0 +1,84 @@
+"""Сериализация моделей для отправки во внешние сервисы."""
+from functools import lru_cache
+from typing import Callable, Iterable, Iterator
+
+from django.db import models
+
+
+def _to_str(value):
+    return None if value is None else str(value)
+
+
+def _as_is(value):
+    return value
+
+
+def get_converter(field: models.Field) -> Callable:
+    """Функция приведения значения поля к виду, пригодному для JSON."""
+    if field.is_relation:
+        field = field.target_field
+    if isinstance(field, (models.DateField, models.UUIDField)):
+        return _to_str
+    return _as_is
+
+
+class SerializationPlan:
+    """План сериализации модели.
+
+    Список полей, имена ключей (`<fk>_id` для внешних ключей) и функции
+    приведения значений вычисляются один раз на класс модели. Пустые
+    значения, как и раньше, передаются как `None`.
+    """
+
+    def __init__(self, model: type[models.Model]):
+        self.model = model
+        fields = model._meta.concrete_fields
+        self.columns = tuple(field.attname for field in fields)
+        self.converters = tuple(
+            (field.attname, get_converter(field)) for field in fields
+        )
+
+    def raw(self, instance: models.Model) -> dict:
+        """Значения полей экземпляра в том виде, в каком их вернёт `.values()`."""
+        return {column: getattr(instance, column) for column in self.columns}
+
+    def dump(self, instance: models.Model) -> dict:
+        """Значения полей экземпляра модели."""
+        return {
+            column: convert(getattr(instance, column)) or None
+            for column, convert in self.converters
+        }
+
+    def dump_rows(self, rows: Iterable[dict]) -> Iterator[dict]:
+        """Значения полей строк, полученных через `.values()`."""
+        converters = self.converters
+        for row in rows:
+            yield {
+                column: convert(row[column]) or None
+                for column, convert in converters
+            }
+
+    def dump_queryset(
+            self,
+            queryset: models.QuerySet,
+            chunk_size: int = 2000,
+    ) -> Iterator[dict]:
+        """Значения полей всех строк запроса без создания экземпляров."""
+        rows = queryset.values(*self.columns).iterator(chunk_size=chunk_size)
+        return self.dump_rows(rows)
+
+
+@lru_cache(maxsize=None)
+def get_plan(model: type[models.Model]) -> SerializationPlan:
+    """План сериализации модели, кэшируется на класс модели."""
+    return SerializationPlan(model)
+
+
+def get_field_values(instance: models.Model) -> dict:
+    """Получение значений полей модели."""
+    return get_plan(type(instance)).dump(instance)
+
+
+def serialize_queryset(queryset: models.QuerySet, **kwargs) -> Iterator[dict]:
+    """Получение значений полей всех моделей запроса."""
+    return get_plan(queryset.model).dump_queryset(queryset, **kwargs)
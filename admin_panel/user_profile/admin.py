@@ -8,6 +8,8 @@ class UserProfileModelAdmin(UseDbAdminMixin):
     """Определяем БД для работы."""
 
     using = 'profile_db'
+    # ObjectId растёт со временем создания документа.
+    keyset_ordering = '-_id'
 
 
 @admin.register(Bookmark)
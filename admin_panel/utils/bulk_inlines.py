@@ -0,0 +1,255 @@
+"""Сохранение строк inline набором запросов.
+
+Вместо запроса на каждую строку изменения всех строк inline
+сохраняются одним `DELETE`, одним `UPDATE` (`bulk_update`) и одним
+`INSERT ... ON CONFLICT DO NOTHING` (`bulk_create`) в транзакции
+страницы объекта. Уникальность строк и выбранные во внешних ключах
+объекты проверяются одним запросом на ограничение и на поле.
+"""
+from django import forms
+from django.core.exceptions import NON_FIELD_ERRORS, ValidationError
+from django.db import router
+from django.db.models import Q
+
+from utils.paginated_inlines import PaginatedInlineForm, PaginatedInlineFormSet
+
+
+def get_key_field(model, to_field_name: str | None):
+    """Поле модели, по значению которого выбирается объект."""
+    if to_field_name:
+        return model._meta.get_field(to_field_name)
+    return model._meta.pk
+
+
+class PrefetchedModelChoiceField(forms.ModelChoiceField):
+    """Поле выбора объекта, объекты которого заранее читает набор форм.
+
+    Пока `prefetched` не задан, объект читается из БД как обычно.
+    """
+
+    prefetched = None
+
+    def get_key(self, value):
+        field = get_key_field(self.queryset.model, self.to_field_name)
+        return field.to_python(value)
+
+    def to_python(self, value):
+        if self.prefetched is None or value in self.empty_values:
+            return super().to_python(value)
+        try:
+            key = self.get_key(value)
+        except ValidationError:
+            key = None
+        obj = self.prefetched.get(key)
+        if obj is None:
+            raise ValidationError(
+                self.error_messages['invalid_choice'],
+                code='invalid_choice',
+                params={'value': value},
+            )
+        return obj
+
+
+class BulkInlineForm(PaginatedInlineForm):
+    """Форма строки inline без проверок запросами к БД.
+
+    Уникальность проверяет `BulkInlineFormSet` сразу для всех строк,
+    значения полей ограничений и внешних ключей проверяют поля формы.
+    """
+
+    def _get_validation_exclusions(self):
+        exclude = super()._get_validation_exclusions()
+        opts = self.instance._meta
+        exclude.add(opts.pk.name)
+        for constraint in opts.total_unique_constraints:
+            exclude.update(constraint.fields)
+        exclude.update(
+            name for name, field in self.fields.items()
+            if isinstance(field, PrefetchedModelChoiceField)
+        )
+        return exclude
+
+    def validate_unique(self):
+        pass
+
+
+class BulkInlineFormSet(PaginatedInlineFormSet):
+    """Набор форм inline, сохраняемый набором запросов."""
+
+    def get_db(self) -> str:
+        return router.db_for_write(self.model, instance=self.instance)
+
+    def add_fields(self, form, index):
+        super().add_fields(form, index)
+        # Объекты строк тоже читаются одним запросом.
+        name = self.model._meta.pk.name
+        field = form.fields.get(name)
+        if type(field) is forms.ModelChoiceField:
+            form.fields[name] = PrefetchedModelChoiceField(
+                field.queryset,
+                initial=field.initial,
+                required=False,
+                widget=field.widget,
+            )
+
+    def get_changed_forms(self) -> list:
+        """Изменённые и новые формы, кроме отмеченных на удаление."""
+        return [
+            form for form in self.forms
+            if form.has_changed()
+            and not (self.can_delete and self._should_delete_form(form))
+        ]
+
+    def prefetch_choices(self):
+        """Чтение объектов, выбранных в изменённых формах, запросом на поле."""
+        forms_by_field = {}
+        for form in self.forms:
+            if not form.has_changed():
+                continue
+            for name, field in form.fields.items():
+                if isinstance(field, PrefetchedModelChoiceField):
+                    forms_by_field.setdefault(name, []).append(form)
+
+        for name, field_forms in forms_by_field.items():
+            field = field_forms[0].fields[name]
+            key_field = get_key_field(
+                field.queryset.model, field.to_field_name,
+            )
+            keys = set()
+            for form in field_forms:
+                try:
+                    key = field.get_key(form[name].data)
+                except ValidationError:
+                    continue
+                if key is not None:
+                    keys.add(key)
+            prefetched = {
+                getattr(obj, key_field.attname): obj
+                for obj in field.queryset.filter(
+                    **{f'{key_field.name}__in': keys},
+                )
+            }
+            for form in field_forms:
+                form.fields[name].prefetched = prefetched
+
+    def full_clean(self):
+        if self.is_bound:
+            self.prefetch_choices()
+        super().full_clean()
+
+    def validate_unique(self):
+        super().validate_unique()
+        errors = []
+        changed_forms = [
+            form for form in self.get_changed_forms() if form.is_valid()
+        ]
+        # Строки изменённых и удаляемых объектов в БД не учитываются:
+        # их значения будут заменены или удалены.
+        replaced = [
+            form.instance.pk for form in self.initial_forms
+            if form.instance.pk is not None
+            and (form in changed_forms or form in self.deleted_forms)
+        ]
+        for constraint in self.model._meta.total_unique_constraints:
+            attnames = [
+                self.model._meta.get_field(name).attname
+                for name in constraint.fields
+            ]
+            rows = {}
+            duplicates = []
+            for form in changed_forms:
+                row = tuple(getattr(form.instance, name) for name in attnames)
+                if None in row:
+                    continue
+                if row in rows:
+                    duplicates.append(form)
+                else:
+                    rows[row] = form
+            if not rows:
+                continue
+
+            condition = Q()
+            for row in rows:
+                condition |= Q(**dict(zip(attnames, row)))
+            existing = (
+                self.model._base_manager.using(self.get_db())
+                .filter(condition)
+                .exclude(pk__in=replaced)
+                .values_list(*attnames)
+            )
+            duplicates.extend(rows[tuple(row)] for row in existing)
+            if duplicates:
+                errors.append(self.get_unique_error_message(constraint.fields))
+            for form in duplicates:
+                form._errors[NON_FIELD_ERRORS] = self.error_class(
+                    [self.get_form_error()], renderer=self.renderer,
+                )
+        if errors:
+            raise ValidationError(errors)
+
+    def save(self, commit=True):
+        if not commit:
+            return super().save(commit=False)
+
+        self.new_objects = []
+        self.changed_objects = []
+        self.deleted_objects = []
+        saved_forms = []
+        changed_fields = set()
+        for form in self.initial_forms:
+            obj = form.instance
+            if obj.pk is None:
+                continue
+            if form in self.deleted_forms:
+                self.deleted_objects.append(obj)
+            elif form.has_changed():
+                self.save_existing(form, obj, commit=False)
+                self.changed_objects.append((obj, form.changed_data))
+                changed_fields.update(form.changed_data)
+                saved_forms.append(form)
+        for form in self.extra_forms:
+            if not form.has_changed():
+                continue
+            if self.can_delete and self._should_delete_form(form):
+                continue
+            self.new_objects.append(self.save_new(form, commit=False))
+            saved_forms.append(form)
+
+        manager = self.model._base_manager.using(self.get_db())
+        if self.deleted_objects:
+            manager.filter(
+                pk__in=[obj.pk for obj in self.deleted_objects],
+            ).delete()
+        if self.changed_objects:
+            fields = []
+            for field in self.model._meta.concrete_fields:
+                if field.primary_key:
+                    continue
+                if getattr(field, 'auto_now', False):
+                    for obj, _ in self.changed_objects:
+                        field.pre_save(obj, add=False)
+                    fields.append(field.name)
+                elif field.name in changed_fields:
+                    fields.append(field.name)
+            manager.bulk_update(
+                [obj for obj, _ in self.changed_objects], fields,
+            )
+        if self.new_objects:
+            manager.bulk_create(self.new_objects, ignore_conflicts=True)
+        for form in saved_forms:
+            form.save_m2m()
+        return [obj for obj, _ in self.changed_objects] + self.new_objects
+
+
+class BulkInlineMixin:
+    """Миксин inline, сохраняющего строки набором запросов.
+
+    Используется вместе с `PaginatedInlineMixin`.
+    """
+
+    form = BulkInlineForm
+    formset = BulkInlineFormSet
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        kwargs.setdefault('form_class', PrefetchedModelChoiceField)
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
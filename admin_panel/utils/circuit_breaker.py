@@ -0,0 +1,77 @@
+"""Предохранитель (circuit breaker) для обращений к внешним сервисам."""
+import threading
+import time
+
+
+class CircuitOpenError(Exception):
+    """Предохранитель разомкнут, обращение к сервису не выполняется."""
+
+
+class CircuitBreaker:
+    """Предохранитель для обращений к внешнему сервису.
+
+    После `failure_threshold` ошибок подряд предохранитель размыкается
+    и на `reset_timeout` секунд запрещает обращения к сервису. По
+    истечении таймаута пропускается одно пробное обращение: при успехе
+    предохранитель замыкается, при ошибке снова размыкается.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """Текущее состояние предохранителя."""
+        with self._lock:
+            return self._state()
+
+    def _state(self) -> str:
+        if self._opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow_request(self) -> bool:
+        """Можно ли сейчас обращаться к сервису."""
+        with self._lock:
+            state = self._state()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def before_call(self):
+        """Проверка перед обращением к сервису.
+
+        Raises:
+            CircuitOpenError: предохранитель разомкнут.
+        """
+        if not self.allow_request():
+            raise CircuitOpenError
+
+    def record_success(self):
+        """Фиксация успешного обращения."""
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        """Фиксация неудачного обращения."""
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._probing = False
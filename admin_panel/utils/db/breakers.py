@@ -0,0 +1,165 @@
+"""Предохранители обращений админки к БД.
+
+Для каждого псевдонима БД в процессе держится свой предохранитель.
+Пока он разомкнут, страницы моделей этой БД сразу сообщают о её
+недоступности, не дожидаясь таймаута соединения. Доступность БД в это
+время проверяет фоновый поток, который замыкает предохранитель, когда
+БД снова отвечает.
+"""
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.db import DatabaseError, OperationalError, connections
+from django.utils.connection import ConnectionDoesNotExist
+from pymongo.errors import ConnectionFailure
+
+from utils.circuit_breaker import CircuitBreaker
+
+_breakers = {}
+_probes = set()
+_lock = threading.Lock()
+
+
+def get_breaker(alias: str) -> CircuitBreaker:
+    """Предохранитель БД."""
+    with _lock:
+        breaker = _breakers.get(alias)
+        if breaker is None:
+            breaker = _breakers[alias] = CircuitBreaker(
+                settings.ADMIN_DB_FAILURE_THRESHOLD,
+                settings.ADMIN_DB_RESET_TIMEOUT,
+            )
+        return breaker
+
+
+def is_unavailable(error: Exception) -> bool:
+    """Вызвана ли ошибка недоступностью БД.
+
+    djongo оборачивает ошибки pymongo в `DatabaseError`, поэтому для
+    MongoDB проверяется и исходное исключение.
+    """
+    while error is not None:
+        if isinstance(
+                error,
+                (ConnectionDoesNotExist, OperationalError, ConnectionFailure),
+        ):
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
+
+def is_broken(alias: str) -> bool:
+    """Потеряно ли соединение потока с БД.
+
+    Позволяет не учитывать в предохранителе БД ошибки других БД,
+    к которым обращалась та же страница: ошибка учитывается, только если
+    она прошла через соединение этой БД (`errors_occurred`), и это
+    соединение не открылось или перестало отвечать.
+    """
+    try:
+        connection = connections[alias]
+    except ConnectionDoesNotExist:
+        return True
+    if not connection.errors_occurred:
+        return False
+    if connection.vendor == 'djongo':
+        return True
+    return connection.connection is None or not connection.is_usable()
+
+
+def clear_errors(alias: str):
+    """Сброс признака ошибки неоткрытого соединения потока с БД.
+
+    Django сбрасывает признак при открытии соединения, поэтому после
+    неудачной попытки открыть соединение он остаётся до следующей.
+    """
+    try:
+        connection = connections[alias]
+    except ConnectionDoesNotExist:
+        return
+    if connection.connection is None:
+        connection.errors_occurred = False
+
+
+def check_database(alias: str):
+    """Проверка доступности БД запросом к серверу.
+
+    Raises:
+        DatabaseError, ConnectionFailure: БД недоступна.
+    """
+    connection = connections[alias]
+    connection.ensure_connection()
+    if connection.vendor == 'djongo':
+        connection.client_connection.admin.command('ping')
+    else:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+
+
+def ping(alias: str) -> bool:
+    """Доступна ли БД."""
+    try:
+        check_database(alias)
+    except (DatabaseError, ConnectionFailure):
+        connections[alias].close()
+        return False
+    return True
+
+
+def _probe(alias: str, breaker: CircuitBreaker):
+    try:
+        while breaker.state != breaker.CLOSED:
+            time.sleep(breaker.reset_timeout)
+            if ping(alias):
+                breaker.record_success()
+            else:
+                breaker.record_failure()
+    finally:
+        connections.close_all()
+        with _lock:
+            _probes.discard(alias)
+
+
+def start_probe(alias: str, breaker: CircuitBreaker):
+    """Запуск фоновой проверки БД, если она ещё не запущена."""
+    with _lock:
+        if alias in _probes:
+            return
+        _probes.add(alias)
+    threading.Thread(
+        target=_probe, args=(alias, breaker), daemon=True,
+        name=f'db-probe-{alias}',
+    ).start()
+
+
+def is_available(alias: str) -> bool:
+    """Замкнут ли предохранитель БД."""
+    breaker = get_breaker(alias)
+    if breaker.state == breaker.CLOSED:
+        return True
+    start_probe(alias, breaker)
+    return False
+
+
+def record_success(alias: str):
+    """Фиксация успешного обращения к БД."""
+    get_breaker(alias).record_success()
+
+
+def record_failure(alias: str):
+    """Фиксация недоступности БД."""
+    breaker = get_breaker(alias)
+    breaker.record_failure()
+    if breaker.state != breaker.CLOSED:
+        start_probe(alias, breaker)
+
+
+def _after_fork():
+    global _lock
+    _probes.clear()
+    _lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_after_fork)
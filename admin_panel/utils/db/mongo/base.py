@@ -0,0 +1,120 @@
+"""MongoDB (djongo) с одним клиентом на процесс.
+
+Стандартный бэкенд djongo создаёт новый `MongoClient` со своим пулом
+соединений для каждого соединения Django и закрывает его в конце
+запроса. Здесь клиент создаётся один раз на процесс и псевдоним БД,
+а размер его пула задаётся ключом `POOL` настроек БД. Соединения пула
+проверяет сам pymongo перед выдачей.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from djongo import base
+from pymongo import MongoClient, monitoring
+
+from utils.db.pool import PoolStats, get_options, get_pool
+
+
+class PoolListener(monitoring.ConnectionPoolListener):
+    """Сбор статистики пула соединений pymongo."""
+
+    def __init__(self):
+        self.stats = PoolStats()
+        self.open = 0
+        self.in_use = 0
+        self._started = threading.local()
+        # События приходят из потоков запросов и фоновых потоков pymongo.
+        self._lock = threading.Lock()
+
+    def pool_created(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        with self._lock:
+            self.open += 1
+            self.stats.created += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.open -= 1
+            self.stats.closed += 1
+
+    def connection_check_out_started(self, event):
+        self._started.value = time.monotonic()
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self.stats.timeouts += 1
+
+    def connection_checked_out(self, event):
+        started = getattr(self._started, 'value', None)
+        with self._lock:
+            self.in_use += 1
+            self.stats.checkouts += 1
+            if started is not None:
+                self.stats.add_wait(time.monotonic() - started)
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.in_use -= 1
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {
+                'in_use': self.in_use,
+                'idle': self.open - self.in_use,
+                **self.stats.as_dict(),
+            }
+
+
+class MongoPool:
+    """Клиент MongoDB процесса вместе со статистикой его пула."""
+
+    def __init__(self, connection_params: dict, options: dict):
+        self.listener = PoolListener()
+        self.max_size = options['max_size']
+        self.client = MongoClient(
+            **connection_params,
+            minPoolSize=options['min_size'],
+            maxPoolSize=options['max_size'],
+            maxIdleTimeMS=int(options['max_idle'] * 1000),
+            waitQueueTimeoutMS=int(options['timeout'] * 1000),
+            event_listeners=[self.listener],
+            connect=False,
+        )
+
+    def close(self):
+        self.client.close()
+
+    def as_dict(self) -> dict:
+        return {'max_size': self.max_size, **self.listener.as_dict()}
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """Соединения Django используют общий клиент процесса."""
+
+    def get_new_connection(self, connection_params):
+        name = connection_params.pop('name')
+        enforce_schema = connection_params.pop('enforce_schema')
+        connection_params['document_class'] = OrderedDict
+        pool = get_pool(self.alias, lambda: MongoPool(
+            connection_params, get_options(self.settings_dict),
+        ))
+        self.client_connection = pool.client
+        self.djongo_connection = base.DjongoClient(
+            pool.client[name], enforce_schema,
+        )
+        return pool.client[name]
+
+    def _close(self):
+        """Клиент процесса не закрывается вместе с соединением Django."""
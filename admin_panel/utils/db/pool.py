@@ -0,0 +1,263 @@
+"""Пулы соединений с БД.
+
+Для каждого псевдонима БД в процессе держится свой пул. Соединение
+выдаётся Django при открытии соединения и возвращается в пул при его
+закрытии в конце запроса, поэтому запрос не тратит время на установку
+соединения и аутентификацию.
+
+После `fork` (например, в воркерах gunicorn с `--preload`) пулы
+процесса-родителя не используются: унаследованные соединения
+отбрасываются без закрытия, чтобы не разорвать сессии родителя.
+"""
+import os
+import threading
+import time
+from collections import deque
+
+from django.db import OperationalError
+
+DEFAULTS = {
+    'MIN_SIZE': 0,
+    'MAX_SIZE': 10,
+    'MAX_IDLE': 300,
+    'TIMEOUT': 10,
+    'PING_INTERVAL': 5,
+}
+
+
+class PoolTimeout(OperationalError):
+    """Нет свободного соединения в пуле."""
+
+
+class PoolStats:
+    """Статистика пула."""
+
+    def __init__(self):
+        self.created = 0
+        self.closed = 0
+        self.checkouts = 0
+        self.waits = 0
+        self.timeouts = 0
+        self.failed_checks = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def add_wait(self, elapsed: float):
+        self.waits += 1
+        self.total_wait += elapsed
+        self.max_wait = max(self.max_wait, elapsed)
+
+    def as_dict(self) -> dict:
+        return {
+            'created': self.created,
+            'closed': self.closed,
+            'checkouts': self.checkouts,
+            'waits': self.waits,
+            'timeouts': self.timeouts,
+            'failed_checks': self.failed_checks,
+            'avg_wait': self.total_wait / self.waits if self.waits else 0.0,
+            'max_wait': self.max_wait,
+        }
+
+
+class ConnectionPool:
+    """Пул соединений DB-API.
+
+    Args:
+        check: проверка соединения перед выдачей, должна бросать
+            исключение, если соединение неработоспособно;
+        reset: подготовка соединения к возврату в пул, возвращает False,
+            если соединение нужно закрыть;
+        min_size: сколько простаивающих соединений не закрывать;
+        max_size: максимальное количество соединений;
+        max_idle: через сколько секунд простоя закрывать соединение;
+        timeout: сколько секунд ждать свободного соединения;
+        ping_interval: через сколько секунд простоя проверять соединение
+            перед выдачей, 0 - проверять всегда.
+    """
+
+    def __init__(
+            self,
+            check,
+            reset,
+            min_size: int = DEFAULTS['MIN_SIZE'],
+            max_size: int = DEFAULTS['MAX_SIZE'],
+            max_idle: float = DEFAULTS['MAX_IDLE'],
+            timeout: float = DEFAULTS['TIMEOUT'],
+            ping_interval: float = DEFAULTS['PING_INTERVAL'],
+    ):
+        self.check = check
+        self.reset = reset
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_idle = max_idle
+        self.timeout = timeout
+        self.ping_interval = ping_interval
+        self.stats = PoolStats()
+        self._idle = deque()
+        self._in_use = 0
+        self._condition = threading.Condition()
+
+    @property
+    def size(self) -> int:
+        return len(self._idle) + self._in_use
+
+    def _close(self, connection):
+        with self._condition:
+            self.stats.closed += 1
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def _evict(self, now: float) -> list:
+        """Устаревшие простаивающие соединения, удаляемые из пула."""
+        expired = []
+        while (
+                len(self._idle) > self.min_size
+                and now - self._idle[0][1] > self.max_idle
+        ):
+            expired.append(self._idle.popleft()[0])
+        return expired
+
+    def _reserve(self):
+        """Простаивающее соединение, None - можно открыть новое."""
+        started = None
+        with self._condition:
+            while True:
+                for connection in self._evict(time.monotonic()):
+                    self._close(connection)
+                if self._idle:
+                    connection, released = self._idle.pop()
+                    break
+                if self.size < self.max_size:
+                    connection = released = None
+                    break
+                if started is None:
+                    started = time.monotonic()
+                remaining = self.timeout - (time.monotonic() - started)
+                if remaining <= 0 or not self._condition.wait(remaining):
+                    self.stats.timeouts += 1
+                    raise PoolTimeout(
+                        f'No free connection in the pool '
+                        f'({self.max_size}) after {self.timeout}s'
+                    )
+            self._in_use += 1
+            self.stats.checkouts += 1
+            if started is not None:
+                self.stats.add_wait(time.monotonic() - started)
+        return connection, released
+
+    def get(self, connect):
+        """Соединение из пула.
+
+        Args:
+            connect: функция открытия нового соединения, если в пуле нет
+                свободного.
+        """
+        while True:
+            connection, released = self._reserve()
+            if connection is None:
+                break
+            if time.monotonic() - released < self.ping_interval:
+                return connection
+            try:
+                self.check(connection)
+            except Exception:
+                with self._condition:
+                    self.stats.failed_checks += 1
+                self._discard(connection)
+                continue
+            return connection
+
+        try:
+            connection = connect()
+        except Exception:
+            self._release_slot()
+            raise
+        with self._condition:
+            self.stats.created += 1
+        return connection
+
+    def put(self, connection):
+        """Возврат соединения в пул."""
+        try:
+            usable = self.reset(connection)
+        except Exception:
+            usable = False
+        if not usable:
+            self._discard(connection)
+            return
+        with self._condition:
+            self._in_use -= 1
+            self._idle.append((connection, time.monotonic()))
+            self._condition.notify()
+
+    def _discard(self, connection):
+        self._close(connection)
+        self._release_slot()
+
+    def _release_slot(self):
+        with self._condition:
+            self._in_use -= 1
+            self._condition.notify()
+
+    def close(self):
+        """Закрытие простаивающих соединений."""
+        with self._condition:
+            idle, self._idle = self._idle, deque()
+        for connection, _ in idle:
+            self._close(connection)
+
+    def as_dict(self) -> dict:
+        with self._condition:
+            return {
+                'in_use': self._in_use,
+                'idle': len(self._idle),
+                'max_size': self.max_size,
+                **self.stats.as_dict(),
+            }
+
+
+_pools = {}
+_lock = threading.Lock()
+# Соединения, унаследованные от родительского процесса. Ссылки на них
+# хранятся, чтобы сборщик мусора не закрыл общие с родителем сессии.
+_inherited = []
+
+
+def get_options(settings_dict: dict) -> dict:
+    """Параметры пула из настроек БД."""
+    options = {**DEFAULTS, **settings_dict.get('POOL', {})}
+    return {key.lower(): value for key, value in options.items()}
+
+
+def get_pool(alias: str, factory):
+    """Пул псевдонима БД, при отсутствии - создание через `factory`."""
+    pool = _pools.get(alias)
+    if pool is None:
+        with _lock:
+            pool = _pools.get(alias)
+            if pool is None:
+                pool = _pools[alias] = factory()
+    return pool
+
+
+def get_stats() -> dict:
+    """Статистика всех пулов процесса."""
+    return {alias: pool.as_dict() for alias, pool in _pools.items()}
+
+
+def _after_fork():
+    global _lock
+    from django.db import connections
+
+    _inherited.extend(_pools.values())
+    _pools.clear()
+    _lock = threading.Lock()
+    for connection in connections.all(initialized_only=True):
+        _inherited.append(connection.connection)
+        connection.connection = None
+
+
+os.register_at_fork(after_in_child=_after_fork)
@@ -0,0 +1,57 @@
+"""PostgreSQL с пулом соединений процесса."""
+from functools import partial
+
+from django.db.backends.postgresql import base
+from psycopg2 import extensions
+
+from utils.db.pool import ConnectionPool, get_options, get_pool
+
+
+def check(connection):
+    """Проверка соединения запросом к серверу."""
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT 1')
+
+
+def reset(connection) -> bool:
+    """Откат незавершённой транзакции и сброс сессии перед возвратом в пул.
+
+    `DISCARD ALL` сбрасывает параметры сессии, временные таблицы,
+    подготовленные запросы, курсоры и рекомендательные блокировки, чтобы
+    они не достались следующему запросу. Часовой пояс и роль Django
+    заново устанавливает при каждой выдаче соединения.
+    """
+    if connection.closed:
+        return False
+    status = connection.info.transaction_status
+    if status == extensions.TRANSACTION_STATUS_UNKNOWN:
+        return False
+    if status != extensions.TRANSACTION_STATUS_IDLE:
+        connection.rollback()
+    # DISCARD ALL нельзя выполнить внутри транзакции.
+    connection.autocommit = True
+    with connection.cursor() as cursor:
+        cursor.execute('DISCARD ALL')
+    return True
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """Соединения берутся из пула и возвращаются в него при закрытии.
+
+    Параметры пула задаются ключом `POOL` настроек БД.
+    """
+
+    def get_pool(self) -> ConnectionPool:
+        return get_pool(self.alias, lambda: ConnectionPool(
+            check, reset, **get_options(self.settings_dict),
+        ))
+
+    def get_new_connection(self, conn_params):
+        return self.get_pool().get(
+            partial(super().get_new_connection, conn_params),
+        )
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                self.get_pool().put(self.connection)
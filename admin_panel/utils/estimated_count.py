@@ -0,0 +1,120 @@
+"""Оценка количества объектов в списках админки.
+
+Для больших таблиц PostgreSQL точный `COUNT(*)` читает всю таблицу или
+индекс, поэтому вместо него берётся оценка количества строк
+планировщиком (`EXPLAIN`), которая для запроса без условий совпадает с
+`pg_class.reltuples`. Если оценка меньше порога, количество считается
+точно.
+"""
+import hashlib
+import json
+
+from django.conf import settings
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.views.main import ChangeList
+from django.core.cache import cache
+from django.core.paginator import InvalidPage, Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+
+def estimate_count(queryset) -> int | None:
+    """Оценка количества строк запроса планировщиком PostgreSQL.
+
+    Для других СУБД возвращает None.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    query = queryset.order_by().values('pk').query
+    sql, params = query.get_compiler(using=queryset.db).as_sql()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def count_objects(queryset, threshold: int) -> tuple[int, bool]:
+    """Количество объектов и признак того, что это оценка."""
+    estimate = estimate_count(queryset)
+    if estimate is None or estimate < threshold:
+        return queryset.count(), False
+    return estimate, True
+
+
+def cached_count(queryset, threshold: int, timeout: int) -> tuple[int, bool]:
+    """Количество объектов с хранением в кэше в течение `timeout` секунд."""
+    sql, params = queryset.query.get_compiler(using=queryset.db).as_sql()
+    digest = hashlib.blake2b(
+        f'{sql}{params}'.encode(), digest_size=16,
+    ).hexdigest()
+    key = f'admin-count:{queryset.db}:{digest}'
+    result = cache.get(key)
+    if result is None:
+        result = count_objects(queryset, threshold)
+        cache.set(key, result, timeout)
+    return tuple(result)
+
+
+class EstimatedCountPaginator(Paginator):
+    """Пагинатор с оценкой количества объектов для больших таблиц."""
+
+    def __init__(self, *args, threshold: int, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.threshold = threshold
+        self.estimated = False
+
+    @cached_property
+    def count(self):
+        count, self.estimated = count_objects(self.object_list, self.threshold)
+        return count
+
+
+class EstimatedCountChangeList(ChangeList):
+    """Список объектов с оценкой количества объектов.
+
+    Количество объектов без фильтров хранится в кэше
+    `ADMIN_FULL_COUNT_TTL` секунд, а если фильтры и поиск не заданы,
+    не запрашивается отдельно.
+    """
+
+    def get_results(self, request):
+        paginator = self.model_admin.get_paginator(
+            request, self.queryset, self.list_per_page,
+        )
+        result_count = paginator.count
+        self.count_estimated = paginator.estimated
+
+        if not self.model_admin.show_full_result_count:
+            full_result_count = None
+        elif self.has_active_filters or self.query:
+            full_result_count, _ = cached_count(
+                self.root_queryset,
+                paginator.threshold,
+                settings.ADMIN_FULL_COUNT_TTL,
+            )
+        else:
+            full_result_count = result_count
+        can_show_all = result_count <= self.list_max_show_all
+        multi_page = result_count > self.list_per_page
+
+        if (self.show_all and can_show_all) or not multi_page:
+            result_list = self.queryset._clone()
+        else:
+            try:
+                result_list = paginator.page(self.page_num).object_list
+            except InvalidPage:
+                raise IncorrectLookupParameters
+
+        self.result_count = result_count
+        self.show_full_result_count = self.model_admin.show_full_result_count
+        self.show_admin_actions = (
+            not self.show_full_result_count or bool(full_result_count)
+        )
+        self.full_result_count = full_result_count
+        self.result_list = result_list
+        self.can_show_all = can_show_all
+        self.multi_page = multi_page
+        self.paginator = paginator
@@ -0,0 +1,149 @@
+"""Проверка готовности сервиса.
+
+Все БД и планировщик проверяются одновременно, каждая проверка
+ограничена `HEALTH_TIMEOUT` секундами. Результат хранится
+`HEALTH_CACHE_TTL` секунд, поэтому частые запросы оркестратора и nginx
+не создают нагрузку на БД. Ответ содержит только результат и время
+каждой проверки, текст ошибки (адреса, имена БД) пишется в журнал.
+"""
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, TimeoutError, wait
+
+import requests
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+
+from notification.web_services.scheduler import get_base_url
+from utils.db.breakers import check_database
+
+logger = logging.getLogger(__name__)
+
+DATABASES = 'default', 'auth_db', 'movie_db', 'notification_db', 'profile_db'
+SCHEDULER = 'scheduler'
+
+
+def probe_database(alias: str):
+    """Проверка БД."""
+    try:
+        check_database(alias)
+    finally:
+        connections[alias].close()
+
+
+def probe_scheduler():
+    """Проверка планировщика: любой ответ, кроме 5xx."""
+    response = requests.get(get_base_url(), timeout=settings.HEALTH_TIMEOUT)
+    if response.status_code >= 500:
+        raise requests.HTTPError(f'HTTP {response.status_code}')
+
+
+def get_probes() -> dict:
+    probes = {alias: (probe_database, alias) for alias in DATABASES}
+    probes[SCHEDULER] = probe_scheduler,
+    return probes
+
+
+def run_probe(name: str, probe, *args) -> dict:
+    """Результат проверки и время её выполнения."""
+    started = time.perf_counter()
+    try:
+        probe(*args)
+    except Exception as e:
+        logger.warning('Health probe %s failed: %r', name, e)
+        result = {'ok': False}
+    else:
+        result = {'ok': True}
+    result['latency_ms'] = round((time.perf_counter() - started) * 1000, 1)
+    return result
+
+
+class HealthCheck:
+    """Одновременная проверка БД и планировщика с хранением результата.
+
+    Проверка, не успевшая завершиться за отведённое время, не
+    запускается повторно, пока не завершится, а считается неудачной.
+    """
+
+    def __init__(self):
+        self._running = {}
+        self._result = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _submit(self, name: str, probe, *args) -> Future:
+        """Запуск проверки в отдельном потоке.
+
+        Поток фоновый, чтобы зависшая проверка не задерживала
+        завершение процесса.
+        """
+        future = self._running.get(name)
+        if future is None or future.done():
+            future = self._running[name] = Future()
+            threading.Thread(
+                target=lambda: future.set_result(
+                    run_probe(name, probe, *args),
+                ),
+                daemon=True,
+                name=f'health-{name}',
+            ).start()
+        return future
+
+    def check(self) -> dict:
+        """Результаты всех проверок."""
+        started = time.perf_counter()
+        futures = {
+            name: self._submit(name, *probe)
+            for name, probe in get_probes().items()
+        }
+        wait(futures.values(), timeout=settings.HEALTH_TIMEOUT)
+
+        probes = {}
+        for name, future in futures.items():
+            try:
+                probes[name] = future.result(timeout=0)
+            except TimeoutError:
+                logger.warning('Health probe %s timed out', name)
+                probes[name] = {
+                    'ok': False,
+                    'latency_ms': round(
+                        (time.perf_counter() - started) * 1000, 1,
+                    ),
+                }
+
+        ready = all(
+            probes[name]['ok']
+            for name in settings.HEALTH_REQUIRED
+            if name in probes
+        )
+        return {
+            'status': 'ok' if ready else 'fail',
+            'checked_at': timezone.now().isoformat(),
+            'probes': probes,
+        }
+
+    def get(self) -> tuple[dict, bool]:
+        """Результат проверки и признак того, что он взят из кэша."""
+        with self._lock:
+            if (
+                    self._result is not None
+                    and time.monotonic() - self._checked_at
+                    < settings.HEALTH_CACHE_TTL
+            ):
+                return self._result, True
+            self._result = self.check()
+            self._checked_at = time.monotonic()
+            return self._result, False
+
+    def reset(self):
+        """Сброс после fork: потоки проверок не наследуются."""
+        self._running = {}
+        self._result = None
+        self._lock = threading.Lock()
+
+
+health_check = HealthCheck()
+os.register_at_fork(after_in_child=health_check.reset)
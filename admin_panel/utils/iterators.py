@@ -0,0 +1,12 @@
+"""Вспомогательные функции для работы с итераторами."""
+from itertools import islice
+from typing import Iterable, Iterator, TypeVar
+
+T = TypeVar('T')
+
+
+def chunked(iterable: Iterable[T], size: int) -> Iterator[list[T]]:
+    """Разбиение последовательности на пачки размером не больше `size`."""
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
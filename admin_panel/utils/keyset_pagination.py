@@ -0,0 +1,156 @@
+"""Постраничный вывод списка объектов админки по ключу (keyset).
+
+Вместо OFFSET/LIMIT страница выбирается условием на упорядочивающее
+поле и первичный ключ относительно последней строки предыдущей
+страницы, поэтому любая страница стоит столько же, сколько первая.
+Положение в списке передаётся в адресе параметрами `after` и `before`.
+Общее количество объектов не считается.
+"""
+import base64
+import json
+
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.views.main import ChangeList
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+
+AFTER_VAR = 'after'
+BEFORE_VAR = 'before'
+CURSOR_VARS = AFTER_VAR, BEFORE_VAR
+
+
+def encode_cursor(values) -> str:
+    """Курсор из значений ключа строки."""
+    data = json.dumps([str(value) for value in values]).encode()
+    return base64.urlsafe_b64encode(data).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> list:
+    """Значения ключа строки из курсора."""
+    try:
+        data = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(data)
+    except ValueError as e:
+        raise IncorrectLookupParameters(e) from e
+    if not isinstance(values, list):
+        raise IncorrectLookupParameters(cursor)
+    return values
+
+
+class KeysetChangeList(ChangeList):
+    """Список объектов с постраничным выводом по ключу.
+
+    Ключ - поле `keyset_ordering` админки и первичный ключ. Для
+    быстрой выборки по нему должен быть индекс, поле не должно
+    содержать NULL.
+    """
+
+    keyset = True
+
+    def __init__(self, request, *args, **kwargs):
+        self.next_url = self.previous_url = None
+        super().__init__(request, *args, **kwargs)
+
+    @property
+    def keyset_columns(self) -> list[tuple[str, bool]]:
+        """Поля ключа и признак убывания для каждого из них."""
+        ordering = self.model_admin.keyset_ordering
+        descending = ordering.startswith('-')
+        field = ordering.lstrip('-')
+        pk = self.lookup_opts.pk.name
+        columns = [(field, descending)]
+        if field not in (pk, 'pk'):
+            columns.append((pk, descending))
+        return columns
+
+    def get_filters_params(self, params=None):
+        params = super().get_filters_params(params)
+        for name in CURSOR_VARS:
+            params.pop(name, None)
+        return params
+
+    def get_query_string(self, new_params=None, remove=None):
+        # Смена фильтров или поиска возвращает на первую страницу.
+        new_params = {
+            **dict.fromkeys(CURSOR_VARS),
+            **(new_params or {}),
+        }
+        return super().get_query_string(new_params, remove)
+
+    def get_ordering(self, request, queryset):
+        return [
+            f'-{field}' if descending else field
+            for field, descending in self.keyset_columns
+        ]
+
+    def seek(self, queryset, cursor: str, backward: bool):
+        """Строки после (или перед) строкой с ключом из курсора.
+
+        Условие `(a, b) > (x, y)` записывается как
+        `a >= x AND NOT (a = x AND b <= y)`, чтобы по индексу на `a`
+        просматривался только диапазон, начинающийся с `x`.
+        """
+        columns = self.keyset_columns
+        values = decode_cursor(cursor)
+        if len(values) != len(columns):
+            raise IncorrectLookupParameters(cursor)
+
+        forward = columns[0][1] == backward
+        first, last = columns[0][0], columns[-1][0]
+        queryset = queryset.filter(
+            **{f'{first}__{"gte" if forward else "lte"}': values[0]},
+        ).exclude(
+            **dict(zip((field for field, _ in columns[:-1]), values)),
+            **{f'{last}__{"lte" if forward else "gte"}': values[-1]},
+        )
+
+        if backward:
+            queryset = queryset.reverse()
+        return queryset
+
+    def get_results(self, request):
+        after = request.GET.get(AFTER_VAR)
+        before = request.GET.get(BEFORE_VAR)
+        queryset = self.queryset
+        try:
+            if after:
+                queryset = self.seek(queryset, after, backward=False)
+            elif before:
+                queryset = self.seek(queryset, before, backward=True)
+            # Лишняя строка показывает, есть ли следующая страница.
+            rows = list(queryset[:self.list_per_page + 1])
+        except (ValidationError, ValueError, TypeError) as e:
+            raise IncorrectLookupParameters(e) from e
+
+        has_more = len(rows) > self.list_per_page
+        rows = rows[:self.list_per_page]
+        if before:
+            rows.reverse()
+        has_next = has_more if not before else True
+        has_previous = has_more if before else bool(after)
+
+        if rows and has_next:
+            self.next_url = self.get_query_string(
+                {AFTER_VAR: encode_cursor(self.get_key(rows[-1]))},
+            )
+        if rows and has_previous:
+            self.previous_url = self.get_query_string(
+                {BEFORE_VAR: encode_cursor(self.get_key(rows[0]))},
+            )
+
+        self.result_count = len(rows)
+        self.full_result_count = None
+        self.show_full_result_count = False
+        self.show_admin_actions = bool(rows)
+        self.result_list = rows
+        self.can_show_all = False
+        self.multi_page = bool(self.next_url or self.previous_url)
+        # Пагинатор админки может считать объекты запроса (оценка
+        # количества), здесь же достаточно строк страницы.
+        self.paginator = Paginator(rows, self.list_per_page)
+
+    def get_key(self, obj) -> list:
+        """Значения ключа строки."""
+        return [
+            obj.serializable_value(field) for field, _ in self.keyset_columns
+        ]
@@ -0,0 +1,174 @@
+"""Постраничный вывод строк inline в форме объекта.
+
+В форме объекта показывается первая страница связанных объектов,
+следующие страницы подгружаются по кнопке через `PaginatedInlinesMixin`.
+При сохранении из БД читаются только объекты, строки которых были в
+форме, а проверяются и сохраняются только изменённые строки.
+"""
+from django import forms
+from django.contrib.admin.utils import unquote
+from django.core.exceptions import BadRequest, PermissionDenied, ValidationError
+from django.forms.utils import ErrorDict
+from django.http import Http404, JsonResponse
+from django.template.loader import render_to_string
+from django.urls import path
+
+OFFSET_VAR = 'offset'
+
+
+class PaginatedInlineForm(forms.ModelForm):
+    """Форма строки inline, неизменённая строка не проверяется."""
+
+    def full_clean(self):
+        if (
+                self.is_bound
+                and self.instance.pk is not None
+                and not self.has_changed()
+        ):
+            self._errors = ErrorDict()
+            self.cleaned_data = {}
+            return
+        super().full_clean()
+
+
+class PaginatedInlineFormSet(forms.BaseInlineFormSet):
+    """Набор форм одной страницы связанных объектов.
+
+    Args:
+        offset: номер первого объекта страницы, он же номер первой
+            формы, чтобы формы подгруженных страниц продолжали
+            нумерацию форм в форме объекта.
+    """
+
+    per_page = 20
+
+    def __init__(self, *args, offset: int = 0, **kwargs):
+        self.offset = offset
+        # Есть ли объекты после страницы, None - неизвестно.
+        self.has_more = None
+        super().__init__(*args, **kwargs)
+
+    def add_prefix(self, index):
+        if isinstance(index, int):
+            index += self.offset
+        return super().add_prefix(index)
+
+    def get_submitted_pks(self) -> list:
+        """Первичные ключи объектов, строки которых были в форме."""
+        pk_field = self.model._meta.pk
+        pks = []
+        for i in range(self.initial_form_count()):
+            try:
+                pk = pk_field.to_python(
+                    self.data.get(f'{self.add_prefix(i)}-{pk_field.name}'),
+                )
+            except ValidationError:
+                continue
+            if pk is not None:
+                pks.append(pk)
+        return pks
+
+    def get_queryset(self):
+        if not hasattr(self, '_queryset'):
+            queryset = super().get_queryset()
+            if self.is_bound:
+                self._queryset = queryset.filter(
+                    pk__in=self.get_submitted_pks(),
+                )
+            else:
+                objects = list(
+                    queryset[self.offset:self.offset + self.per_page + 1],
+                )
+                self.has_more = len(objects) > self.per_page
+                self._queryset = objects[:self.per_page]
+        return self._queryset
+
+
+class PaginatedInlineMixin:
+    """Миксин табличного inline с постраничным выводом строк.
+
+    Порядок строк (`ordering`) должен поддерживаться индексом, иначе
+    для первой страницы БД сортирует все связанные объекты.
+    """
+
+    form = PaginatedInlineForm
+    formset = PaginatedInlineFormSet
+    template = 'admin/edit_inline/paginated_tabular.html'
+    # Количество строк на странице.
+    per_page = 20
+
+    def get_formset(self, request, obj=None, **kwargs):
+        formset = super().get_formset(request, obj, **kwargs)
+        formset.per_page = self.per_page
+        return formset
+
+
+class PaginatedInlinesMixin:
+    """Миксин админки на `UseDbAdminMixin` со страницами строк inline
+    из `PaginatedInlineMixin`.
+    """
+
+    def get_urls(self):
+        info = self.opts.app_label, self.opts.model_name
+        return [
+            path(
+                '<path:object_id>/inline/<str:prefix>/',
+                self.admin_site.admin_view(self.inline_page_view),
+                name='%s_%s_inline_page' % info,
+            ),
+            *super().get_urls(),
+        ]
+
+    def get_inline_formset(self, request, obj, prefix: str):
+        """Класс набора форм inline с префиксом `prefix` и сам inline.
+
+        Префиксы вычисляются так же, как в форме объекта.
+        """
+        prefixes = {}
+        for formset, inline in self.get_formsets_with_inlines(request, obj):
+            default = formset.get_default_prefix()
+            prefixes[default] = prefixes.get(default, 0) + 1
+            name = default
+            if prefixes[default] != 1 or not default:
+                name = f'{default}-{prefixes[default]}'
+            if name == prefix:
+                if not issubclass(formset, PaginatedInlineFormSet):
+                    break
+                return formset, inline
+        raise Http404(f'No paginated inline {prefix!r}')
+
+    def inline_page_view(self, request, object_id, prefix):
+        """Строки страницы inline, начиная с объекта `offset`."""
+        return self.call_db_view(
+            self.render_inline_page, request, object_id, prefix,
+        )
+
+    def render_inline_page(self, request, object_id, prefix):
+        obj = self.get_object(request, unquote(object_id))
+        if obj is None:
+            raise Http404
+        if not self.has_view_or_change_permission(request, obj):
+            raise PermissionDenied
+        try:
+            offset = int(request.GET.get(OFFSET_VAR, 0))
+        except ValueError:
+            raise BadRequest(f'Invalid {OFFSET_VAR}')
+        if offset < 0:
+            raise BadRequest(f'Invalid {OFFSET_VAR}')
+
+        formset_class, inline = self.get_inline_formset(request, obj, prefix)
+        formset = formset_class(
+            **self.get_formset_kwargs(request, obj, inline, prefix),
+            offset=offset,
+        )
+        inline_admin_formset, = self.get_inline_formsets(
+            request, [formset], [inline], obj,
+        )
+        # Пустая строка для добавления объектов уже есть в форме объекта.
+        inline_admin_formset.has_add_permission = False
+        html = render_to_string(
+            'admin/edit_inline/paginated_tabular_rows.html',
+            {'inline_admin_formset': inline_admin_formset},
+            request,
+        )
+        return JsonResponse({'html': html, 'more': formset.has_more})
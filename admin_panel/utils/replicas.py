@@ -0,0 +1,181 @@
+"""Чтение с реплик БД.
+
+Чтение из БД, у которой в `settings.DATABASE_REPLICAS` заданы реплики,
+направляется на одну из реплик. В пределах запроса выбранная реплика
+не меняется. Реплика, отставание которой больше `REPLICA_MAX_LAG`
+секунд или которая недоступна, не используется, чтение идёт с основной
+БД.
+
+После записи в БД чтение из неё до конца запроса и ещё
+`REPLICA_PIN_SECONDS` секунд (по cookie) идёт с основной БД, чтобы
+пользователь видел свои изменения. Запросы, изменяющие данные (не GET,
+HEAD, OPTIONS и TRACE), читают только с основных БД: формы, наборы
+форм и списки выбора при сохранении проверяются по актуальным данным.
+"""
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.db import DatabaseError, connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+PIN_COOKIE = 'db_pinned'
+# Отставание реплики в секундах. Если реплика применила всё полученное
+# с основной БД, отставания нет, даже если в основную БД давно не писали.
+LAG_QUERY = """
+SELECT CASE
+    WHEN NOT pg_is_in_recovery() THEN 0
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE coalesce(
+        extract(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0
+    )
+END
+"""
+READ_STATEMENTS = 'SELECT', 'SHOW', 'EXPLAIN'
+SAFE_METHODS = 'GET', 'HEAD', 'OPTIONS', 'TRACE'
+
+
+class ReplicaMonitor:
+    """Проверка отставания реплик с хранением результата.
+
+    Args:
+        max_lag: допустимое отставание, секунд;
+        check_interval: как долго помнить результат проверки, секунд.
+    """
+
+    def __init__(self, max_lag: float, check_interval: float):
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self._checked = {}
+        self._lock = threading.Lock()
+
+    def get_lag(self, alias: str) -> float | None:
+        """Отставание реплики, None - реплика недоступна."""
+        connection = connections[alias]
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(LAG_QUERY)
+                lag, = cursor.fetchone()
+        except DatabaseError:
+            connection.close()
+            return None
+        return float(lag)
+
+    def is_available(self, alias: str) -> bool:
+        """Можно ли читать с реплики."""
+        now = time.monotonic()
+        with self._lock:
+            checked = self._checked.get(alias)
+        if checked is not None and now - checked[0] < self.check_interval:
+            return checked[1]
+        lag = self.get_lag(alias)
+        available = lag is not None and lag <= self.max_lag
+        with self._lock:
+            self._checked[alias] = now, available
+        return available
+
+
+monitor = ReplicaMonitor(
+    settings.REPLICA_MAX_LAG, settings.REPLICA_CHECK_INTERVAL,
+)
+_state = threading.local()
+
+
+def get_state():
+    """Закреплённые за основной БД и выбранные реплики потока."""
+    if not hasattr(_state, 'pinned'):
+        start(())
+    return _state
+
+
+def start(pinned):
+    """Начало запроса: БД, закреплённые записью в прошлых запросах."""
+    _state.pinned = set(pinned) & set(settings.DATABASE_REPLICAS)
+    _state.written = set()
+    _state.chosen = {}
+
+
+def finish() -> set[str]:
+    """Конец запроса: БД, в которые писали в этом запросе."""
+    written = get_state().written
+    start(())
+    return written
+
+
+def use_primary():
+    """Чтение со всех основных БД до конца запроса."""
+    get_state().pinned.update(settings.DATABASE_REPLICAS)
+
+
+def pin(alias: str):
+    """Чтение из БД только с основной БД."""
+    state = get_state()
+    state.pinned.add(alias)
+    state.written.add(alias)
+
+
+def get_read_alias(alias: str) -> str:
+    """Псевдоним БД для чтения: реплика или сама основная БД."""
+    replicas = settings.DATABASE_REPLICAS.get(alias)
+    if not replicas:
+        return alias
+    state = get_state()
+    if alias in state.pinned:
+        return alias
+    chosen = state.chosen.get(alias)
+    if chosen is None:
+        available = [
+            replica for replica in replicas if monitor.is_available(replica)
+        ]
+        chosen = state.chosen[alias] = (
+            random.choice(available) if available else alias
+        )
+    return chosen
+
+
+def pin_on_write(execute, sql, params, many, context):
+    """Закрепление БД за основной при выполнении запроса на запись."""
+    if not sql.lstrip().upper().startswith(READ_STATEMENTS):
+        pin(context['connection'].alias)
+    return execute(sql, params, many, context)
+
+
+@receiver(connection_created)
+def watch_writes(sender, connection, **kwargs):
+    if (
+            connection.alias in settings.DATABASE_REPLICAS
+            and pin_on_write not in connection.execute_wrappers
+    ):
+        connection.execute_wrappers.append(pin_on_write)
+
+
+class ReplicaPinMiddleware:
+    """Чтение с основной БД после записи в неё.
+
+    БД, в которые писали при обработке запроса, запоминаются в cookie на
+    `REPLICA_PIN_SECONDS` секунд, чтобы, например, список объектов после
+    сохранения объекта в админке читался с основной БД.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        start(filter(None, request.COOKIES.get(PIN_COOKIE, '').split(',')))
+        if request.method not in SAFE_METHODS:
+            use_primary()
+        try:
+            response = self.get_response(request)
+        finally:
+            written = finish()
+        if written:
+            response.set_cookie(
+                PIN_COOKIE,
+                ','.join(sorted(written)),
+                max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
@@ -0,0 +1,37 @@
+"""Тесты, работающие с БД сервисов.
+
+Тестовые БД Django для БД сервисов не создаются: их схемы ведут сами
+сервисы. Такой тест выполняется в транзакции настроенной БД, которая
+откатывается после теста, и пропускается, если БД недоступна.
+"""
+import unittest
+
+from django.db import connections, transaction
+
+from utils.db.breakers import ping
+
+
+class DatabaseTestCase(unittest.TestCase):
+    """Тест в откатываемой транзакции БД `using`."""
+
+    using = None
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        if not ping(cls.using):
+            raise unittest.SkipTest(f'Database "{cls.using}" is unavailable')
+
+    def setUp(self):
+        super().setUp()
+        atomic = transaction.atomic(using=self.using)
+        atomic.__enter__()
+        self.addCleanup(self._rollback, atomic)
+
+    def _rollback(self, atomic):
+        transaction.set_rollback(True, using=self.using)
+        atomic.__exit__(None, None, None)
+
+    @property
+    def connection(self):
+        return connections[self.using]
@@ -1,15 +1,31 @@
+from django.conf import settings
 from django.contrib import admin, messages
-from django.contrib.admin.options import csrf_protect_m
-from django.db import OperationalError
+from django.db import DatabaseError
 from django.shortcuts import redirect
 from django.utils.connection import ConnectionDoesNotExist
 
+from utils.db import breakers
+from utils.estimated_count import (
+    EstimatedCountChangeList,
+    EstimatedCountPaginator,
+)
+from utils.keyset_pagination import KeysetChangeList
+from utils.replicas import get_read_alias
+
 
 class UseDbAdminMixin(admin.ModelAdmin):
     """Миксин, определяющий работу с БД."""
 
     # Атрибут, определяющий использование БД.
     using = 'default'
+    # Поле для постраничного вывода по ключу, например '-created'.
+    # None - обычный постраничный вывод через OFFSET/LIMIT.
+    keyset_ordering = None
+    # Оценка количества объектов планировщиком PostgreSQL вместо COUNT(*).
+    estimated_count = False
+    # Количество объектов, начиная с которого используется оценка.
+    # None - значение из настроек.
+    estimated_count_threshold = None
 
     def save_model(self, request, obj, form, change):
         """Объявляем в какую БД происходит сохранение."""
@@ -19,9 +35,20 @@ class UseDbAdminMixin(admin.ModelAdmin):
         """Объявляем из какой БД происходит удаление."""
         obj.delete(using=self.using)
 
+    def delete_queryset(self, request, queryset):
+        """Удаление выбранных объектов всегда в основной БД."""
+        queryset.using(self.using).delete()
+
     def get_queryset(self, request):
-        """Объявляем из какой БД происходит получение объектов моделей."""
-        return super().get_queryset(request).using(self.using)
+        """Объявляем из какой БД происходит получение объектов моделей.
+
+        Если у БД есть реплики, на страницах без изменений объекты
+        читаются с одной из них. Действия списка, сохранение и удаление
+        работают с объектами основной БД (`ReplicaPinMiddleware`).
+        """
+        return super().get_queryset(request).using(
+            get_read_alias(self.using),
+        )
 
     def formfield_for_foreignkey(self, db_field, request, **kwargs):
         """Объявляем как общаться с другими таблицами по FK."""
@@ -34,16 +61,90 @@ class UseDbAdminMixin(admin.ModelAdmin):
         return super().formfield_for_manytomany(
             db_field, request, using=self.using, **kwargs)
 
-    @csrf_protect_m
+    def get_changelist(self, request, **kwargs):
+        """Список с постраничным выводом по ключу, если он включён."""
+        if self.keyset_ordering:
+            return KeysetChangeList
+        if self.estimated_count:
+            return EstimatedCountChangeList
+        return super().get_changelist(request, **kwargs)
+
+    def get_paginator(self, request, queryset, per_page, orphans=0,
+                      allow_empty_first_page=True):
+        """Пагинатор с оценкой количества объектов, если она включена."""
+        if not self.estimated_count:
+            return super().get_paginator(
+                request, queryset, per_page, orphans, allow_empty_first_page,
+            )
+        threshold = self.estimated_count_threshold
+        if threshold is None:
+            threshold = settings.ADMIN_ESTIMATED_COUNT_THRESHOLD
+        return EstimatedCountPaginator(
+            queryset, per_page, orphans, allow_empty_first_page,
+            threshold=threshold,
+        )
+
+    def get_sortable_by(self, request):
+        """При выводе по ключу порядок задаётся только `keyset_ordering`."""
+        if self.keyset_ordering:
+            return ()
+        return super().get_sortable_by(request)
+
+    def db_unavailable(self, request):
+        """Сообщение о недоступности БД."""
+        self.message_user(
+            request,
+            message=f'The database "{self.using}" is now unavailable! '
+                    f'Try later!',
+            level=messages.ERROR,
+        )
+        return redirect('/admin')
+
+    def call_db_view(self, view, request, *args, **kwargs):
+        """Вызов страницы модели с учётом предохранителя БД.
+
+        Пока предохранитель разомкнут, страница сразу сообщает о
+        недоступности БД. Ответ отрисовывается здесь же, чтобы ошибки
+        запросов, выполняемых при отрисовке, тоже учитывались.
+        """
+        if not breakers.is_available(self.using):
+            return self.db_unavailable(request)
+        breakers.clear_errors(self.using)
+        try:
+            response = view(request, *args, **kwargs)
+            if hasattr(response, 'render'):
+                response.render()
+        except (ConnectionDoesNotExist, DatabaseError) as e:
+            if not breakers.is_unavailable(e):
+                raise
+            if breakers.is_broken(self.using):
+                breakers.record_failure(self.using)
+            return self.db_unavailable(request)
+        breakers.record_success(self.using)
+        return response
+
     def changelist_view(self, request, extra_context=None):
         """Переопределяем для отлавливания ошибок о недоступности БД."""
-        try:
-            return super().changelist_view(request, extra_context)
-        except (ConnectionDoesNotExist, OperationalError):
-            self.message_user(
-                request,
-                message=f'The database "{self.using}" is now unavailable! '
-                        f'Try later!',
-                level=messages.ERROR,
-            )
-            return redirect('/admin')
+        return self.call_db_view(
+            super().changelist_view, request, extra_context,
+        )
+
+    def changeform_view(self, request, object_id=None, form_url='',
+                        extra_context=None):
+        """Страницы добавления и изменения объекта."""
+        return self.call_db_view(
+            super().changeform_view, request, object_id, form_url,
+            extra_context,
+        )
+
+    def delete_view(self, request, object_id, extra_context=None):
+        """Страница удаления объекта."""
+        return self.call_db_view(
+            super().delete_view, request, object_id, extra_context,
+        )
+
+    def history_view(self, request, object_id, extra_context=None):
+        """Страница истории изменений объекта."""
+        return self.call_db_view(
+            super().history_view, request, object_id, extra_context,
+        )